@@ -8,7 +8,6 @@
 import os
 import re
 import json
-import time
 import hashlib
 import random
 from pathlib import Path
@@ -20,13 +19,15 @@ from PIL import Image, ImageOps, ImageSequence
 
 import folder_paths
 import node_helpers
-import requests
 
 import uuid
 
+from .yfg_random import (CounterRNG, RandomOrgError, StateStore, entropy_pool, history_store,
+                         random_org, resolve_worker, shard_size)
+
 # ---------------- helpers ----------------
 
-NODE_VERSION = "1.3.6"
+NODE_VERSION = "1.5.5"
 
 ALLOWED_EXT = (".png", ".jpg", ".jpeg", ".webp", ".bmp", ".gif")
 
@@ -78,44 +79,15 @@ def image_sha256(path: Path) -> str:
 
 # ---- optional Random.org support ----
 
-def _load_random_org_key() -> Optional[str]:
-    # 1) env var
-    ev = os.environ.get("RANDOM_ORG_API_KEY", "").strip()
-    if ev:
-        return ev
-    # 2) json file next to this node file
-    fp = Path(__file__).with_name("random_org_api_key.json")
-    if fp.exists():
-        try:
-            return json.loads(fp.read_text())["api_key"].strip()
-        except Exception:
-            pass
-    return None
-
 def random_org_int(minimum: int, maximum: int) -> Optional[int]:
-    api_key = _load_random_org_key()
-    if not api_key:
+    if not random_org().api_key():
         return None
-    payload = {
-        "jsonrpc":"2.0",
-        "method":"generateIntegers",
-        "params":{"apiKey":api_key,"n":1,"min":int(minimum),"max":int(maximum),"replacement":True,"base":10},
-        "id":1
-    }
     try:
-        r = requests.post(
-            "https://api.random.org/json-rpc/2/invoke",
-            headers={"Content-Type":"application/json"},
-            data=json.dumps(payload),
-            timeout=10
-        )
-        if r.status_code == 200:
-            data = r.json()
-            return int(data["result"]["random"]["data"][0])
-    except Exception:
-        pass
-    return None
-    
+        return entropy_pool().randint(minimum, maximum)
+    except RandomOrgError:
+        return None
+
+
 def _tensor_to_pil_first_image(img_tensor):
     """
     Convert ComfyUI IMAGE tensor -> PIL Image.
@@ -183,50 +155,33 @@ def _add_to_history(directory: str):
     _write_history(entries[:_HISTORY_MAX])
 
 # ---- session uniqueness ----
+# Shared O(1) history engine (yfg_random/history.py), one store per node module.
+# Set YFG_STATE_DB to share it between ComfyUI processes (yfg_random/shared.py).
 
-class _UniqueHistory:
-    buckets = {}  # scope_key -> {seen:{value:(value,ts)}, order:[value,...]}
+_UNIQUE_HISTORY = history_store("image")
 
-    @classmethod
-    def _bucket(cls, scope_key: str):
-        if scope_key not in cls.buckets:
-            cls.buckets[scope_key] = {"seen": {}, "order": []}
-        return cls.buckets[scope_key]
+# ---- seeded source ----
+# random_source=seeded draws pick n from a counter-based generator keyed by
+# seed and the directory listing, so the same (seed, run) gives the same image
+# on every machine that sees the same files. Only the auto run counter is
+# saved, to .cache/yfg_image_state.json.
+
+_STATE = StateStore(str(Path(__file__).with_name(".cache") / "yfg_image_state.json"),
+                    legacy=str(Path(__file__).with_name("yfg_image_state.json")))
 
-    @classmethod
-    def remember_and_check(cls, scope_key: str, value_key: str, history_size: int, time_window_sec: int) -> bool:
-        """
-        Returns True if value_key was seen recently (within constraints).
-        Records the current sighting regardless.
-        """
-        now = time.time()
-        b = cls._bucket(scope_key)
-        seen = b["seen"]
-        order = b["order"]
-
-        # prune by time
-        if time_window_sec and time_window_sec > 0:
-            cutoff = now - time_window_sec
-            to_remove = [k for k, (_, ts) in seen.items() if ts < cutoff]
-            for k in to_remove:
-                seen.pop(k, None)
-                try:
-                    order.remove(k)
-                except ValueError:
-                    pass
-
-        already = value_key in seen
-
-        seen[value_key] = (value_key, now)
-        order.append(value_key)
-
-        # prune by size
-        if history_size and history_size > 0:
-            while len(order) > history_size:
-                old = order.pop(0)
-                seen.pop(old, None)
-
-        return already
+
+def listing_fingerprint(files: List[Path], base_dir: str) -> str:
+    """Hash of the sorted file list, relative to base_dir so mount points don't matter."""
+    h = hashlib.sha1()
+    base = Path(base_dir)
+    for p in files:
+        try:
+            rel = p.relative_to(base).as_posix()
+        except ValueError:
+            rel = p.name
+        h.update(rel.encode("utf-8"))
+        h.update(b"\n")
+    return h.hexdigest()[:16]
 
 # ---- server-side API routes (dir browser + history) ----
 
@@ -344,7 +299,27 @@ class RandomImageFromDirectory:
         "  • If ensure_unique=true, recently-used images are avoided within the configured history/time window.\n"
         "Random source:\n"
         "  • auto uses random.org if API key is present, otherwise local random.\n"
+        "  • seeded: pick is a pure function of seed, run_counter and the file list.\n"
         "Changelog:\n"
+        "1.5.5  With a shared history (YFG_STATE_DB) the duplicate check and\n"
+        "       the remember are one transaction, so two workers never both\n"
+        "       accept the same image.\n"
+        "1.5.4  The seeded run counter moved to .cache/yfg_image_state.json\n"
+        "       (an old yfg_image_state.json is picked up and moved).\n"
+        "1.5.3  random.org indices come from the shared entropy pool, refilled\n"
+        "       in bulk in the background, instead of one request per pick.\n"
+        "1.5.2  random.org draws use the shared yfg_random client (keep-alive\n"
+        "       session, cached API key, retries with backoff).\n"
+        "1.5.1  ensure_unique history can be shared between ComfyUI processes\n"
+        "       through SQLite by setting YFG_STATE_DB.\n"
+        "1.5.0  Added worker_index / worker_count (or YFG_WORKER_INDEX / _COUNT).\n"
+        "       random and by_query only draw from this worker's shard, so\n"
+        "       several GPU workers never repeat each other's images.\n"
+        "1.4.0  Added seeded random source with optional seed / run_counter inputs.\n"
+        "       Run N of a seed picks the same image on any machine with the same\n"
+        "       files, with no network and no retries.\n"
+        "1.3.7  Uniqueness history uses the shared O(1) engine; large\n"
+        "       history_size values no longer slow down every pick.\n"
         "1.3.6  Fixed directory browser: corrected JS import path and added missing\n"
         "       Python API routes (/yfg/dir_browse, /yfg/dir_history).\n"
         "       Auto-saves used directories to history on each run.\n"
@@ -413,10 +388,10 @@ class RandomImageFromDirectory:
                     "description": "Used by by_filename/by_query. by_query supports * and ? wildcards.",
                 }),
 
-                "random_source": (["auto", "local", "random_org"], {
+                "random_source": (["auto", "local", "random_org", "seeded"], {
                     "default": "auto",
-                    "tooltip": "auto uses random.org if API key exists; otherwise uses local random.",
-                    "description": "auto uses random.org if API key exists; otherwise uses local random.",
+                    "tooltip": "auto uses random.org if API key exists; otherwise uses local random. seeded: reproducible from seed + run_counter (ensure_unique does not re-roll).",
+                    "description": "auto uses random.org if API key exists; otherwise uses local random. seeded: reproducible from seed + run_counter (ensure_unique does not re-roll).",
                 }),
 
                 "ensure_unique": ("BOOLEAN", {
@@ -453,7 +428,37 @@ class RandomImageFromDirectory:
                     "tooltip": "Maximum attempts to find a unique candidate before falling back.",
                     "description": "Maximum attempts to find a unique candidate before falling back.",
                 }),
-            }
+            },
+            "optional": {
+                "seed": ("INT", {
+                    "default": 0,
+                    "min": 0,
+                    "max": 0xffffffffffffffff,
+                    "tooltip": "random_source=seeded: the seed of the sequence.",
+                    "description": "random_source=seeded: the seed of the sequence.",
+                }),
+                "run_counter": ("INT", {
+                    "default": -1,
+                    "min": -1,
+                    "max": 0xffffffffffffffff,
+                    "tooltip": "random_source=seeded: which run of the sequence to produce. -1 = saved counter that advances each run.",
+                    "description": "random_source=seeded: which run of the sequence to produce. -1 = saved counter that advances each run.",
+                }),
+                "worker_index": ("INT", {
+                    "default": -1,
+                    "min": -1,
+                    "max": 1023,
+                    "tooltip": "This worker's shard when several ComfyUI instances share a directory. -1 reads YFG_WORKER_INDEX (default 0).",
+                    "description": "This worker's shard when several ComfyUI instances share a directory. -1 reads YFG_WORKER_INDEX (default 0).",
+                }),
+                "worker_count": ("INT", {
+                    "default": 0,
+                    "min": 0,
+                    "max": 1024,
+                    "tooltip": "How many workers split the directory. random/by_query only pick images at index w, w+count, ... 0 reads YFG_WORKER_COUNT (default 1 = no sharding).",
+                    "description": "How many workers split the directory. random/by_query only pick images at index w, w+count, ... 0 reads YFG_WORKER_COUNT (default 1 = no sharding).",
+                }),
+            },
         }
 
     # keep the first four outputs identical for backward compatibility,
@@ -490,7 +495,7 @@ class RandomImageFromDirectory:
     def _pick_random_index(self, n: int, src: str, min_idx: int, max_idx: int) -> int:
         if n <= 0:
             return 0
-        if src == "random_org" or (src == "auto" and _load_random_org_key()):
+        if src == "random_org" or (src == "auto" and random_org().api_key()):
             v = random_org_int(min_idx, max_idx)
             if v is not None:
                 return v
@@ -508,18 +513,23 @@ class RandomImageFromDirectory:
         history_size: int,
         time_window_sec: int,
         retry_limit: int,
-        directory: str
+        directory: str,
+        seeded: Optional[Tuple[CounterRNG, int]] = None,
+        shard: Tuple[int, int] = (0, 1),
     ) -> Tuple[Optional[Path], int]:
         n = len(files)
         if n == 0:
             return None, -1
 
+        # Worker shard for the random modes: this worker owns indices w, w+W, ...
+        w, W = shard
+
         def try_accept(idx: int) -> Optional[Path]:
             p = files[idx]
             if ensure_unique:
                 scope_key = "global" if unique_scope == "global" else f"dir::{Path(directory).resolve()}"
                 val_key = str(p.resolve())
-                if _UniqueHistory.remember_and_check(scope_key, val_key, history_size, time_window_sec):
+                if _UNIQUE_HISTORY.remember_and_check(scope_key, val_key, history_size, time_window_sec):
                     return None
             return p
 
@@ -540,7 +550,7 @@ class RandomImageFromDirectory:
             if ensure_unique:
                 scope_key = "global" if unique_scope == "global" else f"dir::{Path(directory).resolve()}"
                 val_key = str(p.resolve())
-                _UniqueHistory.remember_and_check(scope_key, val_key, history_size, time_window_sec)
+                _UNIQUE_HISTORY.remember_and_check(scope_key, val_key, history_size, time_window_sec)
 
             return p, idx
 
@@ -561,9 +571,13 @@ class RandomImageFromDirectory:
         if selection_mode == "by_query":
             q = filename_query.strip() or "*"
             regex = re.compile("^" + re.escape(q).replace(r"\*", ".*").replace(r"\?", ".") + "$", re.IGNORECASE)
-            cand = [i for i, p in enumerate(files) if regex.match(p.name)]
+            cand = [i for i, p in enumerate(files) if regex.match(p.name) and i % W == w]
             if not cand:
                 return None, -1
+            if seeded:
+                rng, counter = seeded
+                pick = cand[rng.randint(counter, 0, len(cand)-1)]
+                return (try_accept(pick) or files[pick]), pick
             tries = 0
             while tries < max(1, retry_limit):
                 pick = cand[self._pick_random_index(len(cand)-1, rand_src, 0, len(cand)-1)]
@@ -573,14 +587,25 @@ class RandomImageFromDirectory:
                 tries += 1
             return files[pick], pick  # fall back
 
-        # random
+        # random — draws a position within the shard, then maps it back
+        m = shard_size(n, w, W)
+        if m == 0:
+            return None, -1
+        if seeded:
+            # Pure function of the counter: remembered for history, never re-rolled
+            rng, counter = seeded
+            idx = w + rng.randint(counter, 0, m-1) * W
+            return (try_accept(idx) or files[idx]), idx
+
         tries = 0
-        idx = self._pick_random_index(n-1, rand_src, 0, n-1)
+        pos = self._pick_random_index(m-1, rand_src, 0, m-1)
+        idx = w + pos * W
         while tries < max(1, retry_limit):
             p = try_accept(idx)
             if p is not None or not ensure_unique:
                 return (p or files[idx]), idx
-            idx = (idx + 1) % n
+            pos = (pos + 1) % m
+            idx = w + pos * W
             tries += 1
         return files[idx], idx  # last resort
 
@@ -597,10 +622,18 @@ class RandomImageFromDirectory:
         history_size,
         time_window_sec,
         retry_limit,
-        show_preview
+        show_preview,
+        seed=0,
+        run_counter=-1,
+        worker_index=-1,
+        worker_count=0,
     ):
         if not os.path.exists(image_directory):
             raise Exception(f"Image directory {image_directory} does not exist")
+        try:
+            shard = resolve_worker(worker_index, worker_count)
+        except ValueError as e:
+            raise Exception(f"RandomImageFromDirectory: {e}")
 
         _add_to_history(image_directory)
         files = list_images(image_directory, include_subdirs)
@@ -609,13 +642,19 @@ class RandomImageFromDirectory:
 
         total_count = len(files)
 
+        seeded = None
+        if random_source == "seeded":
+            fingerprint = listing_fingerprint(files, image_directory)
+            seeded = (CounterRNG(seed, fingerprint), self._seeded_run(fingerprint, seed, run_counter))
+
         path, idx = self._choose(
             files, selection_mode, index, filename_query, random_source,
             ensure_unique, unique_scope, history_size, time_window_sec,
-            retry_limit, image_directory
+            retry_limit, image_directory, seeded, shard
         )
         if path is None:
-            raise Exception("Could not select an image with the given parameters (possibly all candidates were recently used).")
+            raise Exception("Could not select an image with the given parameters (possibly all candidates were recently used, "
+                            f"or worker shard {shard[0]} of {shard[1]} is empty).")
 
         # Load image once
         img = node_helpers.pillow(Image.open, str(path))
@@ -687,19 +726,44 @@ class RandomImageFromDirectory:
 
         return {"ui": ui_data, "result": result}
 
+    @staticmethod
+    def _seeded_run(fingerprint: str, seed: int, run_counter: int) -> int:
+        """run_counter if given, else the saved auto counter (advanced by one)."""
+        if int(run_counter) >= 0:
+            return int(run_counter)
+        key = f"seeded::{fingerprint}::{seed}"
+        run = _STATE.get(key)
+        run = run if isinstance(run, int) and run >= 0 else 0
+        _STATE.set(key, run + 1)
+        return run
+
     @classmethod
     def IS_CHANGED(cls, image_directory, include_subdirs, selection_mode, index, filename_query,
                    random_source, ensure_unique, unique_scope, history_size, time_window_sec,
                    retry_limit, **kwargs):
+        # seeded with an explicit run_counter is a pure function of the inputs
+        # (and the file list, hashed below), so it can be cached like by_index.
+        pinned = random_source == "seeded" and int(kwargs.get("run_counter", -1)) >= 0
+
         # If randomness or de-duplication can change the output between runs,
         # force recomputation every time.
-        if selection_mode in ("random", "by_query") or ensure_unique or random_source in ("auto", "random_org"):
+        if not pinned and (selection_mode in ("random", "by_query") or ensure_unique
+                           or random_source in ("auto", "random_org")):
             return float("NaN")
 
         # Otherwise, stable hash allows caching for deterministic selections.
         m = hashlib.sha256()
+        if pinned:
+            files = list_images(image_directory, include_subdirs)
+            m.update(listing_fingerprint(files, image_directory).encode("utf-8"))
+            try:
+                m.update(repr(resolve_worker(kwargs.get("worker_index", -1),
+                                             kwargs.get("worker_count", 0))).encode("utf-8"))
+            except ValueError:
+                return float("NaN")
         for v in (image_directory, include_subdirs, selection_mode, index, filename_query,
-                  random_source, ensure_unique, unique_scope, history_size, time_window_sec, retry_limit):
+                  random_source, ensure_unique, unique_scope, history_size, time_window_sec, retry_limit,
+                  kwargs.get("seed", 0), kwargs.get("run_counter", -1)):
             m.update(str(v).encode("utf-8"))
             m.update(b"|")
         return m.hexdigest()
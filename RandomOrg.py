@@ -18,10 +18,10 @@
 # LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
 # THE SOFTWARE.
 
-import requests
-import json
 import hashlib
 
+from .yfg_random import SOURCE_FALLBACK, entropy_pool
+
 class RandomOrgTrueRandomNumber:
     """True Random Number Generator via random.org"""
     def __init__(self):
@@ -61,31 +61,10 @@ class RandomOrgTrueRandomNumber:
             print("Error: A valid RANDOM.ORG API key is required.")
             return [0]
 
-        payload = {
-            "jsonrpc": "2.0",
-            "method": "generateIntegers",
-            "params": {
-                "apiKey": api_key,
-                "n": amount,
-                "min": int(minimum),
-                "max": int(maximum),
-                "replacement": True,
-                "base": 10
-            },
-            "id": 1
-        }
-
-        response = requests.post(
-            "https://api.random.org/json-rpc/2/invoke",
-            headers={"Content-Type": "application/json"},
-            data=json.dumps(payload),
-            timeout=10
-        )
-        if response.status_code == 200:
-            data = response.json()
-            if "result" in data and "random" in data["result"]:
-                return data["result"]["random"]["data"]
-        return [0]
+        nums, source = entropy_pool(api_key).draw(amount, minimum, maximum)
+        if source == SOURCE_FALLBACK:
+            print(f"Warning: random.org unavailable; returning {SOURCE_FALLBACK} values instead.")
+        return nums
 
     @classmethod
     def IS_CHANGED(cls, api_key, mode, **kwargs):
@@ -20,41 +20,20 @@
 
 from __future__ import annotations
 
-import os
-import json
 import hashlib
-import requests
-from typing import List, Dict, Any, Tuple, Optional
+import itertools
+from typing import List, Dict, Any, Tuple
+
+from .yfg_random import (SOURCE_FALLBACK, SOURCE_RANDOM_ORG, FeistelPermutation, entropy_pool,
+                         history_store, random_org, shared_bag)
 
 # -----------------------------------------------------------------------------
 # API KEY STORAGE (no UI field)
 # -----------------------------------------------------------------------------
+# RANDOM_ORG_API_KEY or random_org_api_key.json next to this file, read and
+# cached by the shared yfg_random client (re-read only when the file changes).
 
-NODE_VERSION = "2.0.1"  # bump however you want; this node file previously didn't version explicitly
-API_KEY_FILENAME = "random_org_api_key.json"
-
-
-def _load_api_key() -> Optional[str]:
-    # 1) Env var wins for easy local development
-    env_key = os.getenv("RANDOM_ORG_API_KEY")
-    if env_key and env_key.strip():
-        return env_key.strip()
-
-    # 2) Local JSON file next to this script
-    here = os.path.dirname(os.path.realpath(__file__))
-    key_path = os.path.join(here, API_KEY_FILENAME)
-    try:
-        with open(key_path, "r", encoding="utf-8") as f:
-            data = json.load(f)
-        key = (data or {}).get("api_key", "").strip()
-        return key if key else None
-    except FileNotFoundError:
-        print(f"RandomOrgV2: API key file not found: {key_path}")
-    except json.JSONDecodeError as e:
-        print(f"RandomOrgV2: Failed to parse {API_KEY_FILENAME}: {e}")
-    except Exception as e:
-        print(f"RandomOrgV2: Unexpected error reading key file: {e}")
-    return None
+NODE_VERSION = "2.9.2"  # bump however you want; this node file previously didn't version explicitly
 
 
 class _ShuffleBag:
@@ -62,18 +41,25 @@ class _ShuffleBag:
     Shuffle-bag (sampling without replacement).
     For each bag_key we maintain a shuffled list of remaining values.
     When empty or when range changes, refill + reshuffle.
+    Ranges bigger than MAX_BAG_SIZE keep a keyed permutation and a counter
+    instead of a list, so even 2^64 values cost O(1) memory per bag.
+    Values handed back with put_back() wait in "front" and are dealt before
+    the rest of the cycle.
     """
-    # bag_key -> {"remaining": [int,...], "last_size": int}
+    # bag_key -> {"remaining": [int,...], "last_size": int, "front": [int,...]}
+    #         or {"perm": FeistelPermutation, "pos": int, "last_size": int, "front": [int,...]}
     _bags: Dict[str, Dict[str, Any]] = {}
 
-    # Guardrail: don't build a bag bigger than this many items.
-    # If a user sets min/max to a massive span, we fall back to history de-dup.
+    # Largest range dealt from a shuffled list. Above it, values come from a
+    # FeistelPermutation keyed from random.org entropy.
     MAX_BAG_SIZE = 200_000
 
+    # Cross-process bag, set when YFG_STATE_DB is configured
+    _shared = shared_bag("number")
+
     @classmethod
     def can_use(cls, lo: int, hi: int) -> bool:
-        n = (hi - lo + 1)
-        return 1 <= n <= cls.MAX_BAG_SIZE
+        return hi - lo + 1 >= 1
 
     @classmethod
     def _get_bag(cls, bag_key: str) -> Dict[str, Any]:
@@ -83,18 +69,47 @@ class _ShuffleBag:
 
     @classmethod
     def next_value(cls, bag_key: str, lo: int, hi: int) -> int:
+        if cls._shared is not None:
+            return cls._shared.next_value(bag_key, lo, hi)
         bag = cls._get_bag(bag_key)
         size = hi - lo + 1
 
-        if bag["last_size"] != size or not bag["remaining"]:
+        if bag.get("front") and bag["last_size"] == size:
+            return int(bag["front"].pop(0))
+
+        if size > cls.MAX_BAG_SIZE:
+            # Lazy bag: the pos-th value of a keyed shuffle, new key each cycle
+            if bag["last_size"] != size or bag.get("pos", size) >= size:
+                bag.clear()
+                bag.update(perm=FeistelPermutation.random(size), pos=0, last_size=size)
+            value = lo + bag["perm"][bag["pos"]]
+            bag["pos"] += 1
+            return int(value)
+
+        if bag["last_size"] != size or not bag.get("remaining"):
             values = list(range(lo, hi + 1))
             # Local cryptographic shuffle; avoids hammering random.org
             import random
             random.SystemRandom().shuffle(values)
-            bag["remaining"] = values
-            bag["last_size"] = size
+            bag.clear()
+            bag.update(remaining=values, last_size=size)
 
-        return int(bag["remaining"].pop(0))
+        # Already shuffled, so taking from the end is just as random and O(1).
+        return int(bag["remaining"].pop())
+
+    @classmethod
+    def put_back(cls, bag_key: str, lo: int, hi: int, values: List[int]):
+        """Return dealt but unused *values*; they are dealt next, in order, once each."""
+        if not values:
+            return
+        if cls._shared is not None:
+            cls._shared.put_back(bag_key, lo, hi, values)
+            return
+        bag = cls._bags.get(bag_key)
+        if bag is None or bag["last_size"] != hi - lo + 1:
+            return
+        front = list(dict.fromkeys(int(v) for v in values))
+        bag["front"] = front + [v for v in bag.get("front", ()) if v not in front]
 
 
 class RandomOrgV2TrueRandomNumber:
@@ -107,7 +122,15 @@ class RandomOrgV2TrueRandomNumber:
         "Generates a true random integer using random.org.\n\n"
         "Uniqueness options:\n"
         "  • ensure_unique=true + use_shuffle_bag=true: uses a shuffle-bag (no repeats until the range is exhausted, then reshuffles).\n"
-        "  • If the range is very large, the node automatically falls back to history-based de-dup to avoid huge memory use.\n\n"
+        "  • Ranges over 200,000 values use a keyed permutation instead of a list: still no repeats\n"
+        "    until exhausted, with constant memory whatever the range.\n"
+        "  • use_shuffle_bag=false uses history-based de-dup (retries against recent values).\n\n"
+        "count > 1 emits a list of numbers (downstream nodes run once per value). The batch is\n"
+        "drawn from the random.org entropy pool in one go, and with ensure_unique its values\n"
+        "are distinct and follow the same shuffle-bag / history rules as single picks.\n\n"
+        "If random.org can't be reached the value comes from os.urandom instead of 0, and the\n"
+        "source output says so. After 3 failures in a row random.org is left alone for a\n"
+        "cool-down (60s, doubling) and then probed again.\n\n"
         "API Key:\n"
         "  • Set env var RANDOM_ORG_API_KEY, or create random_org_api_key.json next to this file: {\"api_key\":\"...\"}\n"
     )
@@ -117,15 +140,14 @@ class RandomOrgV2TrueRandomNumber:
         "ComfyUI NUMBER output (typically behaves like a float).",
         "Same value as a Python float.",
         "Same value as a Python int.",
+        "Where the value came from: random.org, os.urandom (random.org unreachable, "
+        "circuit breaker open or quota spent), shuffle_bag, fixed, or none (no API key).",
     )
 
     # ---- Class-level caches (persist for the lifetime of the Python process) ----
-    # Global cache: value -> last_timestamp
-    _global_map = {}
-    _global_order = []  # FIFO
-
-    # Per-range caches: key (min,max) -> {"map": {value: t}, "order": [values FIFO]}
-    _range_caches = {}
+    # Scope "global" or (min, max) -> UniqueHistory (value -> last timestamp).
+    # Shared between processes via SQLite when YFG_STATE_DB is set.
+    _history = history_store("number")
 
     def __init__(self):
         pass
@@ -196,14 +218,24 @@ class RandomOrgV2TrueRandomNumber:
                 "use_shuffle_bag": ("BOOLEAN", {
                     "default": True,
                     "label": "Use shuffle-bag (no repeats until exhausted)",
-                    "tooltip": f"If true and range size <= {_ShuffleBag.MAX_BAG_SIZE:,}, use shuffle-bag. Otherwise fall back.",
-                    "description": f"If true and range size <= {_ShuffleBag.MAX_BAG_SIZE:,}, use shuffle-bag. Otherwise fall back.",
+                    "tooltip": f"If true, use shuffle-bag (ranges over {_ShuffleBag.MAX_BAG_SIZE:,} use a lazy keyed permutation). Otherwise history de-dup.",
+                    "description": f"If true, use shuffle-bag (ranges over {_ShuffleBag.MAX_BAG_SIZE:,} use a lazy keyed permutation). Otherwise history de-dup.",
+                }),
+                "count": ("INT", {
+                    "default": 1,
+                    "min": 1,
+                    "max": 4096,
+                    "label": "Count",
+                    "tooltip": "How many numbers to emit per run. number/float/int become lists, so downstream nodes run once per value. With ensure_unique, values in a batch are distinct while the range is large enough.",
+                    "description": "How many numbers to emit per run. number/float/int become lists, so downstream nodes run once per value. With ensure_unique, values in a batch are distinct while the range is large enough.",
                 }),
             }
         }
 
-    RETURN_TYPES = ("NUMBER", "FLOAT", "INT")
-    RETURN_NAMES = ("number", "float", "int")
+    RETURN_TYPES = ("NUMBER", "FLOAT", "INT", "STRING")
+    RETURN_NAMES = ("number", "float", "int", "source")
+    # number/float/int are lists (one item per `count`); source covers the batch.
+    OUTPUT_IS_LIST = (True, True, True, False)
     FUNCTION = "return_true_random_number"
     CATEGORY = "🐯 YFG/🔢 Numbers"
 
@@ -218,12 +250,13 @@ class RandomOrgV2TrueRandomNumber:
         time_window_sec: int = 0,
         retry_limit: int = 20,
         use_shuffle_bag: bool = True,
+        count: int = 1,
     ):
-        api_key = _load_api_key()
+        count = max(1, int(count))
+        api_key = random_org().api_key()
         if not api_key:
             print("RandomOrgV2: No API key available. Create random_org_api_key.json or set RANDOM_ORG_API_KEY.")
-            number = 0
-            return {"ui": {"yfg_number": (number,), "yfg_float": (float(number),), "yfg_int": (int(number),)}, "result": (number, float(number), int(number))}
+            return self._emit([0] * count, "none")
 
         # Normalize and validate bounds
         lo = int(minimum)
@@ -234,163 +267,138 @@ class RandomOrgV2TrueRandomNumber:
 
         # If mode is fixed, always return the minimum (deterministic)
         if mode == "fixed":
-            number = lo
-            return {"ui": {"yfg_number": (number,), "yfg_float": (float(number),), "yfg_int": (int(number),)}, "result": (number, float(number), int(number))}
+            return self._emit([lo] * count, "fixed")
 
         span = hi - lo + 1
 
-        # Fast path: uniqueness off OR trivial range
+        # Fast path: uniqueness off OR trivial range. The whole batch is one pool draw.
         if (not ensure_unique) or span <= 1:
-            nums = self._get_random_integers(api_key=api_key, amount=1, minimum=lo, maximum=hi)
-            number = nums[0]
-            return {"ui": {"yfg_number": (number,), "yfg_float": (float(number),), "yfg_int": (int(number),)}, "result": (number, float(number), int(number))}
+            nums, source = self._get_random_integers(api_key=api_key, amount=count, minimum=lo, maximum=hi)
+            return self._emit(nums, source)
 
         # ----------------------------
         # Uniqueness-enabled path
         # ----------------------------
+        range_key = (lo, hi)
+        # Values in one batch are kept distinct while the range can supply them
+        distinct = count <= span
+        batch: List[int] = []
+        taken = set()
 
-        # Prefer shuffle-bag when range size is reasonable.
+        # Prefer shuffle-bag; huge ranges get a lazy permutation, so any size works.
         # This guarantees "no repeats until exhausted".
         if use_shuffle_bag and _ShuffleBag.can_use(lo, hi):
             # Bag key incorporates scope + range
             bag_key = f"{unique_scope}::{lo}::{hi}"
 
-            candidate = _ShuffleBag.next_value(bag_key=bag_key, lo=lo, hi=hi)
-
-            # If unique_scope is global, also honor global history rules to avoid collisions
-            # across different ranges that share the same numeric value.
-            if unique_scope == "global":
-                range_key = (lo, hi)
-                tries = 0
-                max_tries = max(1, int(retry_limit))
-                while tries < max_tries and self._is_duplicate(candidate, range_key, unique_scope, history_size, time_window_sec):
-                    candidate = _ShuffleBag.next_value(bag_key=bag_key, lo=lo, hi=hi)
-                    tries += 1
-
-            self._remember(candidate, (lo, hi), unique_scope, history_size)
-            return {"ui": {"yfg_number": (candidate,), "yfg_float": (float(candidate),), "yfg_int": (int(candidate),)}, "result": (candidate, float(candidate), int(candidate))}
-
-        # Fallback: history-based de-dup (kept for very large ranges)
-        key = (lo, hi)
-        candidate = lo  # init for safety
+            skipped: List[int] = []     # dealt but not used: still owed to this cycle
+
+            def deal() -> int:
+                # A bag that wraps mid-batch can deal a value already in the batch.
+                # Every cycle deals the whole range, so one that isn't turns up.
+                value = _ShuffleBag.next_value(bag_key=bag_key, lo=lo, hi=hi)
+                while distinct and value in taken:
+                    skipped.append(value)
+                    value = _ShuffleBag.next_value(bag_key=bag_key, lo=lo, hi=hi)
+                return value
+
+            for _ in range(count):
+                candidate = deal()
+
+                # If unique_scope is global, also honor global history rules to avoid collisions
+                # across different ranges that share the same numeric value.
+                if unique_scope == "global":
+                    for _ in range(max(1, int(retry_limit))):
+                        if self._claim(candidate, range_key, unique_scope, history_size, time_window_sec):
+                            break
+                        skipped.append(candidate)
+                        candidate = deal()
+                    else:
+                        # Out of retries: history gives way, batch distinctness doesn't
+                        self._remember(candidate, range_key, unique_scope, history_size)
+                else:
+                    self._remember(candidate, range_key, unique_scope, history_size)
+                batch.append(candidate)
+                taken.add(candidate)
+                _ShuffleBag.put_back(bag_key, lo, hi, [v for v in skipped if v != candidate])
+                skipped.clear()
+            return self._emit(batch, "shuffle_bag")
+
+        # Fallback: history-based de-dup (use_shuffle_bag=false). Each round draws
+        # every missing value at once from the pool and keeps the fresh ones.
+        source = SOURCE_RANDOM_ORG
+        nums: List[int] = []
         for _ in range(max(1, int(retry_limit))):
-            nums = self._get_random_integers(api_key=api_key, amount=1, minimum=lo, maximum=hi)
-            candidate = nums[0]
-            if not self._is_duplicate(candidate, key, unique_scope, history_size, time_window_sec):
-                self._remember(candidate, key, unique_scope, history_size)
-                return {"ui": {"yfg_number": (candidate,), "yfg_float": (float(candidate),), "yfg_int": (int(candidate),)}, "result": (candidate, float(candidate), int(candidate))}
-
-        print("RandomOrgV2: Retry limit reached while avoiding duplicates; emitting last value.")
-        self._remember(candidate, key, unique_scope, history_size)
-        return {"ui": {"yfg_number": (candidate,), "yfg_float": (float(candidate),), "yfg_int": (int(candidate),)}, "result": (candidate, float(candidate), int(candidate))}
+            nums, got = self._get_random_integers(api_key=api_key, amount=count - len(batch), minimum=lo, maximum=hi)
+            if got == SOURCE_FALLBACK:
+                source = got
+            for candidate in nums:
+                if (distinct and candidate in taken) or \
+                        not self._claim(candidate, range_key, unique_scope, history_size, time_window_sec):
+                    continue
+                batch.append(candidate)
+                taken.add(candidate)
+            if len(batch) == count:
+                return self._emit(batch, source)
+
+        print("RandomOrgV2: Retry limit reached while avoiding duplicates; emitting last values.")
+        # History gives way, batch distinctness doesn't
+        rest = self._fill(nums, lo, hi, count - len(batch), taken) if distinct else nums[:count - len(batch)]
+        for candidate in rest:
+            self._remember(candidate, range_key, unique_scope, history_size)
+            batch.append(candidate)
+        return self._emit(batch, source)
 
     # --- Internal helpers ---
-    def _get_random_integers(self, api_key: str, amount: int, minimum: int, maximum: int) -> List[int]:
-        payload = {
-            "jsonrpc": "2.0",
-            "method": "generateIntegers",
-            "params": {
-                "apiKey": api_key,
-                "n": int(amount),
-                "min": int(minimum),
-                "max": int(maximum),
-                "replacement": True,
-                "base": 10
-            },
-            "id": 1
-        }
+    @staticmethod
+    def _emit(numbers: List[int], source: str) -> Dict[str, Any]:
+        floats = [float(n) for n in numbers]
+        ints   = [int(n) for n in numbers]
+        return {"ui": {"yfg_number": list(numbers), "yfg_float": floats, "yfg_int": ints,
+                       "yfg_source": (source,)},
+                "result": (list(numbers), floats, ints, source)}
+
+    def _get_random_integers(self, api_key: str, amount: int, minimum: int, maximum: int) -> Tuple[List[int], str]:
+        # Never fails: if random.org can't deliver (circuit open, quota spent,
+        # network down) the values come from os.urandom and the source says so.
+        nums, source = entropy_pool(api_key).draw(amount, minimum, maximum)
+        if source == SOURCE_FALLBACK:
+            print(f"RandomOrgV2: random.org unavailable; emitted {SOURCE_FALLBACK} values (source output)")
+        return nums, source
 
-        try:
-            resp = requests.post(
-                "https://api.random.org/json-rpc/2/invoke",
-                headers={"Content-Type": "application/json"},
-                data=json.dumps(payload),
-                timeout=20,
-            )
-        except requests.RequestException as e:
-            print(f"RandomOrgV2: Network error contacting random.org: {e}")
-            return [0]
-
-        if resp.status_code != 200:
-            print(f"RandomOrgV2: HTTP {resp.status_code} from random.org")
-            return [0]
-
-        try:
-            data = resp.json()
-        except ValueError:
-            print("RandomOrgV2: Failed to decode JSON from random.org response")
-            return [0]
-
-        if "error" in data:
-            print(f"RandomOrgV2: API error: {data['error']}")
-            return [0]
-
-        try:
-            return data["result"]["random"]["data"]
-        except Exception as e:
-            print(f"RandomOrgV2: Unexpected response format: {e}")
-            return [0]
+    @staticmethod
+    def _fill(nums: List[int], lo: int, hi: int, need: int, taken: set) -> List[int]:
+        """
+        *need* distinct values not in *taken*: from *nums* first, then the
+        next free ones after the last of them (wrapping within lo..hi).
+        """
+        out, seen = [], set(taken)
+        span, start = hi - lo + 1, nums[-1] if nums else lo
+        for v in itertools.chain(nums, (lo + (start - lo + k) % span for k in range(span))):
+            if len(out) == need:
+                break
+            if v not in seen:
+                seen.add(v)
+                out.append(v)
+        return out
 
     @staticmethod
-    def _now() -> float:
-        try:
-            import time
-            return time.time()
-        except Exception:
-            return 0.0
-
-    def _get_range_cache(self, key: Tuple[int, int]):
-        cache = self._range_caches.get(key)
-        if cache is None:
-            cache = {"map": {}, "order": []}
-            self._range_caches[key] = cache
-        return cache
-
-    def _prune(self, ordered_list, value_map, history_size, time_window_sec):
-        while len(ordered_list) > history_size:
-            oldest = ordered_list.pop(0)
-            value_map.pop(oldest, None)
-        if time_window_sec and time_window_sec > 0:
-            now = self._now()
-            for v in list(ordered_list):
-                ts = value_map.get(v)
-                if ts is None:
-                    continue
-                if now - ts > time_window_sec:
-                    ordered_list.remove(v)
-                    value_map.pop(v, None)
-
-    def _is_duplicate(self, value: int, range_key: Tuple[int, int], scope: str, history_size: int, time_window_sec: int) -> bool:
-        now = self._now()
-        if scope == "global":
-            self._prune(self._global_order, self._global_map, history_size, time_window_sec)
-            ts = self._global_map.get(value)
-            if ts is None:
-                return False
-            if time_window_sec and time_window_sec > 0 and (now - ts) > time_window_sec:
-                return False
-            return True
-        else:
-            cache = self._get_range_cache(range_key)
-            self._prune(cache["order"], cache["map"], history_size, time_window_sec)
-            ts = cache["map"].get(value)
-            if ts is None:
-                return False
-            if time_window_sec and time_window_sec > 0 and (now - ts) > time_window_sec:
-                return False
-            return True
+    def _scope_key(range_key: Tuple[int, int], scope: str):
+        return "global" if scope == "global" else range_key
+
+    @staticmethod
+    def _bounds(range_key: Tuple[int, int], scope: str):
+        # Per-range scopes hold integers in [lo, hi]; dense ones get a bitmap history
+        return None if scope == "global" else range_key
+
+    def _claim(self, value: int, range_key: Tuple[int, int], scope: str, history_size: int, time_window_sec: int) -> bool:
+        # Check and remember in one step, so another worker can't take the same value in between
+        return self._history.claim(self._scope_key(range_key, scope), value, history_size, time_window_sec,
+                                   bounds=self._bounds(range_key, scope))
 
     def _remember(self, value: int, range_key: Tuple[int, int], scope: str, history_size: int):
-        now = self._now()
-        if scope == "global":
-            self._global_map[value] = now
-            self._global_order.append(value)
-            self._prune(self._global_order, self._global_map, history_size, 0)
-        else:
-            cache = self._get_range_cache(range_key)
-            cache["map"][value] = now
-            cache["order"].append(value)
-            self._prune(cache["order"], cache["map"], history_size, 0)
+        self._history.remember(self._scope_key(range_key, scope), value, history_size,
+                               bounds=self._bounds(range_key, scope))
 
     @classmethod
     def IS_CHANGED(
@@ -404,6 +412,7 @@ class RandomOrgV2TrueRandomNumber:
         time_window_sec: int = 0,
         retry_limit: int = 20,
         use_shuffle_bag: bool = True,
+        count: int = 1,
         **kwargs
     ):
         # If mode is 'fixed', return a stable hash so ComfyUI can cache the node's output.
@@ -411,12 +420,77 @@ class RandomOrgV2TrueRandomNumber:
             m = hashlib.sha256()
             m.update(
                 f"{mode}|{minimum}|{maximum}|{ensure_unique}|{unique_scope}|{history_size}|"
-                f"{time_window_sec}|{retry_limit}|{use_shuffle_bag}".encode("utf-8")
+                f"{time_window_sec}|{retry_limit}|{use_shuffle_bag}|{count}".encode("utf-8")
             )
             return m.hexdigest()
         return float("nan")
 
 
+# --- server-side API route (random.org quota / client status) ---
+
+try:
+    import asyncio
+    from pathlib import Path
+    from server import PromptServer
+    from aiohttp import web as _web
+
+    # Same loopback-only guard as the other /yfg/* routes; opt in to LAN
+    # access with an empty "yfg_allow_remote.json" next to this script.
+    _YFG_ALLOW_REMOTE_FLAG = Path(__file__).with_name("yfg_allow_remote.json")
+
+    def _yfg_remote_allowed(request) -> bool:
+        if _YFG_ALLOW_REMOTE_FLAG.exists():
+            return True
+        peer = request.remote  # aiohttp peer IP string, or None (unix socket)
+        if peer is None:
+            return True
+        return peer == "::1" or peer.startswith("127.")
+
+    def _yfg_local_only(handler):
+        """Decorator: reject non-loopback requests with 403 unless opted in."""
+        async def _guarded(request):
+            if not _yfg_remote_allowed(request):
+                return _web.json_response(
+                    {"error": "This endpoint is restricted to localhost. "
+                              "Create yfg_allow_remote.json next to "
+                              "RandomOrgV2.py to allow remote access."},
+                    status=403)
+            return await handler(request)
+        return _guarded
+
+    @PromptServer.instance.routes.get("/yfg/random_org/status")
+    @_yfg_local_only
+    async def _yfg_random_org_status(request):
+        """
+        Quota of the configured key (bitsLeft, requestsLeft, advisoryDelay),
+        refreshed through getUsage when stale or when ?refresh=1, plus the
+        shared client's call stats, circuit breaker state and the entropy
+        pool's fill level.
+        """
+        client  = random_org()
+        max_age = 0.0 if request.rel_url.query.get("refresh", "") in ("1", "true") else None
+        loop    = asyncio.get_running_loop()
+        usage   = await loop.run_in_executor(None, client.usage, None, max_age)
+        return _web.json_response({
+            "configured": usage is not None,
+            "usage":      usage,
+            "client":     client.stats(),
+            "breaker":    client.breaker(),
+            "pool":       entropy_pool().stats(),
+        })
+
+    print("[YFG] RandomOrgV2: /yfg/random_org/status route registered.")
+
+except Exception as _e:
+    print(f"[YFG] Warning: could not register /yfg/random_org/status: {_e}")
+
+
+# Warm the shared pool at load: bytes left over from the last run are claimed
+# from the on-disk reserve in the background, so the first pick doesn't wait.
+if random_org().api_key():
+    entropy_pool()
+
+
 # --- ComfyUI registration ---
 NODE_CLASS_MAPPINGS = {
     "RandomOrgV2TrueRandomNumber": RandomOrgV2TrueRandomNumber,
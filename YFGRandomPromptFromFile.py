@@ -7,6 +7,89 @@
               and multiple selection modes.
 
 Changelog:
+  1.16.9 A weighted batch larger than the number of positive-weight entries
+         no longer pulls in zero-weight entries to stay distinct; it
+         repeats weighted ones instead.
+  1.16.8 ensure_unique checks and remembers a pick in one step, so with a
+         shared history (YFG_STATE_DB) two workers can't both take the
+         same entry.
+  1.16.7 Cursors and bag positions moved to .cache/yfg_prompt_state.json,
+         out of the package folder (an old yfg_prompt_state.json is picked
+         up and moved).
+  1.16.6 When the retries run out, a batch still never repeats an entry
+         (count <= pool size): history gives way, batch distinctness
+         doesn't, with or without the shuffle bag.
+  1.16.5 /yfg/prompt_file/enqueue validates every job, not just the
+         first, and queues nothing if one fails. Each job keeps its own
+         output list, and the queue item has the shape /prompt builds on
+         the running ComfyUI (sensitive extra_data split out where it is).
+  1.16.4 IS_CHANGED only plans the selection. Cursors, the seeded run
+         counter and index_previous move when load_prompt uses the plan,
+         so a cached run or an unused check moves nothing, and the hash
+         leaves out index_previous so a held prompt caches from the first
+         hold run. Unique random picks are not planned ahead (always run).
+  1.16.3 A shuffle-bag entry skipped because it is already in the batch
+         goes back to the front of the bag instead of dropping out of the
+         cycle, so every entry is still dealt once per cycle.
+  1.16.2 random.org picks are served from the shared entropy pool (bulk
+         blobs, background refill), so a run no longer waits on HTTPS.
+  1.16.1 random.org draws go through the shared yfg_random client:
+         keep-alive session, cached API key, retries with backoff.
+  1.16.0 Added POST /yfg/prompt_file/enqueue. One call queues a job per
+         entry lo, lo+stride, … hi, each pinned to its index (by_index)
+         or with its text baked in, so walking a large range needs no
+         per-job HTTP round trip and no shared incremental cursor.
+  1.15.0 With YFG_STATE_DB set, uniqueness history and shuffle bags live
+         in a shared SQLite (WAL) database, so several ComfyUI processes
+         on one host never repeat each other. Bags hand out positions in
+         reserved blocks of 64 per process.
+  1.14.0 Added worker_index / worker_count (or YFG_WORKER_INDEX / _COUNT).
+         Worker w of W only draws entries lo+w, lo+w+W, … in every mode
+         but by_index, so GPU workers sharing a file never repeat each
+         other. Cursors, history and bags are kept per shard.
+  1.13.0 Added seeded random source with optional seed / run_counter.
+         Each pick (and its template expansion) is a pure function of
+         seed, run and pool fingerprint via a counter-based generator.
+  1.12.0 IS_CHANGED makes the run's selection, reserves it for
+         load_prompt and returns a hash of the outputs, so an unchanged
+         prompt (a held incremental_no_wrap, a one-entry pool) no longer
+         forces CLIPTextEncode and the rest of the graph to re-run.
+         Cursors and index_previous are kept per file and mode, not per
+         node instance.
+  1.11.0 Selected prompts expand {a|b|c} alternations and __name__
+         wildcards (lines of <wildcards_dir>/name.txt). Templates compile
+         to a small AST cached per entry; wildcard files go through the
+         same mtime-aware parse cache. New expand_templates and
+         wildcards_dir inputs.
+  1.10.0 Optional weight: field (weight key / column in .jsonl and .csv).
+         random mode picks weighted entries through an alias table built
+         once per parsed file; narrower ranges, last_n_only and multi-file
+         pools get sub-tables memoized per (lo, hi). New weighted toggle.
+  1.9.0  Incremental cursors and shuffle-bag positions persist across
+         restarts in yfg_prompt_state.json (batched writes), keyed by mode,
+         file, content fingerprint and range. A long incremental_no_wrap
+         walk resumes where it stopped instead of starting over.
+  1.8.1  /yfg/prompt_count and /yfg/prompt_search parse off the event loop.
+         Large sources get a 202 + job id with bytes-scanned progress, and
+         a current parse cache is answered without touching the file.
+  1.8.0  Added by_query selection mode (query + query_order inputs) and the
+         /yfg/prompt_search route. Both use a per-file inverted index that
+         is built on first search and cached with the parse cache.
+  1.7.0  Prompt files can also be .jsonl, .csv or .tsv, and any format may
+         be gzip/bz2/xz compressed. All formats are parsed by a line-stream
+         reader, so compressed dumps are used in place without unpacking.
+  1.6.0  prompt_file also accepts a folder or a glob. Matching files are
+         merged into one global index (each still cached by its own mtime),
+         and index, range bounds, the shuffle bag and incremental modes all
+         run over that pool. file_path / file_name report the file each
+         selected entry came from.
+  1.5.0  Added optional count input. One run can now emit N prompts as
+         lists (OUTPUT_IS_LIST), chosen under the current mode, uniqueness
+         and shuffle-bag rules and distinct within the batch. count=1
+         behaves exactly as before.
+  1.4.2  Uniqueness history moved onto the shared yfg_random engine. Check,
+         remember and pruning are now O(1), so history_size=100000 no
+         longer slows every run down. Shuffle-bag draws are O(1) as well.
   1.4.1  Range bounds now report every clamp or inversion to the console
          instead of silently collapsing the pool. Tooltips document the
          behaviour, and the incremental_no_wrap end-of-range notice names
@@ -29,76 +112,662 @@ Changelog:
 
 from __future__ import annotations
 
+import io
 import os
 import re
+import bz2
+import csv
+import glob
+import gzip
+import lzma
 import json
+import math
+import bisect
+from array import array
+from collections import OrderedDict
 import time
 import hashlib
+import inspect
+import itertools
+import uuid
 import random
+import asyncio
 import platform
+import threading
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 
-NODE_VERSION = "1.4.1"
+from .yfg_random import (AliasTable, CounterRNG, RandomOrgError, StateStore, entropy_pool,
+                         history_store, random_org, resolve_worker, shard_size, shared_bag)
+
+NODE_VERSION = "1.16.9"
 
 # ─────────────────────────── file format ──────────────────────────────────────
 # Prompt file format:
 #   positive: text
 #   negative: text   (required field, may be empty)
 #   name: text       (optional, defaults to filename stem)
+#   weight: number   (optional, default 1 — relative odds in random mode)
 # Entries separated by one or more hyphens on their own line (any length).
 # Leading/trailing separator lines are silently ignored.
-
-_SEPARATOR_RE = re.compile(r'\n\s*-+\s*\n')
+#
+# Also accepted, one entry per record:
+#   .jsonl        {"positive": "...", "negative": "...", "name": "...", "weight": 2}
+#                 (a bare JSON string is taken as the positive prompt)
+#   .csv / .tsv   header row with positive / negative / name / weight columns
+# Any of the above may be gzip / bz2 / xz compressed (.txt.gz, .jsonl.xz, …).
+# Every format is read as a line stream, so compressed dumps are decoded on
+# the fly and never unpacked to disk or held in memory as one big string.
+
+_SEPARATOR_LINE_RE = re.compile(r"^\s*-+\s*$")
 _PROMPT_RE    = re.compile(
-    r"^(?:(?:positive:(?P<positive>.*?)|negative:(?P<negative>.*?)|name:(?P<name>.*?))\n*)+$",
+    r"^(?:(?:positive:(?P<positive>.*?)|negative:(?P<negative>.*?)|name:(?P<name>.*?)"
+    r"|weight:(?P<weight>.*?))\n*)+$",
     re.DOTALL | re.IGNORECASE,
 )
 
+_PROMPT_FORMATS = (".txt", ".jsonl", ".csv", ".tsv")
+_COMPRESSORS    = {".gz": gzip.open, ".bz2": bz2.open, ".xz": lzma.open}
+
+
+def _split_suffixes(filepath: str) -> Tuple[str, str, str]:
+    """'dump.jsonl.gz' -> ('dump', '.jsonl', '.gz'). Compression is '' if none."""
+    name = Path(filepath).name
+    base, comp = os.path.splitext(name)
+    if comp.lower() not in _COMPRESSORS:
+        base, comp = name, ""
+    stem, fmt = os.path.splitext(base)
+    return stem, fmt.lower(), comp.lower()
+
+
+def _is_prompt_file(filepath: str) -> bool:
+    return _split_suffixes(filepath)[1] in _PROMPT_FORMATS
+
+
+def _open_text(raw, filepath: str):
+    """Text stream over an open binary handle, decompressing if needed."""
+    opener = _COMPRESSORS.get(_split_suffixes(filepath)[2])
+    if opener is None:
+        return io.TextIOWrapper(raw, encoding="utf-8", newline="")
+    return opener(raw, "rt", encoding="utf-8", newline="")
+
+
+def _parse_weight(raw, fname: str) -> float:
+    """weight: value -> float >= 0. Blank means 1; bad values warn and use 1."""
+    if raw is None or str(raw).strip() == "":
+        return 1.0
+    try:
+        w = float(raw)
+    except (TypeError, ValueError):
+        print(f"[YFG] RandomPromptFromFile: ignoring invalid weight '{raw}' in '{fname}'")
+        return 1.0
+    if not math.isfinite(w) or w < 0:
+        print(f"[YFG] RandomPromptFromFile: weight '{raw}' in '{fname}' must be a "
+              f"finite number >= 0; using {0.0 if w < 0 else 1.0}")
+        return 0.0 if w < 0 else 1.0
+    return w
+
+
+def _tracked_lines(f, raw, progress: dict, every: int = 4096):
+    """Yield lines from *f*, publishing bytes read from disk into *progress*."""
+    base = progress.get("file_base", 0)
+    for n, line in enumerate(f):
+        if n % every == 0:
+            progress["bytes_done"] = base + raw.tell()
+        yield line
+
+
+# ─────────────────────────── full-text search ─────────────────────────────────
+# Search terms match whole words (case-insensitive) in an entry's positive
+# prompt or name. Each file gets an inverted index, token -> sorted posting
+# list of entry ids, built on first search and stored in that file's parse
+# cache entry, so it is dropped together with the parsed prompts whenever
+# the file changes.
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def _tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall(text.lower())
+
+
+def _intersect(postings: List[array]) -> List[int]:
+    """AND of sorted posting lists: walk the shortest, bisect into the rest."""
+    if not postings:
+        return []
+    postings = sorted(postings, key=len)
+    first, rest = postings[0], postings[1:]
+    out = []
+    for v in first:
+        for other in rest:
+            i = bisect.bisect_left(other, v)
+            if i == len(other) or other[i] != v:
+                break
+        else:
+            out.append(v)
+    return out
+
+
+# ─────────────────────────── prompt templates ─────────────────────────────────
+# Selected prompts may contain {a|b|c} alternations (nestable) and __name__
+# wildcard references, replaced by a random line of <wildcards_dir>/name.txt.
+# Text is compiled once into a small AST and the AST cached with the entry
+# (or wildcard file) it came from:
+#
+#   template := tuple of nodes
+#   node     := str                                  literal text
+#             | ("alt", (template, template, …))     one branch per pick
+#             | ("wild", "name")                     wildcard reference
+#
+# A brace group without a top-level "|" and an unclosed "{" stay literal, so
+# existing prompts that happen to contain braces come out unchanged.
+
+_WILDCARD_RE        = re.compile(r"__([\w.\-]+?(?:/[\w.\-]+?)*)__")
+_MAX_WILDCARD_DEPTH = 16
+
+
+def _compile_template(text: str) -> tuple:
+    if "{" not in text and "__" not in text:
+        return (text,) if text else ()
+    seq, _ = _compile_seq(text, 0, nested=False)
+    return seq
+
+
+def _compile_seq(text: str, pos: int, nested: bool) -> Tuple[tuple, int]:
+    """Nodes from *pos* up to the end, or (if nested) the next top-level | or }."""
+    nodes: list = []
+    lit:   List[str] = []
+
+    def flush():
+        if lit:
+            nodes.append("".join(lit))
+            lit.clear()
+
+    while pos < len(text):
+        c = text[pos]
+        if nested and c in "|}":
+            break
+        if c == "{":
+            alt = _compile_alt(text, pos)
+            if alt is not None:
+                flush()
+                nodes.append(alt[0])
+                pos = alt[1]
+                continue
+        elif c == "_":
+            m = _WILDCARD_RE.match(text, pos)
+            if m:
+                flush()
+                nodes.append(("wild", m.group(1)))
+                pos = m.end()
+                continue
+        lit.append(c)
+        pos += 1
+    flush()
+    return tuple(nodes), pos
+
+
+def _compile_alt(text: str, pos: int) -> Optional[Tuple[tuple, int]]:
+    """{a|b|…} starting at *pos* -> (("alt", branches), end), or None if literal."""
+    branches = []
+    pos += 1
+    while True:
+        seq, pos = _compile_seq(text, pos, nested=True)
+        branches.append(seq)
+        if pos >= len(text):
+            return None                     # unclosed {
+        if text[pos] == "}":
+            break
+        pos += 1                            # past |
+    if len(branches) < 2:
+        return None                         # {text} without | stays literal
+    return ("alt", tuple(branches)), pos + 1
+
+
+def _is_dynamic(template: tuple) -> bool:
+    return any(not isinstance(node, str) for node in template)
+
+
+def _find_wildcard(name: str, dirs: List[str]) -> Optional[str]:
+    if ".." in name.split("/"):
+        return None
+    for d in dirs:
+        path = os.path.join(d, *name.split("/")) + ".txt"
+        if os.path.isfile(path):
+            return path
+    return None
+
+
+_MISSING_WILDCARDS: set = set()
+
+
+def _expand_template(template: tuple, rng, dirs: List[str], depth: int = 0) -> str:
+    out = []
+    for node in template:
+        if isinstance(node, str):
+            out.append(node)
+        elif node[0] == "alt":
+            out.append(_expand_template(rng.choice(node[1]), rng, dirs, depth))
+        else:
+            name    = node[1]
+            path    = _find_wildcard(name, dirs)
+            options = _PromptFileCache.wildcard(path) if path else None
+            if not options or depth >= _MAX_WILDCARD_DEPTH:
+                if name not in _MISSING_WILDCARDS:
+                    _MISSING_WILDCARDS.add(name)
+                    why = ("nesting is too deep (cycle?)" if options
+                           else f"no non-empty {name}.txt in {dirs}")
+                    print(f"[YFG] RandomPromptFromFile: leaving __{name}__ as-is — {why}")
+                out.append(f"__{name}__")
+            else:
+                out.append(_expand_template(rng.choice(options), rng, dirs, depth + 1))
+    return "".join(out)
+
+
 # ─────────────────────────── prompt file cache ────────────────────────────────
 
 class _PromptFileCache:
-    """Parses and caches prompt files. Re-parses only when file mtime changes."""
+    """
+    Parses and caches prompt files. Re-parses only when file mtime changes.
+
+    Each file has one entry holding everything derived from it (prompts,
+    weights, search index, compiled templates, wildcard options), filled in
+    lazily and dropped together when the mtime moves.
+    """
     _cache: Dict[str, dict] = {}
 
     @classmethod
-    def load(cls, filepath: str) -> List[Tuple[str, str, str]]:
+    def _entry(cls, filepath: str) -> Optional[dict]:
+        """Cache entry for the file's current mtime (a fresh one if it changed)."""
         try:
             mtime = os.path.getmtime(filepath)
         except OSError:
+            return None
+        cached = cls._cache.get(filepath)
+        if cached is None or cached["mtime"] != mtime:
+            cached = cls._cache[filepath] = {"mtime": mtime}
+        return cached
+
+    @classmethod
+    def load(cls, filepath: str, progress: Optional[dict] = None) -> List[Tuple[str, str, str]]:
+        cached = cls._entry(filepath)
+        if cached is None:
             return []
+        if "prompts" not in cached:
+            prompts, weights = cls._parse(filepath, progress)
+            cached.update(prompts=prompts, weights=weights)
+            print(f"[YFG] RandomPromptFromFile: parsed {len(prompts)} prompts from '{Path(filepath).name}'")
+        return cached["prompts"]
+
+    @classmethod
+    def index(cls, filepath: str) -> Dict[str, array]:
+        """Inverted index for a file, built lazily and cached with its prompts."""
+        prompts = cls.load(filepath)
+        cached  = cls._cache.get(filepath)
+        if cached is None:
+            return {}
+        inv = cached.get("index")
+        if inv is None:
+            postings: Dict[str, list] = {}
+            for i, entry in enumerate(prompts):
+                for tok in set(_tokenize(entry[0])) | set(_tokenize(entry[2])):
+                    postings.setdefault(tok, []).append(i)
+            inv = {tok: array("I", ids) for tok, ids in postings.items()}
+            cached["index"] = inv
+        return inv
+
+    @classmethod
+    def weights(cls, filepath: str) -> Optional[array]:
+        """Per-entry weights, or None when every entry has the default weight."""
+        cls.load(filepath)
         cached = cls._cache.get(filepath)
-        if cached and cached["mtime"] == mtime:
-            return cached["prompts"]
-        prompts = cls._parse(filepath)
-        cls._cache[filepath] = {"mtime": mtime, "prompts": prompts}
-        print(f"[YFG] RandomPromptFromFile: parsed {len(prompts)} prompts from '{Path(filepath).name}'")
-        return prompts
+        return cached.get("weights") if cached else None
+
+    @classmethod
+    def alias(cls, filepath: str) -> Optional[AliasTable]:
+        """Whole-file alias table, built once and cached with its prompts."""
+        weights = cls.weights(filepath)
+        cached  = cls._cache.get(filepath)
+        if weights is None or cached is None:
+            return None
+        if "alias" not in cached:
+            try:
+                cached["alias"] = AliasTable(weights)
+            except ValueError:
+                cached["alias"] = None
+        return cached["alias"]
+
+    @classmethod
+    def templates(cls, filepath: str, local: int) -> Tuple[tuple, tuple]:
+        """Compiled (positive, negative) templates for one entry, cached per entry."""
+        prompts = cls.load(filepath)
+        cached  = cls._cache.get(filepath)
+        compiled = cached.setdefault("templates", {}) if cached else {}
+        hit = compiled.get(local)
+        if hit is None:
+            positive, negative, _ = prompts[local]
+            hit = compiled[local] = (_compile_template(positive), _compile_template(negative))
+        return hit
+
+    @classmethod
+    def wildcard(cls, filepath: str) -> List[tuple]:
+        """Compiled options of a wildcard file: one per non-blank, non-# line."""
+        cached = cls._entry(filepath)
+        if cached is None:
+            return []
+        if "options" not in cached:
+            options = []
+            try:
+                with open(filepath, "rb") as raw, _open_text(raw, filepath) as f:
+                    for line in f:
+                        line = line.strip()
+                        if line and not line.startswith("#"):
+                            options.append(_compile_template(line))
+            except Exception as e:
+                print(f"[YFG] RandomPromptFromFile: cannot read wildcard '{filepath}': {e}")
+            cached["options"] = options
+        return cached["options"]
 
     @classmethod
-    def _parse(cls, filepath: str) -> List[Tuple[str, str, str]]:
+    def _parse(cls, filepath: str, progress: Optional[dict] = None):
+        """(prompts, weights); weights is None if the file sets no weight other than 1."""
+        stem, fmt, _ = _split_suffixes(filepath)
+        reader = {".jsonl": cls._read_jsonl, ".csv": cls._read_csv,
+                  ".tsv": cls._read_csv}.get(fmt, cls._read_blocks)
+        prompts: List[Tuple[str, str, str]] = []
+        weights = array("d")
         try:
-            with open(filepath, "r", encoding="utf-8") as f:
-                data = f.read()
+            with open(filepath, "rb") as raw, _open_text(raw, filepath) as f:
+                lines = f if progress is None else _tracked_lines(f, raw, progress)
+                for positive, negative, name, weight in reader(lines, fmt, stem, Path(filepath).name):
+                    prompts.append((positive, negative, name))
+                    weights.append(weight)
         except Exception as e:
             print(f"[YFG] RandomPromptFromFile: cannot read '{filepath}': {e}")
-            return []
-        blocks  = _SEPARATOR_RE.split(data)
-        prompts = []
-        stem    = Path(filepath).stem
-        for block in blocks:
-            block = block.strip()
+            return [], None
+        if all(w == 1.0 for w in weights):
+            weights = None
+        return prompts, weights
+
+    @staticmethod
+    def _read_blocks(f, fmt: str, stem: str, fname: str):
+        """positive:/negative:/name: blocks separated by hyphen lines."""
+        def finish(lines):
+            block = "\n".join(lines).strip()
             if not block:
-                continue
+                return None
             m = _PROMPT_RE.search(block)
-            if m:
-                positive = (m.group("positive") or "").strip()
-                negative = (m.group("negative") or "").strip()
-                name     = (m.group("name")     or "").strip() or stem
-                prompts.append((positive, negative, name))
+            if not m:
+                print(f"[YFG] RandomPromptFromFile: skipping unrecognized block in '{fname}'")
+                return None
+            positive = (m.group("positive") or "").strip()
+            negative = (m.group("negative") or "").strip()
+            name     = (m.group("name")     or "").strip() or stem
+            return positive, negative, name, _parse_weight(m.group("weight"), fname)
+
+        lines: List[str] = []
+        for line in f:
+            line = line.rstrip("\r\n")
+            if _SEPARATOR_LINE_RE.match(line):
+                entry = finish(lines)
+                if entry:
+                    yield entry
+                lines = []
             else:
-                print(f"[YFG] RandomPromptFromFile: skipping unrecognized block in '{Path(filepath).name}'")
-        return prompts
+                lines.append(line)
+        entry = finish(lines)
+        if entry:
+            yield entry
+
+    @staticmethod
+    def _read_jsonl(f, fmt: str, stem: str, fname: str):
+        for lineno, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                rec = json.loads(line)
+            except ValueError:
+                print(f"[YFG] RandomPromptFromFile: skipping invalid JSON on line {lineno} of '{fname}'")
+                continue
+            if isinstance(rec, str):
+                rec = {"positive": rec}
+            if not isinstance(rec, dict):
+                print(f"[YFG] RandomPromptFromFile: skipping non-object on line {lineno} of '{fname}'")
+                continue
+            yield (str(rec.get("positive") or "").strip(),
+                   str(rec.get("negative") or "").strip(),
+                   str(rec.get("name") or "").strip() or stem,
+                   _parse_weight(rec.get("weight"), fname))
+
+    @staticmethod
+    def _read_csv(f, fmt: str, stem: str, fname: str):
+        rows   = csv.reader(f, delimiter="\t" if fmt == ".tsv" else ",")
+        header = [h.strip().lower() for h in next(rows, [])]
+        if "positive" not in header:
+            print(f"[YFG] RandomPromptFromFile: '{fname}' has no 'positive' column header")
+            return
+        cols = {k: header.index(k) for k in ("positive", "negative", "name", "weight") if k in header}
+
+        def cell(row, key):
+            i = cols.get(key)
+            return row[i].strip() if i is not None and i < len(row) else ""
+
+        for row in rows:
+            if not any(c.strip() for c in row):
+                continue
+            yield (cell(row, "positive"), cell(row, "negative"), cell(row, "name") or stem,
+                   _parse_weight(cell(row, "weight"), fname))
+
+
+# ─────────────────────────── prompt pool ──────────────────────────────────────
+# prompt_file may name a single file, a directory (every prompt file directly
+# inside it, in any supported format) or a glob such as "D:/prompts/**/*.txt".
+# Each matching file is still parsed and cached on its own by _PromptFileCache; the pool is just a
+# merged global index over them, so editing one file re-parses only that file.
+
+def _natural_key(s: str):
+    """Natural sort key that avoids comparing ints vs strs."""
+    return [(0, int(t)) if t.isdigit() else (1, t.lower()) for t in re.findall(r"\d+|\D+", s)]
+
+
+def _is_glob(source: str) -> bool:
+    return any(c in source for c in "*?[")
+
+
+class _PromptPool:
+    """Global index over one or more cached prompt files."""
+    _cache: Dict[str, "_PromptPool"] = {}
+
+    def __init__(self, source: str, parts: List[Tuple[str, float, list]]):
+        self.source    = source
+        self.signature = tuple((path, mtime) for path, mtime, _ in parts)
+        self.paths: List[str]  = []
+        self.starts: List[int] = []     # global index of each file's first entry
+        self._lists: List[list] = []
+        total = 0
+        for path, _, prompts in parts:
+            if not prompts:
+                continue
+            self.paths.append(path)
+            self.starts.append(total)
+            self._lists.append(prompts)
+            total += len(prompts)
+        self.total = total
+        self.fingerprint = self._fingerprint(self.paths)
+        # Recent search results, query terms -> matching global ids
+        self._queries: "OrderedDict[tuple, List[int]]" = OrderedDict()
+        # Weighted sampling: per-file weights (None = all 1) and alias
+        # sub-tables memoized per (lo, hi)
+        self._weights = [_PromptFileCache._cache.get(p, {}).get("weights") for p in self.paths]
+        self.weighted = any(w is not None for w in self._weights)
+        self._tables: "OrderedDict[tuple, Optional[AliasTable]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return self.total
+
+    _SAMPLE_BYTES = 64 * 1024
+
+    @classmethod
+    def _fingerprint(cls, paths: List[str]) -> str:
+        """
+        Cheap content fingerprint: size plus the first and last 64 KB of each
+        file. Touching a file keeps it; editing, appending or swapping files
+        changes it, which resets any saved cursor for the pool.
+        """
+        h = hashlib.sha1()
+        for path in paths:
+            try:
+                size = os.path.getsize(path)
+                h.update(f"{Path(path).name}|{size}|".encode("utf-8"))
+                with open(path, "rb") as f:
+                    h.update(f.read(cls._SAMPLE_BYTES))
+                    if size > cls._SAMPLE_BYTES:
+                        f.seek(max(cls._SAMPLE_BYTES, size - cls._SAMPLE_BYTES))
+                        h.update(f.read(cls._SAMPLE_BYTES))
+            except OSError:
+                h.update(path.encode("utf-8"))
+        return h.hexdigest()[:16]
+
+    def locate(self, idx: int) -> Tuple[int, int]:
+        """Global index -> (file number, index within that file)."""
+        f = bisect.bisect_right(self.starts, idx) - 1
+        return f, idx - self.starts[f]
+
+    def entry(self, idx: int) -> Tuple[str, str, str]:
+        f, local = self.locate(idx)
+        return self._lists[f][local]
+
+    def file_of(self, idx: int) -> str:
+        return self.paths[self.locate(idx)[0]]
+
+    def templates(self, idx: int) -> Tuple[tuple, tuple]:
+        f, local = self.locate(idx)
+        return _PromptFileCache.templates(self.paths[f], local)
+
+    _MAX_CACHED_QUERIES = 64
+
+    def search(self, query: str) -> List[int]:
+        """Sorted global ids of entries containing every term in *query*."""
+        terms = tuple(sorted(set(_tokenize(query))))
+        if not terms:
+            return []
+        hit = self._queries.get(terms)
+        if hit is not None:
+            self._queries.move_to_end(terms)
+            return hit
+        matches: List[int] = []
+        for path, start in zip(self.paths, self.starts):
+            inv      = _PromptFileCache.index(path)
+            postings = [inv.get(t) for t in terms]
+            if all(p is not None for p in postings):
+                matches.extend(start + i for i in _intersect(postings))
+        self._queries[terms] = matches
+        if len(self._queries) > self._MAX_CACHED_QUERIES:
+            self._queries.popitem(last=False)
+        return matches
+
+    _MAX_CACHED_TABLES = 16
+
+    def alias(self, lo: int, hi: int, offset: int = 0, step: int = 1) -> Optional[AliasTable]:
+        """
+        Alias table over global entries lo+offset, lo+offset+step, … <= hi,
+        or None if the pool carries no weights (or every weight there is 0).
+        The whole-file table lives in the parse cache; narrower ranges,
+        worker shards and multi-file pools get sub-tables built on first use
+        and memoized here, so a pool rebuilt after a file change drops them.
+        """
+        if not self.weighted:
+            return None
+        key = (lo, hi, offset, step)
+        if key in self._tables:
+            self._tables.move_to_end(key)
+            return self._tables[key]
+        if len(self.paths) == 1 and lo == 0 and hi == self.total - 1 and step == 1:
+            return _PromptFileCache.alias(self.paths[0])
+        try:
+            weights = self._range_weights(lo, hi)
+            if step > 1:
+                weights = itertools.islice(weights, offset, None, step)
+            table = AliasTable(weights)
+        except ValueError:
+            table = None
+        self._tables[key] = table
+        if len(self._tables) > self._MAX_CACHED_TABLES:
+            self._tables.popitem(last=False)
+        return table
+
+    def _range_weights(self, lo: int, hi: int):
+        f, local = self.locate(lo)
+        idx = lo
+        while idx <= hi:
+            n       = min(len(self._lists[f]) - local, hi - idx + 1)
+            weights = self._weights[f]
+            if weights is None:
+                yield from (1.0 for _ in range(n))
+            else:
+                yield from weights[local:local + n]
+            idx  += n
+            f, local = f + 1, 0
+
+    @staticmethod
+    def resolve_files(source: str) -> List[str]:
+        source = (source or "").strip()
+        if not source:
+            return []
+        if os.path.isfile(source):
+            return [source]
+        if os.path.isdir(source):
+            try:
+                names = [e.path for e in os.scandir(source)
+                         if e.is_file() and _is_prompt_file(e.name)]
+            except OSError:
+                return []
+        elif _is_glob(source):
+            names = [p for p in glob.glob(source, recursive=True)
+                     if os.path.isfile(p) and _is_prompt_file(p)]
+        else:
+            return []
+        names.sort(key=_natural_key)
+        return names
+
+    @classmethod
+    def peek(cls, source: str) -> Optional["_PromptPool"]:
+        """The cached pool for *source* if it is still current, without parsing."""
+        cached = cls._cache.get(source)
+        if cached is None:
+            return None
+        signature = []
+        for path in cls.resolve_files(source):
+            try:
+                signature.append((path, os.path.getmtime(path)))
+            except OSError:
+                return None
+        return cached if tuple(signature) == cached.signature else None
+
+    @classmethod
+    def load(cls, source: str, progress: Optional[dict] = None) -> "_PromptPool":
+        parts = []
+        for path in cls.resolve_files(source):
+            prompts = _PromptFileCache.load(path, progress)
+            mtime   = _PromptFileCache._cache.get(path, {}).get("mtime")
+            parts.append((path, mtime, prompts))
+            if progress is not None:
+                try:
+                    progress["file_base"] = progress.get("file_base", 0) + os.path.getsize(path)
+                except OSError:
+                    pass
+                progress["bytes_done"] = progress.get("file_base", 0)
+        signature = tuple((path, mtime) for path, mtime, _ in parts)
+        cached = cls._cache.get(source)
+        if cached is not None and cached.signature == signature:
+            return cached
+        pool = cls(source, parts)
+        cls._cache[source] = pool
+        if len(pool.paths) > 1:
+            print(f"[YFG] RandomPromptFromFile: indexed {pool.total} prompts "
+                  f"across {len(pool.paths)} files for '{source}'")
+        return pool
 
 
 # ─────────────────────────── file history ─────────────────────────────────────
@@ -155,76 +824,148 @@ class _FileHistory:
             print(f"[YFG] FileHistory.clear error: {e}")
 
 
+# ─────────────────────────── durable state ────────────────────────────────────
+# Incremental cursors and shuffle-bag positions, keyed by mode, resolved file,
+# content fingerprint and range, persisted with batched writes so a long walk
+# through a big file resumes exactly where it stopped after a restart.
+
+_STATE = StateStore(str(Path(__file__).with_name(".cache") / "yfg_prompt_state.json"),
+                    legacy=str(Path(__file__).with_name("yfg_prompt_state.json")))
+
+
+class _NeedsDraw(Exception):
+    """A selection that can't be planned ahead without consuming history or the shuffle bag."""
+
+
 # ─────────────────────────── shuffle bag ──────────────────────────────────────
 
 class _ShuffleBag:
+    """
+    Shuffle-bag over lo..hi. Each bag is a seeded permutation plus a read
+    position, so its durable state is a few small ints however large the
+    range is. After a restart the permutation is re-dealt from the saved seed
+    and the walk resumes at the saved position. Values handed back with
+    put_back() wait in "front" and are dealt before the rest of the cycle.
+    """
     MAX_BAG_SIZE = 200_000
     _bags: Dict[str, dict] = {}
+    _shared = shared_bag("prompt")     # set when YFG_STATE_DB is configured
 
     @classmethod
     def can_use(cls, lo: int, hi: int) -> bool:
         return 1 <= (hi - lo + 1) <= cls.MAX_BAG_SIZE
 
-    @classmethod
-    def _get_bag(cls, key: str) -> dict:
-        if key not in cls._bags:
-            cls._bags[key] = {"remaining": [], "last_lo": None, "last_hi": None}
-        return cls._bags[key]
+    @staticmethod
+    def _deal(lo: int, hi: int, seed: Optional[int] = None, pos: int = 0) -> dict:
+        if seed is None:
+            seed = random.SystemRandom().getrandbits(64)
+        order = list(range(lo, hi + 1))
+        random.Random(seed).shuffle(order)
+        return {"lo": lo, "hi": hi, "seed": seed, "pos": pos, "order": order, "front": []}
+
+    @staticmethod
+    def _save(bag_key: str, bag: dict):
+        _STATE.set(bag_key, {"lo": bag["lo"], "hi": bag["hi"], "seed": bag["seed"],
+                             "pos": bag["pos"], "front": list(bag["front"])})
 
     @classmethod
     def next_value(cls, bag_key: str, lo: int, hi: int) -> int:
-        bag = cls._get_bag(bag_key)
-        if bag["last_lo"] != lo or bag["last_hi"] != hi or not bag["remaining"]:
-            values = list(range(lo, hi + 1))
-            random.SystemRandom().shuffle(values)
-            bag["remaining"] = values
-            bag["last_lo"]   = lo
-            bag["last_hi"]   = hi
-        return int(bag["remaining"].pop(0))
+        if cls._shared is not None:
+            return cls._shared.next_value(bag_key, lo, hi)
+        bag = cls._bags.get(bag_key)
+        if bag is None or bag["lo"] != lo or bag["hi"] != hi:
+            saved = _STATE.get(bag_key)
+            if isinstance(saved, dict) and saved.get("lo") == lo and saved.get("hi") == hi:
+                bag = cls._deal(lo, hi, int(saved["seed"]), int(saved["pos"]))
+                bag["front"] = [int(v) for v in saved.get("front", ()) if lo <= int(v) <= hi]
+            else:
+                bag = cls._deal(lo, hi)
+            cls._bags[bag_key] = bag
+        if bag["front"]:
+            value = bag["front"].pop(0)
+        else:
+            if bag["pos"] >= len(bag["order"]):
+                bag = cls._bags[bag_key] = cls._deal(lo, hi)
+            value = bag["order"][bag["pos"]]
+            bag["pos"] += 1
+        cls._save(bag_key, bag)
+        return int(value)
+
+    @classmethod
+    def put_back(cls, bag_key: str, lo: int, hi: int, values: List[int]):
+        """Return dealt but unused *values*; they are dealt next, in order, once each."""
+        if not values:
+            return
+        if cls._shared is not None:
+            cls._shared.put_back(bag_key, lo, hi, values)
+            return
+        bag = cls._bags.get(bag_key)
+        if bag is None or bag["lo"] != lo or bag["hi"] != hi:
+            return
+        front = list(dict.fromkeys(int(v) for v in values))
+        bag["front"] = front + [v for v in bag["front"] if v not in front]
+        cls._save(bag_key, bag)
 
 
 # ─────────────────────────── uniqueness history ────────────────────────────────
+# Shared O(1) engine (yfg_random/history.py); this node owns its own store so
+# its scope keys never mix with the image or number nodes. With YFG_STATE_DB
+# set, the store lives in that SQLite database and is shared by every
+# ComfyUI process on the host (yfg_random/shared.py).
 
-class _UniqueHistory:
-    _caches: Dict[str, dict] = {}
+_UNIQUE_HISTORY = history_store("prompt")
 
-    @classmethod
-    def _cache(cls, key: str) -> dict:
-        if key not in cls._caches:
-            cls._caches[key] = {"map": {}, "order": []}
-        return cls._caches[key]
+
+# ─────────────────────────── background counting ──────────────────────────────
+# Parsing a multi-GB prompt dump takes long enough that doing it inside an
+# aiohttp handler would stall the whole server (websocket previews
+# included). /yfg/prompt_count therefore always parses in an executor, and
+# for large sources answers 202 with a job id the browser polls for
+# progress. The job fills the normal parse cache, so later requests for the
+# same source are answered straight from it.
+
+class _CountJobs:
+    LARGE_BYTES   = 32 * 1024 * 1024
+    _MAX_JOBS     = 64
+    _jobs: "OrderedDict[str, dict]" = OrderedDict()
+    _by_source: Dict[str, str] = {}
+    _lock = threading.Lock()
 
     @classmethod
-    def is_duplicate(cls, value: int, scope: str, history_size: int, time_window: int) -> bool:
-        now = time.time()
-        c   = cls._cache(scope)
-        cls._prune(c, history_size, time_window)
-        ts  = c["map"].get(value)
-        if ts is None:
-            return False
-        if time_window > 0 and (now - ts) > time_window:
-            return False
-        return True
+    def start(cls, loop, source: str, total_bytes: int) -> dict:
+        with cls._lock:
+            jid = cls._by_source.get(source)
+            job = cls._jobs.get(jid) if jid else None
+            if job and job["state"] == "running":
+                return job      # same source already counting — share it
+            jid = uuid.uuid4().hex[:12]
+            job = {"job": jid, "path": source, "state": "running",
+                   "bytes_done": 0, "bytes_total": int(total_bytes)}
+            cls._jobs[jid] = job
+            cls._by_source[source] = jid
+            while len(cls._jobs) > cls._MAX_JOBS:
+                cls._jobs.popitem(last=False)
+        loop.run_in_executor(None, cls._run, job)
+        return job
 
     @classmethod
-    def remember(cls, value: int, scope: str, history_size: int):
-        c = cls._cache(scope)
-        c["map"][value] = time.time()
-        c["order"].append(value)
-        cls._prune(c, history_size, 0)
+    def _run(cls, job: dict):
+        try:
+            pool = _PromptPool.load(job["path"], progress=job)
+            job.update(count=len(pool), files=len(pool.signature),
+                       bytes_done=job["bytes_total"], state="done")
+        except Exception as e:
+            job.update(state="error", error=str(e))
+            print(f"[YFG] RandomPromptFromFile: counting '{job['path']}' failed: {e}")
 
     @classmethod
-    def _prune(cls, c: dict, history_size: int, time_window: int):
-        while len(c["order"]) > history_size:
-            old = c["order"].pop(0)
-            c["map"].pop(old, None)
-        if time_window > 0:
-            now = time.time()
-            for v in list(c["order"]):
-                ts = c["map"].get(v)
-                if ts and (now - ts) > time_window:
-                    c["order"].remove(v)
-                    c["map"].pop(v, None)
+    def get(cls, jid: str) -> Optional[dict]:
+        return cls._jobs.get(jid)
+
+    @staticmethod
+    def public(job: dict) -> dict:
+        keys = ("job", "state", "bytes_done", "bytes_total", "count", "files", "error")
+        return {k: job[k] for k in keys if k in job}
 
 
 # ─────────────────────────── API routes ───────────────────────────────────────
@@ -293,7 +1034,7 @@ try:
     @PromptServer.instance.routes.get("/yfg/file_browse")
     @_yfg_local_only
     async def _yfg_browse_files(request):
-        """Navigator that returns both subdirectories and .txt files."""
+        """Navigator that returns both subdirectories and prompt files."""
         path        = request.query.get("path", "").strip()
         show_hidden = request.query.get("show_hidden", "false").lower() == "true"
         try:
@@ -329,7 +1070,7 @@ try:
                         continue
                     if item.is_dir():
                         dirs.append({"name": item.name, "path": str(item), "type": "dir"})
-                    elif item.is_file() and item.suffix.lower() == ".txt":
+                    elif item.is_file() and _is_prompt_file(item.name):
                         files.append({"name": item.name, "path": str(item), "type": "file"})
             except PermissionError:
                 pass
@@ -348,15 +1089,186 @@ try:
     @PromptServer.instance.routes.get("/yfg/prompt_count")
     @_yfg_local_only
     async def _yfg_prompt_count(request):
-        """Returns total valid prompt count for a file (uses parse cache)."""
+        """
+        Total valid prompt count for a file, directory or glob.
+
+        Served from the parse cache when current. Otherwise small sources are
+        parsed in an executor and answered directly; large ones get 202 with
+        a job id, and ?job=<id> reports bytes_done / bytes_total until done.
+        """
+        job_id = request.query.get("job", "").strip()
+        if job_id:
+            job = _CountJobs.get(job_id)
+            if job is None:
+                return _aio_web.json_response({"error": f"Unknown job: {job_id}"}, status=404)
+            return _aio_web.json_response(_CountJobs.public(job),
+                                          status=202 if job["state"] == "running" else 200)
+
         filepath = request.query.get("path", "").strip()
-        if not filepath or not Path(filepath).exists():
+        pool     = _PromptPool.peek(filepath)
+        if pool is not None:
+            return _aio_web.json_response({"count": len(pool), "files": len(pool.signature)})
+
+        files = _PromptPool.resolve_files(filepath)
+        if not files:
             return _aio_web.json_response({"count": 0, "error": "File not found"})
-        prompts = _PromptFileCache.load(filepath)
-        return _aio_web.json_response({"count": len(prompts)})
+        total_bytes = 0
+        for f in files:
+            try:
+                total_bytes += os.path.getsize(f)
+            except OSError:
+                pass
+
+        loop = asyncio.get_running_loop()
+        if total_bytes < _CountJobs.LARGE_BYTES:
+            pool = await loop.run_in_executor(None, _PromptPool.load, filepath)
+            return _aio_web.json_response({"count": len(pool), "files": len(pool.signature)})
+        job = _CountJobs.start(loop, filepath, total_bytes)
+        return _aio_web.json_response(_CountJobs.public(job), status=202)
+
+    @PromptServer.instance.routes.get("/yfg/prompt_search")
+    @_yfg_local_only
+    async def _yfg_prompt_search(request):
+        """Entries matching every term in q (inverted index, cached per file)."""
+        filepath = request.query.get("path", "").strip()
+        query    = request.query.get("q", "")
+        try:
+            limit  = max(1, min(int(request.query.get("limit", 100)), 1000))
+            offset = max(0, int(request.query.get("offset", 0)))
+        except ValueError:
+            return _aio_web.json_response({"error": "limit/offset must be integers"}, status=400)
+        loop = asyncio.get_running_loop()
+        pool = await loop.run_in_executor(None, _PromptPool.load, filepath)
+        if not pool.signature:
+            return _aio_web.json_response({"count": 0, "matches": [], "error": "File not found"})
+        ids     = await loop.run_in_executor(None, pool.search, query)
+        matches = []
+        for idx in ids[offset:offset + limit]:
+            entry = pool.entry(idx)
+            matches.append({
+                "index":    idx,
+                "name":     entry[2],
+                "positive": entry[0][:200],
+                "file":     Path(pool.file_of(idx)).name,
+            })
+        return _aio_web.json_response({"count": len(ids), "matches": matches})
+
+    async def _yfg_validate_prompt(prompt_id: str, prompt: dict):
+        """execution.validate_prompt across ComfyUI versions (sync or async)."""
+        import execution
+        n = len(inspect.signature(execution.validate_prompt).parameters)
+        args = (prompt_id, prompt, None) if n >= 3 else (prompt_id, prompt) if n == 2 else (prompt,)
+        result = execution.validate_prompt(*args)
+        return await result if inspect.isawaitable(result) else result
+
+    def _yfg_queue_item(number: int, prompt_id: str, prompt: dict, extra_data: dict,
+                        outputs: list, created: int) -> tuple:
+        """
+        The queue item /prompt would build for this job. Versions that split
+        out execution.SENSITIVE_EXTRA_DATA_KEYS queue a sixth "sensitive"
+        field; older ones queue five.
+        """
+        import execution
+        extra_data = dict(extra_data)
+        keys = getattr(execution, "SENSITIVE_EXTRA_DATA_KEYS", None)
+        sensitive = {k: extra_data.pop(k) for k in (keys or ()) if k in extra_data}
+        extra_data["create_time"] = created
+        if keys is None:
+            return (number, prompt_id, prompt, extra_data, outputs)
+        return (number, prompt_id, prompt, extra_data, outputs, sensitive)
+
+    @PromptServer.instance.routes.post("/yfg/prompt_file/enqueue")
+    @_yfg_local_only
+    async def _yfg_prompt_file_enqueue(request):
+        """
+        Queue one job per entry lo, lo+stride, … hi of a workflow's prompt
+        node in a single call, each with its entry pinned (by_index) or its
+        text baked in, so no job depends on a cursor.
+
+        Body: {"prompt": <API workflow>, "node_id", "file", "lo", "hi",
+        "stride", "mode": "pin"|"bake", "client_id", "extra_data"}.
+        Every job is validated like a /prompt submission; if any fails,
+        nothing is queued.
+        """
+        try:
+            data = await request.json()
+        except Exception:
+            return _aio_web.json_response({"error": "Body must be JSON"}, status=400)
+        prompt = data.get("prompt")
+        if not isinstance(prompt, dict):
+            return _aio_web.json_response({"error": "prompt must be an API-format workflow"}, status=400)
+        mode = data.get("mode", "pin")
+        if mode not in ENQUEUE_MODES:
+            return _aio_web.json_response({"error": f"mode must be one of {ENQUEUE_MODES}"}, status=400)
+        try:
+            lo     = int(data.get("lo", 0))
+            hi     = int(data.get("hi", -1))
+            stride = int(data.get("stride", 1))
+        except (TypeError, ValueError):
+            return _aio_web.json_response({"error": "lo/hi/stride must be integers"}, status=400)
+        if stride < 1:
+            return _aio_web.json_response({"error": "stride must be at least 1"}, status=400)
+
+        loop = asyncio.get_running_loop()
+        try:
+            node_id = _find_prompt_node(prompt, str(data.get("node_id") or ""))
+            jobs, idxs = await loop.run_in_executor(
+                None, _enqueue_jobs, prompt, node_id, lo, hi, stride, mode,
+                str(data.get("file") or "").strip())
+        except ValueError as e:
+            return _aio_web.json_response({"error": str(e)}, status=400)
+        except Exception as e:
+            return _aio_web.json_response({"error": str(e)}, status=500)
+
+        server  = PromptServer.instance
+        trigger = getattr(server, "trigger_on_prompt", None)
+        extra   = dict(data.get("extra_data") or {})
+        if "client_id" in data:
+            extra["client_id"] = data["client_id"]
+
+        # Same order as /prompt: on-prompt hooks first, then validation
+        batch = []
+        for job in jobs:
+            payload = {"prompt": job, "extra_data": dict(extra)}
+            if "client_id" in data:
+                payload["client_id"] = data["client_id"]
+            if trigger is not None:
+                payload = trigger(payload)
+            batch.append((str(uuid.uuid4()), payload))
+
+        # Pinned or baked inputs differ per job, so each is validated on its
+        # own and keeps its own output list
+        outputs = []
+        for k, (prompt_id, payload) in enumerate(batch):
+            valid = await _yfg_validate_prompt(prompt_id, payload["prompt"])
+            if not valid[0]:
+                return _aio_web.json_response(
+                    {"error": valid[1], "node_errors": valid[3] if len(valid) > 3 else {},
+                     "job": k, "index": idxs[k]}, status=400)
+            outputs.append(valid[2])
+
+        # No await from here on, so server.number can't interleave with
+        # another request's jobs
+        created = int(time.time() * 1000)
+        for (prompt_id, payload), job_outputs in zip(batch, outputs):
+            number = server.number
+            server.number += 1
+            server.prompt_queue.put(_yfg_queue_item(
+                number, prompt_id, payload["prompt"], payload.get("extra_data") or {},
+                job_outputs, created))
+
+        done = "pinned" if mode == "pin" else "baked"
+        print(f"[YFG] RandomPromptFromFile: queued {len(batch)} {done} jobs "
+              f"for indices {idxs[0]}..{idxs[-1]} (stride {stride})")
+        return _aio_web.json_response({
+            "queued":     len(batch),
+            "indices":    idxs,
+            "prompt_ids": [prompt_id for prompt_id, _ in batch],
+        })
 
     print("[YFG] RandomPromptFromFile: API routes registered "
-          "(/yfg/file_history, /yfg/file_browse, /yfg/prompt_count)")
+          "(/yfg/file_history, /yfg/file_browse, /yfg/prompt_count, /yfg/prompt_search, "
+          "/yfg/prompt_file/enqueue)")
 
 except Exception as _api_err:
     print(f"[YFG] RandomPromptFromFile: Could not register API routes — {_api_err}")
@@ -364,48 +1276,14 @@ except Exception as _api_err:
 
 # ─────────────────────────── random.org helpers ───────────────────────────────
 
-def _load_api_key() -> Optional[str]:
-    ev = os.environ.get("RANDOM_ORG_API_KEY", "").strip()
-    if ev:
-        return ev
-    fp = Path(__file__).with_name("random_org_api_key.json")
-    if fp.exists():
-        try:
-            return json.loads(fp.read_text())["api_key"].strip()
-        except Exception:
-            pass
-    return None
-
-
-def _random_org_int(api_key: str, lo: int, hi: int) -> Optional[int]:
-    try:
-        import requests
-        payload = {
-            "jsonrpc": "2.0", "method": "generateIntegers",
-            "params": {"apiKey": api_key, "n": 1, "min": lo, "max": hi,
-                       "replacement": True, "base": 10},
-            "id": 1,
-        }
-        r = requests.post(
-            "https://api.random.org/json-rpc/2/invoke",
-            headers={"Content-Type": "application/json"},
-            data=json.dumps(payload), timeout=10,
-        )
-        if r.status_code == 200:
-            return int(r.json()["result"]["random"]["data"][0])
-    except Exception:
-        pass
-    return None
-
-
 def _rand_int(lo: int, hi: int, source: str) -> int:
     if source == "local":
         return random.randint(lo, hi)
-    api_key = _load_api_key()
-    if api_key and source in ("random_org", "auto"):
-        result = _random_org_int(api_key, lo, hi)
-        if result is not None:
-            return result
+    if source in ("random_org", "auto") and random_org().api_key():
+        try:
+            return entropy_pool().randint(lo, hi)
+        except RandomOrgError:
+            pass
     return random.randint(lo, hi)
 
 
@@ -425,12 +1303,16 @@ class YFGRandomPromptFromFile:
 
     DESCRIPTION = (
         f"YFG Random Prompt From File (v{NODE_VERSION})\n\n"
-        "Selects a prompt from a .txt prompt file.\n\n"
+        "Selects a prompt from a .txt prompt file, or from a pool of files\n"
+        "given as a folder or glob (indices run across the merged pool).\n\n"
         "File format:\n"
         "  positive: your positive prompt\n"
         "  negative: your negative prompt  (empty is fine)\n"
         "  name: optional label            (defaults to filename)\n"
-        "  ----  (any number of hyphens as separator)\n\n"
+        "  weight: optional odds           (default 1; random mode)\n"
+        "  ----  (any number of hyphens as separator)\n"
+        "Also reads .jsonl (one object per line) and .csv/.tsv (header row\n"
+        "with positive/negative/name), plain or .gz/.bz2/.xz compressed.\n\n"
         "Selection modes:\n"
         "  random      — pick randomly from range_start..range_end each run.\n"
         "  by_index    — use the INDEX widget value directly.\n"
@@ -439,9 +1321,14 @@ class YFGRandomPromptFromFile:
         "                in order across a batch or repeated generations.\n"
         "  incremental_no_wrap — same sequential walk, but stops at range_end\n"
         "                and keeps returning it. Use when you want one pass\n"
-        "                through the range with no repeats.\n\n"
+        "                through the range with no repeats.\n"
+        "  by_query    — pick among entries whose prompt/name contain every\n"
+        "                word in QUERY (random or incremental, per\n"
+        "                query_order). Backed by a cached inverted index.\n\n"
         "range_start / range_end auto-fill when a file is selected.\n"
         "Toggle last_n_only to restrict picks to the newest entries.\n"
+        "Set count > 1 to emit a list of prompts in one run.\n"
+        "{a|b|c} and __wildcard__ in the text are expanded on every pick.\n"
         "INDEX auto-syncs after every run — switch to by_index with no typing.\n"
     )
 
@@ -451,9 +1338,9 @@ class YFGRandomPromptFromFile:
         "Prompt name — from 'name:' field or filename if omitted.",
         "0-based index of the selected prompt. Auto-syncs to INDEX widget.",
         "Index of the previously selected prompt this session.",
-        "Total number of valid prompts found in the file.",
-        "Full path to the selected prompt file.",
-        "Filename only (no path) of the selected prompt file.",
+        "Total number of valid prompts found in the file (or the whole pool).",
+        "Full path to the file the selected prompt came from.",
+        "Filename only (no path) of the file the selected prompt came from.",
         "First index of the pool actually used this run (resolved, not raw widget value).",
         "Last index of the pool actually used this run (resolved; range_end=0 becomes total-1).",
     )
@@ -464,16 +1351,22 @@ class YFGRandomPromptFromFile:
             "required": {
                 "prompt_file": ("STRING", {
                     "multiline":   False,
-                    "placeholder": "Path to .txt prompt file — use 📄 Browse or 🕐 Recent",
-                    "tooltip":     "Full path to a .txt prompt file.",
+                    "placeholder": "Path to .txt prompt file, folder or glob — use 📄 Browse or 🕐 Recent",
+                    "tooltip":     (
+                        "Full path to a prompt file (.txt, .jsonl, .csv, .tsv, optionally "
+                        ".gz/.bz2/.xz compressed), a folder (every prompt file directly "
+                        "inside it) or a glob such as D:/prompts/**/*.txt. Multiple files "
+                        "are merged into one pool in natural filename order."
+                    ),
                 }),
-                "selection_mode": (["random", "by_index", "incremental", "incremental_no_wrap"], {
+                "selection_mode": (["random", "by_index", "incremental", "incremental_no_wrap", "by_query"], {
                     "default": "random",
                     "tooltip": (
                         "random: pick from range_start..range_end each run.\n"
                         "by_index: use the INDEX widget value directly.\n"
                         "incremental: advance by 1 each run from range_start to range_end, then wrap.\n"
-                        "incremental_no_wrap: same, but stops and holds at range_end."
+                        "incremental_no_wrap: same, but stops and holds at range_end.\n"
+                        "by_query: pick among entries in range matching every word in query."
                     ),
                 }),
                 "index": ("INT", {
@@ -514,9 +1407,14 @@ class YFGRandomPromptFromFile:
                     "max":     0xFFFFFFFFFFFFFFFF,
                     "tooltip": "How many entries from the end of the file to pick from (only active when last_n_only is ON).",
                 }),
-                "random_source": (["auto", "local", "random_org"], {
+                "random_source": (["auto", "local", "random_org", "seeded"], {
                     "default": "auto",
-                    "tooltip": "auto uses random.org if API key exists; else local PRNG.",
+                    "tooltip": (
+                        "auto uses random.org if API key exists; else local PRNG.\n"
+                        "seeded: each pick is a pure function of seed, run_counter and "
+                        "the pool's content, reproducible on any machine. ensure_unique "
+                        "and use_shuffle_bag do not apply."
+                    ),
                 }),
                 "ensure_unique": ("BOOLEAN", {
                     "default": True,
@@ -543,7 +1441,99 @@ class YFGRandomPromptFromFile:
                     "default": True,
                     "tooltip": "Cycle through all prompts before repeating, then reshuffle.",
                 }),
-            }
+            },
+            "optional": {
+                "count": ("INT", {
+                    "default": 1,
+                    "min":     1,
+                    "max":     4096,
+                    "tooltip": (
+                        "How many prompts to emit per run. Outputs become lists, so "
+                        "downstream encode/sample nodes run once per prompt inside a "
+                        "single queue entry. Entries in a batch are distinct while "
+                        "the pool is large enough."
+                    ),
+                }),
+                "query": ("STRING", {
+                    "multiline":   False,
+                    "default":     "",
+                    "placeholder": "by_query: words that must all appear",
+                    "tooltip": (
+                        "Used by by_query mode. Entries whose positive prompt or name "
+                        "contain every word (whole words, case-insensitive) form the pool."
+                    ),
+                }),
+                "weighted": ("BOOLEAN", {
+                    "default": True,
+                    "tooltip": (
+                        "random mode: when entries carry a weight: field, pick each with "
+                        "odds proportional to its weight (weight 0 = never). Replaces the "
+                        "shuffle bag, which would make every entry equally frequent; "
+                        "ensure_unique still rejects recent repeats. No effect on files "
+                        "without weights."
+                    ),
+                }),
+                "expand_templates": ("BOOLEAN", {
+                    "default": True,
+                    "tooltip": (
+                        "Expand {a|b|c} alternations and __name__ wildcards in the selected "
+                        "positive/negative text. Braces without a | are left untouched."
+                    ),
+                }),
+                "wildcards_dir": ("STRING", {
+                    "multiline":   False,
+                    "default":     "",
+                    "placeholder": "wildcards folder (blank = ./wildcards next to the prompt file)",
+                    "tooltip": (
+                        "Folder holding wildcard files: __hair__ picks a random line of "
+                        "hair.txt, __colors/warm__ reads colors/warm.txt. Blank looks in a "
+                        "'wildcards' folder next to the prompt file, then next to this node."
+                    ),
+                }),
+                "seed": ("INT", {
+                    "default": 0,
+                    "min":     0,
+                    "max":     0xFFFFFFFFFFFFFFFF,
+                    "tooltip": "random_source=seeded: the seed of the sequence.",
+                }),
+                "run_counter": ("INT", {
+                    "default": -1,
+                    "min":     -1,
+                    "max":     0xFFFFFFFFFFFFFFFF,
+                    "tooltip": (
+                        "random_source=seeded: which run of the sequence to produce. "
+                        "-1 keeps a saved counter that advances by one each run; any "
+                        "other value picks that run directly, so separate machines can "
+                        "split one sequence between them."
+                    ),
+                }),
+                "worker_index": ("INT", {
+                    "default": -1,
+                    "min":     -1,
+                    "max":     1023,
+                    "tooltip": (
+                        "This worker's shard when several ComfyUI instances share the same "
+                        "prompts. -1 reads YFG_WORKER_INDEX (default 0)."
+                    ),
+                }),
+                "worker_count": ("INT", {
+                    "default": 0,
+                    "min":     0,
+                    "max":     1024,
+                    "tooltip": (
+                        "How many workers split the range. Worker w only gets entries "
+                        "range_start+w, +w+count, … so workers never repeat each other. "
+                        "0 reads YFG_WORKER_COUNT (default 1 = no sharding)."
+                    ),
+                }),
+                "query_order": (["random", "incremental"], {
+                    "default": "random",
+                    "tooltip": (
+                        "How by_query walks its matches: random (honours ensure_unique and "
+                        "use_shuffle_bag) or incremental (in file order, wrapping)."
+                    ),
+                }),
+            },
         }
 
     RETURN_TYPES  = ("STRING", "STRING", "STRING", "INT", "INT", "INT", "STRING", "STRING",
@@ -552,14 +1542,18 @@ class YFGRandomPromptFromFile:
                      "index_current", "index_previous", "total_count",
                      "file_path", "file_name",
                      "range_start", "range_end")
+    # Per-prompt outputs are lists (one item per `count`); the pool-wide
+    # values total_count / range_start / range_end stay scalar.
+    OUTPUT_IS_LIST = (True, True, True, True, True, False, True, True, False, False)
     FUNCTION      = "load_prompt"
     CATEGORY      = "🐯 YFG/📝 Prompts"
 
-    def __init__(self):
-        self._prev_index: int  = -1
-        # Incremental mode state: tracks current position per (file, lo, hi) key
-        # so switching files or changing range bounds resets automatically.
-        self._incr_state: dict = {}   # key → next_index
+    # Selections made ahead of time by IS_CHANGED, keyed by the full set of
+    # inputs, waiting for the load_prompt call of the same run.
+    _reserved: "OrderedDict[str, dict]" = OrderedDict()
+    _MAX_RESERVED = 64
+    # Last index emitted per prompt_file + mode, reported as index_previous
+    _previous: Dict[str, int] = {}
 
     def load_prompt(
         self,
@@ -576,20 +1570,107 @@ class YFGRandomPromptFromFile:
         time_window_sec: int,
         retry_limit:     int,
         use_shuffle_bag: bool,
+        count:           int = 1,
+        query:           str = "",
+        query_order:     str = "random",
+        weighted:        bool = True,
+        expand_templates: bool = True,
+        wildcards_dir:   str = "",
+        seed:            int = 0,
+        run_counter:     int = -1,
+        worker_index:    int = -1,
+        worker_count:    int = 0,
     ):
-        if not prompt_file or not os.path.isfile(prompt_file):
+        inputs = {k: v for k, v in locals().items() if k != "self"}
+        plan   = self._reserved.pop(self._plan_key(inputs), None)
+        if plan is not None and self._still_current(plan, prompt_file):
+            self._commit(plan)
+        else:
+            plan = self._select(**inputs)
+        _FileHistory.add(prompt_file)
+
+        idxs, names = plan["idxs"], plan["names"]
+        lo, hi, total = plan["lo"], plan["hi"], plan["total"]
+        file_path = plan["file_paths"][0]
+        file_name = plan["file_names"][0]
+
+        shown = idxs[0] if len(idxs) == 1 else idxs
+        print(
+            f"[YFG] RandomPromptFromFile v{NODE_VERSION}: "
+            f"idx={shown}  range={lo}..{hi}  total={total}  "
+            f"name={names[0]}  file={file_name}"
+        )
+
+        result = (plan["positives"], plan["negatives"], names,
+                  [int(i) for i in idxs], [int(i) for i in plan["prev_idxs"]], int(total),
+                  plan["file_paths"], plan["file_names"], int(lo), int(hi))
+
+        return {
+            "ui": {
+                "yfg_pf_index_current":  (int(idxs[0]),),
+                "yfg_pf_index_previous": (int(plan["prev_idxs"][0]),),
+                "yfg_pf_total_count":    (int(total),),
+                "yfg_pf_file_name":      (file_name,),
+                "yfg_pf_file_path":      (file_path,),
+            },
+            "result": result,
+        }
+
+    @classmethod
+    def _select(
+        cls,
+        prompt_file:     str,
+        selection_mode:  str,
+        index:           int,
+        range_start:     int,
+        range_end:       int,
+        last_n_only:     bool,
+        last_n_count:    int,
+        random_source:   str,
+        ensure_unique:   bool,
+        history_size:    int,
+        time_window_sec: int,
+        retry_limit:     int,
+        use_shuffle_bag: bool,
+        count:           int = 1,
+        query:           str = "",
+        query_order:     str = "random",
+        weighted:        bool = True,
+        expand_templates: bool = True,
+        wildcards_dir:   str = "",
+        seed:            int = 0,
+        run_counter:     int = -1,
+        worker_index:    int = -1,
+        worker_count:    int = 0,
+        commit:          bool = True,
+    ) -> dict:
+        """
+        Make one run's selection and advance all state it touches (cursors,
+        seeded run counter, index_previous, uniqueness history, shuffle bag).
+        Returns the plan load_prompt emits.
+
+        With commit=False nothing is advanced: cursor and counter updates are
+        recorded in the plan for _commit(), and a pick that would consume
+        history or the shuffle bag raises _NeedsDraw instead.
+        """
+        pool = _PromptPool.load(prompt_file)
+        if not pool.signature:
             raise Exception(
-                f"[YFG] RandomPromptFromFile: file not found: '{prompt_file}'"
+                f"[YFG] RandomPromptFromFile: no prompt file, directory or glob "
+                f"match for '{prompt_file}'"
             )
-
-        prompts = _PromptFileCache.load(prompt_file)
-        if not prompts:
+        if not len(pool):
             raise Exception(
                 f"[YFG] RandomPromptFromFile: no valid prompts found in '{prompt_file}'"
             )
 
-        total    = len(prompts)
-        prev_idx = self._prev_index
+        total    = len(pool)
+        pool_key = str(Path(prompt_file).resolve()) if not _is_glob(prompt_file) else prompt_file
+        pool_key = f"{pool_key}::{pool.fingerprint}"
+        prev_key = f"{pool_key}::{selection_mode}"
+        prev_idx = cls._previous.get(prev_key, -1)
+        ledger   = {"reads": {}, "writes": {}}
+        notice   = ""
 
         # Resolve effective range bounds once — shared by every mode so the
         # range_start / range_end outputs are always meaningful, including in
@@ -625,34 +1706,118 @@ class YFGRandomPromptFromFile:
 
         hi = max(lo, min(hi, total - 1))
 
+        count = max(1, int(count))
+
+        # Worker shard: worker w of W owns lo+w, lo+w+W, … The walks below run
+        # over "virtual" indices lo..vhi, one per shard entry, and to_idx maps
+        # them back, so with W=1 nothing changes (and saved cursors still fit).
+        try:
+            w, W = resolve_worker(worker_index, worker_count)
+        except ValueError as e:
+            raise Exception(f"[YFG] RandomPromptFromFile: {e}")
+        shard_tag = "" if W == 1 else f"::shard{w}of{W}"
+
+        def vhi_of(lo: int, hi: int) -> int:
+            m = shard_size(hi - lo + 1, w, W)
+            if m == 0:
+                raise Exception(
+                    f"[YFG] RandomPromptFromFile: range {lo}..{hi} has fewer than "
+                    f"{w + 1} entries, so worker {w} of {W} has nothing to pick from"
+                )
+            return lo + m - 1
+
+        def to_idx(v: int, lo: int) -> int:
+            return lo + w + (v - lo) * W
+
+        # seeded: batch item k of run r is draw r * count + k of a counter
+        # generator keyed by seed and pool content
+        rng = base = None
+        if random_source == "seeded":
+            rng  = CounterRNG(seed, pool.fingerprint)
+            base = cls._seeded_run(ledger, pool_key, seed, run_counter) * count
+
         if selection_mode == "by_index":
-            idx = max(0, min(int(index), total - 1))
+            # A batch walks forward from INDEX, holding at the last prompt if
+            # the batch runs off the end of the file.
+            start = max(0, min(int(index), total - 1))
+            idxs  = [min(start + k, total - 1) for k in range(count)]
 
         elif selection_mode in ("incremental", "incremental_no_wrap"):
             wrap = (selection_mode == "incremental")
 
-            # Key includes mode + file + bounds so any change auto-resets position
-            incr_key = f"{selection_mode}::{Path(prompt_file).resolve()}::{lo}::{hi}"
-
-            if incr_key not in self._incr_state:
-                # First run for this mode/file/range — start at lo
-                self._incr_state = {incr_key: lo}   # clear stale keys too
-
-            idx = self._incr_state[incr_key]
-
-            if idx >= hi:
-                if wrap:
-                    self._incr_state[incr_key] = lo
+            # Key includes mode + file + content + bounds so any change starts
+            # a fresh walk at lo
+            incr_key = f"{selection_mode}::{pool_key}::{lo}::{hi}{shard_tag}"
+            vhi      = vhi_of(lo, hi)
+            cursor   = cls._cursor(ledger, incr_key, lo, lo, vhi)
+
+            idxs      = []
+            exhausted = False
+            for _ in range(count):
+                v = cursor
+                if v >= vhi:
+                    if wrap:
+                        cursor = lo
+                    else:
+                        # Hold at the last entry
+                        cursor    = vhi
+                        exhausted = True
                 else:
-                    # Hold at the last entry; notify once per run that we're done
-                    self._incr_state[incr_key] = hi
-                    print(
-                        f"[YFG] RandomPromptFromFile: incremental_no_wrap reached "
-                        f"the end of range {lo}..{hi} (index {hi}). Holding at the "
-                        f"last prompt. Change the file or the range bounds to reset."
-                    )
+                    cursor = v + 1
+                idxs.append(to_idx(v, lo))
+            ledger["writes"][incr_key] = cursor
+
+            if exhausted:
+                # Notify once per run (when the plan is committed) that we're done
+                notice = (
+                    f"[YFG] RandomPromptFromFile: incremental_no_wrap reached "
+                    f"the end of range {lo}..{hi} (index {idxs[-1]}). Holding at the "
+                    f"last prompt. Change the file or the range bounds to reset."
+                )
+
+        elif selection_mode == "by_query":
+            matches = pool.search(query)
+            if W > 1:
+                matches = [i for i in matches if i >= lo and (i - lo) % W == w]
+            lo_pos  = bisect.bisect_left(matches, lo)
+            hi_pos  = bisect.bisect_right(matches, hi)
+            if lo_pos >= hi_pos:
+                raise Exception(
+                    f"[YFG] RandomPromptFromFile: no prompts in range {lo}..{hi} "
+                    f"match query '{query}'"
+                )
+            terms = " ".join(sorted(set(_tokenize(query))))
+
+            # Walk positions within the match list, then map back to entries.
+            if query_order == "incremental":
+                incr_key = f"by_query::{pool_key}::{terms}::{lo}::{hi}{shard_tag}"
+                pos  = cls._cursor(ledger, incr_key, lo_pos, lo_pos, hi_pos - 1)
+                idxs = []
+                for _ in range(count):
+                    idxs.append(matches[pos])
+                    pos = pos + 1 if pos + 1 < hi_pos else lo_pos
+                ledger["writes"][incr_key] = pos
+            elif rng is not None:
+                idxs = [matches[cls._seeded_pick(rng, base + k, lo_pos, hi_pos - 1)]
+                        for k in range(count)]
             else:
-                self._incr_state[incr_key] = idx + 1
+                scope = f"query::{pool_key}::{terms}{shard_tag}"
+                idxs  = []
+                taken = set()
+                for _ in range(count):
+                    if not commit and ensure_unique and hi_pos - 1 > lo_pos:
+                        raise _NeedsDraw()
+                    pos = cls._pick(
+                        lo_pos, hi_pos - 1, scope, random_source, ensure_unique,
+                        history_size, time_window_sec, retry_limit, use_shuffle_bag,
+                        taken,
+                    )
+                    idxs.append(matches[pos])
+                    taken.add(pos)
+            print(
+                f"[YFG] RandomPromptFromFile: query '{query}' matched "
+                f"{hi_pos - lo_pos} prompts in range {lo}..{hi}"
+            )
 
         else:
             # random mode — last_n_only narrows the pool to the newest entries.
@@ -661,38 +1826,139 @@ class YFGRandomPromptFromFile:
             if last_n_only:
                 lo = max(lo, hi - int(last_n_count) + 1)
 
-            scope = f"file::{Path(prompt_file).resolve()}"
-            idx   = self._pick(
-                lo, hi, scope, random_source, ensure_unique,
-                history_size, time_window_sec, retry_limit, use_shuffle_bag,
-            )
+            scope = f"file::{pool_key}{shard_tag}"
+            vhi   = vhi_of(lo, hi)
+            table = pool.alias(lo, hi, w, W) if weighted else None
+            if weighted and pool.weighted and table is None:
+                print(
+                    f"[YFG] RandomPromptFromFile: every entry in range {lo}..{hi} "
+                    f"has weight 0; picking uniformly instead."
+                )
+            idxs  = []
+            taken = set()
+            for k in range(count):
+                if rng is not None:
+                    idxs.append(to_idx(cls._seeded_pick(rng, base + k, lo, vhi, table), lo))
+                    continue
+                if not commit and ensure_unique and vhi > lo:
+                    raise _NeedsDraw()
+                v = cls._pick(
+                    lo, vhi, scope, random_source, ensure_unique,
+                    history_size, time_window_sec, retry_limit, use_shuffle_bag,
+                    taken, table,
+                )
+                idxs.append(to_idx(v, lo))
+                taken.add(v)
+
+        # Each entry's "previous" is the one picked just before it, so a batch
+        # reads the same as `count` single runs queued back to back.
+        prev_idxs = [prev_idx] + idxs[:-1]
+
+        # file_path / file_name report the file each entry actually came
+        # from, which matters once prompt_file is a directory or glob.
+        dirs = cls._wildcard_dirs(wildcards_dir, pool)
+        positives, negatives, names, file_paths, file_names = [], [], [], [], []
+        for k, idx in enumerate(idxs):
+            positive, negative, name = pool.entry(idx)
+            src = pool.file_of(idx)
+            if expand_templates:
+                pos_t, neg_t = pool.templates(idx)
+                trng = random if rng is None else random.Random(rng.bits(base + k, lane=2))
+                if _is_dynamic(pos_t):
+                    positive = _expand_template(pos_t, trng, dirs)
+                if _is_dynamic(neg_t):
+                    negative = _expand_template(neg_t, trng, dirs)
+            positives.append(positive)
+            negatives.append(negative)
+            names.append(name)
+            file_paths.append(str(Path(src).resolve()))
+            file_names.append(Path(src).name)
+
+        plan = {
+            "pool": pool, "idxs": idxs, "prev_idxs": prev_idxs,
+            "lo": lo, "hi": hi, "total": total,
+            "positives": positives, "negatives": negatives, "names": names,
+            "file_paths": file_paths, "file_names": file_names,
+            "prev_key": prev_key, "reads": ledger["reads"], "writes": ledger["writes"],
+            "notice": notice,
+        }
+        if commit:
+            cls._commit(plan)
+        return plan
 
-        positive, negative, name = prompts[idx]
-        self._prev_index = idx
-        _FileHistory.add(prompt_file)
+    @staticmethod
+    def _wildcard_dirs(wildcards_dir: str, pool: _PromptPool) -> List[str]:
+        wildcards_dir = (wildcards_dir or "").strip()
+        if wildcards_dir:
+            return [wildcards_dir]
+        dirs = [os.path.join(os.path.dirname(p), "wildcards") for p in pool.paths[:1]]
+        dirs.append(str(Path(__file__).with_name("wildcards")))
+        return dirs
+
+    # Incremental positions live in _STATE, keyed by mode, file, content and
+    # bounds, so switching files or changing range bounds starts a fresh walk
+    # and a restarted node resumes. _select is a classmethod (IS_CHANGED plans
+    # with it too), so there is no per-instance copy to keep in sync. It reads
+    # them through a ledger and leaves the writes to _commit(), so a plan that
+    # is never used has not moved anything.
+    @staticmethod
+    def _cursor(ledger: dict, key: str, start: int, lo: int, hi: int) -> int:
+        """Saved position for *key* if it lies within lo..hi, else start."""
+        saved = ledger["reads"][key] = _STATE.get(key)
+        return saved if isinstance(saved, int) and lo <= saved <= hi else start
 
-        file_path = str(Path(prompt_file).resolve())
-        file_name = Path(prompt_file).name
+    @staticmethod
+    def _seeded_run(ledger: dict, pool_key: str, seed: int, run_counter: int) -> int:
+        """run_counter if given, else the saved auto counter (advanced by one on commit)."""
+        if int(run_counter) >= 0:
+            return int(run_counter)
+        key = f"seeded::{pool_key}::{seed}"
+        run = ledger["reads"][key] = _STATE.get(key)
+        run = run if isinstance(run, int) and run >= 0 else 0
+        ledger["writes"][key] = run + 1
+        return run
 
-        print(
-            f"[YFG] RandomPromptFromFile v{NODE_VERSION}: "
-            f"idx={idx}  range={lo}..{hi}  total={total}  "
-            f"name={name}  file={file_name}"
-        )
+    @classmethod
+    def _commit(cls, plan: dict):
+        """Advance the cursors, counters and index_previous a plan was made from."""
+        for key, value in plan["writes"].items():
+            _STATE.set(key, value)
+        cls._previous[plan["prev_key"]] = plan["idxs"][-1]
+        if plan["notice"]:
+            print(plan["notice"])
 
-        result = (positive, negative, name, int(idx), int(prev_idx), int(total),
-                  file_path, file_name, int(lo), int(hi))
+    @classmethod
+    def _still_current(cls, plan: dict, prompt_file: str) -> bool:
+        """True while nothing a reserved plan read has changed since IS_CHANGED made it."""
+        return (_PromptPool.peek(prompt_file) is plan["pool"]
+                and cls._previous.get(plan["prev_key"], -1) == plan["prev_idxs"][0]
+                and all(_STATE.get(k) == v for k, v in plan["reads"].items()))
 
-        return {
-            "ui": {
-                "yfg_pf_index_current":  (int(idx),),
-                "yfg_pf_index_previous": (int(prev_idx),),
-                "yfg_pf_total_count":    (int(total),),
-                "yfg_pf_file_name":      (file_name,),
-                "yfg_pf_file_path":      (file_path,),
-            },
-            "result": result,
-        }
+    @staticmethod
+    def _seeded_pick(rng: CounterRNG, n: int, lo: int, hi: int,
+                     table: Optional[AliasTable] = None) -> int:
+        """Draw *n* of the seeded sequence mapped onto lo..hi (weighted if *table*)."""
+        if table is None:
+            return rng.randint(n, lo, hi)
+        return lo + table.sample(rng.randint(n, 0, hi - lo), rng.random(n, lane=1))
+
+    @classmethod
+    def _plan_key(cls, inputs: dict) -> str:
+        """Stable key for a full input set, optional inputs filled with defaults."""
+        bound = inspect.signature(cls._select).bind(**inputs)
+        bound.apply_defaults()
+        return json.dumps(bound.arguments, sort_keys=True, default=str)
+
+    @staticmethod
+    def _plan_hash(plan: dict) -> str:
+        """
+        Hash of the selection the plan outputs. index_previous is left out:
+        it moves on every run, so a held prompt would never hash the same.
+        """
+        keys = ("positives", "negatives", "names", "idxs",
+                "lo", "hi", "total", "file_paths")
+        blob = json.dumps([plan[k] for k in keys], ensure_ascii=False)
+        return hashlib.sha256(blob.encode("utf-8")).hexdigest()
 
     @staticmethod
     def _pick(
@@ -700,50 +1966,207 @@ class YFGRandomPromptFromFile:
         random_source: str, ensure_unique: bool,
         history_size: int, time_window: int,
         retry_limit: int, use_shuffle_bag: bool,
+        taken: Optional[set] = None,
+        table: Optional[AliasTable] = None,
     ) -> int:
         if lo == hi:
             return lo
 
-        if ensure_unique and use_shuffle_bag and _ShuffleBag.can_use(lo, hi):
+        # Batch-local exclusions: entries already emitted earlier in this run.
+        # Only enforced while the pool still has something left to give;
+        # weighted, that is only the entries with a positive weight.
+        room = hi - lo + 1 if table is None else table.support
+        if not taken or len(taken) >= room:
+            taken = ()
+
+        def draw() -> int:
+            if table is None:
+                return _rand_int(lo, hi, random_source)
+            # Weighted: random_source picks the alias column, a local coin
+            # settles it. Zero-weight entries are never returned.
+            return lo + table.sample(_rand_int(0, hi - lo, random_source), random.random())
+
+        # The shuffle bag deals every entry once per cycle, which would undo
+        # the weights, so weighted picks always take the retry path below.
+        if table is None and ensure_unique and use_shuffle_bag and _ShuffleBag.can_use(lo, hi):
             bag_key   = f"bag::{scope}::{lo}::{hi}"
-            candidate = lo
-            for _ in range(max(1, retry_limit)):
-                candidate = _ShuffleBag.next_value(bag_key, lo, hi)
-                if not _UniqueHistory.is_duplicate(candidate, scope, history_size, time_window):
-                    _UniqueHistory.remember(candidate, scope, history_size)
-                    return candidate
-            _UniqueHistory.remember(candidate, scope, history_size)
-            return candidate
-
-        candidate = lo
+            skipped   = []      # already in this batch: still owed to this cycle
+            try:
+                for _ in range(max(1, retry_limit)):
+                    candidate = _ShuffleBag.next_value(bag_key, lo, hi)
+                    if candidate in taken:
+                        skipped.append(candidate)
+                        continue
+                    if _UNIQUE_HISTORY.claim(scope, candidate, history_size, time_window):
+                        return candidate
+                # Out of retries: history gives way, batch distinctness doesn't.
+                # The bag deals every entry once per cycle, so one not in the
+                # batch turns up within hi - lo + 1 more deals.
+                while candidate in taken:
+                    skipped.append(candidate)
+                    candidate = _ShuffleBag.next_value(bag_key, lo, hi)
+                _UNIQUE_HISTORY.remember(scope, candidate, history_size)
+                return candidate
+            finally:
+                _ShuffleBag.put_back(bag_key, lo, hi, skipped)
+
+        candidate = fallback = None
         for _ in range(max(1, retry_limit)):
-            candidate = _rand_int(lo, hi, random_source)
-            if not ensure_unique or not _UniqueHistory.is_duplicate(
-                    candidate, scope, history_size, time_window):
-                if ensure_unique:
-                    _UniqueHistory.remember(candidate, scope, history_size)
+            candidate = draw()
+            if candidate in taken:
+                continue
+            fallback = candidate
+            if not ensure_unique or _UNIQUE_HISTORY.claim(scope, candidate, history_size, time_window):
                 return candidate
 
-        print("[YFG] RandomPromptFromFile: retry limit reached; using last candidate.")
+        # Out of retries: history gives way, batch distinctness doesn't
+        if fallback is None:
+            fallback = YFGRandomPromptFromFile._first_free(lo, hi, taken, candidate, table)
+        print("[YFG] RandomPromptFromFile: retry limit reached; using a recently used prompt.")
         if ensure_unique:
-            _UniqueHistory.remember(candidate, scope, history_size)
-        return candidate
+            _UNIQUE_HISTORY.remember(scope, fallback, history_size)
+        return fallback
+
+    @staticmethod
+    def _first_free(lo: int, hi: int, taken, start: int,
+                    table: Optional[AliasTable] = None) -> int:
+        """
+        First entry from *start* on (wrapping within lo..hi) that is not in
+        *taken*, preferring one *table* can deal (prob > 0) when weighted.
+        """
+        span, spare = hi - lo + 1, None
+        for k in range(span):
+            v = lo + (start - lo + k) % span
+            if v in taken:
+                continue
+            if table is None or table.prob[v - lo] > 0:
+                return v
+            if spare is None:
+                spare = v
+        return start if spare is None else spare
 
     @classmethod
-    def IS_CHANGED(
-        cls,
-        prompt_file, selection_mode, index, range_start, range_end,
-        last_n_only, last_n_count, random_source, ensure_unique,
-        history_size, time_window_sec, retry_limit, use_shuffle_bag, **kwargs,
-    ):
-        # random and both incremental modes advance state each run
-        if selection_mode in ("random", "incremental", "incremental_no_wrap") or ensure_unique:
-            return float("NaN")
-        m = hashlib.sha256()
-        for v in (prompt_file, selection_mode, index):
-            m.update(str(v).encode())
-            m.update(b"|")
-        return m.hexdigest()
+    def IS_CHANGED(cls, **kwargs):
+        """
+        Plan this run's selection without advancing anything, reserve it for
+        load_prompt, and return a hash of what the node will output. When the
+        text did not actually change (incremental_no_wrap holding at
+        range_end, a one-entry pool, by_index) the hash repeats and ComfyUI
+        reuses the cached outputs of this node and everything downstream,
+        CLIPTextEncode included. The reservation only takes effect when
+        load_prompt uses it; one that is never used leaves no trace.
+
+        A unique random pick can't be planned without consuming history or
+        the shuffle bag, so those runs always count as changed and
+        load_prompt draws itself.
+        """
+        try:
+            plan = cls._select(**kwargs, commit=False)
+        except Exception:
+            return float("NaN")     # _NeedsDraw, or load_prompt reports the error
+        key = cls._plan_key(kwargs)
+        cls._reserved[key] = plan
+        cls._reserved.move_to_end(key)
+        while len(cls._reserved) > cls._MAX_RESERVED:
+            cls._reserved.popitem(last=False)
+        return cls._plan_hash(plan)
+
+
+# ─────────────────────────── bulk enqueue ─────────────────────────────────────
+
+_NODE_CLASS   = "YFGRandomPromptFromFile_node"
+ENQUEUE_MAX   = 100000
+ENQUEUE_MODES = ("pin", "bake")
+
+
+def _find_prompt_node(prompt: dict, node_id: str = "") -> str:
+    """id of the prompt node in an API-format workflow (node_id, or the only one)."""
+    if node_id:
+        node = prompt.get(node_id)
+        if not isinstance(node, dict) or node.get("class_type") != _NODE_CLASS:
+            raise ValueError(f"node {node_id} is not a {_NODE_CLASS} node")
+        return node_id
+    ids = [k for k, v in prompt.items()
+           if isinstance(v, dict) and v.get("class_type") == _NODE_CLASS]
+    if len(ids) != 1:
+        raise ValueError(f"workflow has {len(ids)} {_NODE_CLASS} nodes; pass node_id")
+    return ids[0]
+
+
+def _enqueue_jobs(prompt: dict, node_id: str, lo: int, hi: int, stride: int,
+                  mode: str, prompt_file: str = "") -> Tuple[List[dict], List[int]]:
+    """
+    One API-format workflow per entry lo, lo+stride, … up to hi (hi < 0 is
+    the last entry), with nothing left for the node to decide at run time:
+
+      pin   the node runs in by_index mode with the entry's index.
+      bake  the entry is resolved now (templates expanded) and its outputs
+            replace every link from the node, which is dropped.
+
+    Returns (jobs, indices). Raises ValueError for a bad request.
+    """
+    inputs = dict(prompt[node_id].get("inputs") or {})
+    if prompt_file:
+        inputs["prompt_file"] = prompt_file
+    source = inputs.get("prompt_file")
+    if not isinstance(source, str) or not source.strip():
+        raise ValueError("no prompt_file: set it on the node or pass file")
+
+    pool = _PromptPool.load(source)
+    if not pool.signature:
+        raise ValueError(f"no prompt file, directory or glob match for '{source}'")
+    total = len(pool)
+    if not total:
+        raise ValueError(f"no valid prompts found in '{source}'")
+    hi = total - 1 if hi < 0 else min(hi, total - 1)
+    if not 0 <= lo <= hi:
+        raise ValueError(f"range {lo}..{hi} is empty for {total} prompts")
+    idxs = range(lo, hi + 1, stride)
+    if len(idxs) > ENQUEUE_MAX:
+        raise ValueError(f"{len(idxs)} jobs requested; the limit is {ENQUEUE_MAX} per call")
+
+    # Every job starts from the same serialized workflow, so jobs never share
+    # mutable node dicts once queued.
+    template = json.dumps(prompt)
+    jobs     = []
+
+    if mode == "pin":
+        for i in idxs:
+            job = json.loads(template)
+            job[node_id]["inputs"].update(prompt_file=source, selection_mode="by_index",
+                                          index=i, count=1)
+            jobs.append(job)
+        return jobs, list(idxs)
+
+    params = inspect.signature(YFGRandomPromptFromFile._select).parameters
+    args   = {k: v for k, v in inputs.items() if k in params and k != "commit"}
+    linked = sorted(k for k, v in args.items() if isinstance(v, list))
+    if linked:
+        raise ValueError(f"bake needs literal node inputs, but these come from links: "
+                         f"{', '.join(linked)}; use mode=pin")
+    args.update(selection_mode="by_index", count=1)
+    links = [(nid, name, v[1]) for nid, node in prompt.items() if nid != node_id
+             for name, v in (node.get("inputs") or {}).items()
+             if isinstance(v, list) and len(v) == 2 and str(v[0]) == node_id]
+    bad = [f"{nid}.{name}" for nid, name, slot in links
+           if not (isinstance(slot, int) and 0 <= slot < len(YFGRandomPromptFromFile.RETURN_TYPES))]
+    if bad:
+        raise ValueError(f"links to unknown output slots of node {node_id}: {', '.join(bad)}")
+
+    for i in idxs:
+        try:
+            plan = YFGRandomPromptFromFile._select(**dict(args, index=i), commit=False)
+        except TypeError as e:
+            raise ValueError(f"node {node_id} inputs are incomplete ({e})")
+        outputs = (plan["positives"][0], plan["negatives"][0], plan["names"][0],
+                   plan["idxs"][0], plan["prev_idxs"][0], plan["total"],
+                   plan["file_paths"][0], plan["file_names"][0], plan["lo"], plan["hi"])
+        job = json.loads(template)
+        del job[node_id]
+        for nid, name, slot in links:
+            job[nid]["inputs"][name] = outputs[slot]
+        jobs.append(job)
+    return jobs, list(idxs)
 
 
 # ─────────────────────────── registration ─────────────────────────────────────
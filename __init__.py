@@ -25,6 +25,12 @@ from .yfg_display_value import YFG_DisplayValue
 from .YFGRandomPromptFromFile import YFGRandomPromptFromFile
 from .civitai_metasave import YFG_CivitAI_MetaSave, YFG_CivitAI_MetaSave_V2
 from .text_concat_swap import YFGTextConcatSwap
+from .civitai_metasave.modules import hook as _execution_hook
+from .yfg_random.prefetch import prefetch_for_prompt
+
+# Start the random.org fetches of the YFG random nodes as soon as a prompt
+# begins executing, so they overlap with the upstream nodes.
+_execution_hook.prompt_listeners.append(prefetch_for_prompt)
 
 NODE_CLASS_MAPPINGS = {
     "image_histograms_node": ImageHistogramsNode,
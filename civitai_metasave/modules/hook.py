@@ -6,6 +6,8 @@
 #               get_input_data() to capture the live prompt, extra data,
 #               executor reference, and current save-node ID at generation
 #               time, making them available to the metadata capture pipeline.
+#               Other parts of the package can also register prompt
+#               listeners, which see each prompt before its nodes execute.
 # =============================================================================
 
 # Global state populated by the hooks at execution time
@@ -23,12 +25,22 @@ _SaveNodeClasses = set()
 # Backwards-compatible alias; assigning to it still works.
 _SaveNodeClass = None
 
+# Callables run with the prompt dict before any of its nodes execute, e.g.
+# the random.org prefetch in yfg_random/prefetch.py. They must return
+# quickly; a listener that raises is logged and never stops the prompt.
+prompt_listeners = []
+
 
 def pre_execute(self, prompt, prompt_id, extra_data, execute_outputs):
     global current_prompt, current_extra_data, prompt_executer
     current_prompt     = prompt
     current_extra_data = extra_data
     prompt_executer    = self
+    for listener in prompt_listeners:
+        try:
+            listener(prompt)
+        except Exception as e:
+            print(f"[YFG] prompt listener {getattr(listener, '__name__', listener)} failed: {e}")
 
 
 def pre_get_input_data(inputs, class_def, unique_id, *args):
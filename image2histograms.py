@@ -8,10 +8,13 @@ from math import ceil, sqrt
 import torch
 from PIL import Image
 import numpy as np
-import cv2 as cv
-from matplotlib import pyplot as plt
-from io import BytesIO
 from typing import List, Union
+from .libs.histogram import compute_histograms, figure_image, render_histogram, use_fast_renderer
+
+try:
+    from matplotlib import pyplot as plt
+except ImportError:  # optional: only the "matplotlib" renderer needs it
+    plt = None
 
 def hex_to_rgb(hex_color):
     try:
@@ -43,6 +46,9 @@ class ImageHistogramsNode:
                 "image": ("IMAGE",),
                 "histogram_size": (["small", "medium", "large"], {"default": "medium"}),
             },
+            "optional": {
+                "renderer": (["fast", "matplotlib"], {"default": "fast"}),
+            },
         }
 
     FUNCTION = "generate"
@@ -50,7 +56,7 @@ class ImageHistogramsNode:
     RETURN_NAMES = ("Original Image", "RGB Histogram Filled", "RGB Histogram Lines", "Red Channel", "Green Channel", "Blue Channel", "Luminosity")
     CATEGORY = "🐯 YFG"
 
-    def generate(self, image: torch.Tensor, histogram_size="medium"):
+    def generate(self, image: torch.Tensor, histogram_size="medium", renderer="fast"):
         if image.size(0) == 0:
             return (torch.zeros(0),)
 
@@ -59,73 +65,64 @@ class ImageHistogramsNode:
         # Set histogram resolution based on the input size
         dpi = {'small': 50, 'medium': 100, 'large': 150}.get(histogram_size, 100)
 
-        # Prepare histograms
-        image_array = np.array(original_image[0])
-        histogram_filled = self.generate_filled_histogram(image_array, dpi)
-        histogram_lines = self.generate_line_histogram(image_array, dpi)
-        red_hist = self.generate_channel_histogram(image_array, 2, 'red', dpi)
-        green_hist = self.generate_channel_histogram(image_array, 1, 'green', dpi)
-        blue_hist = self.generate_channel_histogram(image_array, 0, 'blue', dpi)
-        lum_hist = self.generate_luminosity_histogram(image_array, dpi)
+        # Count every channel and luminosity once; all six plots share the result
+        hist = compute_histograms(np.array(original_image[0]))
+        histogram_filled = self.generate_filled_histogram(hist, dpi, renderer)
+        histogram_lines = self.generate_line_histogram(hist, dpi, renderer)
+        red_hist = self.generate_channel_histogram(hist, 2, 'red', dpi, renderer)
+        green_hist = self.generate_channel_histogram(hist, 1, 'green', dpi, renderer)
+        blue_hist = self.generate_channel_histogram(hist, 0, 'blue', dpi, renderer)
+        lum_hist = self.generate_luminosity_histogram(hist, dpi, renderer)
 
         return (pil2tensor(original_image), pil2tensor([histogram_filled]), pil2tensor([histogram_lines]), pil2tensor([red_hist]), pil2tensor([green_hist]), pil2tensor([blue_hist]), pil2tensor([lum_hist]))
 
-    def generate_histogram_template(self, image, colors, dpi):
+    @staticmethod
+    def _fast(renderer):
+        """True unless the matplotlib renderer was asked for and is installed."""
+        return use_fast_renderer(renderer, plt is not None)
+
+    # Every plot below takes the counts from compute_histograms(), computed
+    # once per image. Channel i of the RGB plots is drawn in ('b', 'g', 'r')[i].
+
+    def generate_histogram_template(self, hist, colors, dpi, renderer="fast"):
+        if self._fast(renderer):
+            return render_histogram(list(zip(hist["channels"], colors)), dpi, fill=False)
         plt.figure()
-        for i, col in enumerate(colors):
-            histr = cv.calcHist([image], [i], None, [256], [0, 256])
+        for histr, col in zip(hist["channels"], colors):
             plt.plot(histr, color=col)
         plt.xlim([0, 256])
         plt.axis('off')
-        buf = BytesIO()
-        plt.savefig(buf, format='png', dpi=dpi, bbox_inches='tight', pad_inches=0)
-        plt.close()
-        buf.seek(0)
-        return Image.open(buf)
+        return figure_image(plt, dpi)
 
-    def generate_filled_histogram(self, image, dpi):
+    def generate_filled_histogram(self, hist, dpi, renderer="fast"):
         color = ('b', 'g', 'r')
+        if self._fast(renderer):
+            return render_histogram(list(zip(hist["channels"], color)), dpi)
         plt.figure()
-        for i, col in enumerate(color):
-            histr = cv.calcHist([image], [i], None, [256], [0, 256])
+        for histr, col in zip(hist["channels"], color):
             plt.plot(histr, color=col)
-            plt.fill_between(range(256), histr[:, 0], color=col, alpha=0.5)
+            plt.fill_between(range(256), histr, color=col, alpha=0.5)
         plt.xlim([0, 256])
-        buf = BytesIO()
         plt.axis('off')
-        plt.savefig(buf, format='png', dpi=dpi, bbox_inches='tight', pad_inches=0)
-        plt.close()
-        buf.seek(0)
-        return Image.open(buf)
+        return figure_image(plt, dpi)
 
-    def generate_line_histogram(self, image, dpi):
-        return self.generate_histogram_template(image, ('b', 'g', 'r'), dpi)
+    def generate_line_histogram(self, hist, dpi, renderer="fast"):
+        return self.generate_histogram_template(hist, ('b', 'g', 'r'), dpi, renderer)
 
-    def generate_channel_histogram(self, image, channel, color, dpi):
-        histr = cv.calcHist([image[:, :, channel]], [0], None, [256], [0, 256])
+    def generate_single_histogram(self, histr, color, dpi, renderer="fast"):
+        if self._fast(renderer):
+            return render_histogram([(histr, color)], dpi)
         plt.figure()
         plt.plot(histr, color=color)
-        plt.fill_between(range(256), histr[:, 0], color=color, alpha=0.5)
+        plt.fill_between(range(256), histr, color=color, alpha=0.5)
         plt.xlim([0, 256])
-        buf = BytesIO()
         plt.axis('off')
-        plt.savefig(buf, format='png', dpi=dpi, bbox_inches='tight', pad_inches=0)
-        plt.close()
-        buf.seek(0)
-        return Image.open(buf)
+        return figure_image(plt, dpi)
 
-    def generate_luminosity_histogram(self, image, dpi):
-        luminosity = cv.cvtColor(image, cv.COLOR_RGB2GRAY)
-        plt.figure()
-        histr = cv.calcHist([luminosity], [0], None, [256], [0, 256])
-        plt.plot(histr, color='gray')
-        plt.fill_between(range(256), histr[:, 0], color='gray', alpha=0.5)
-        plt.xlim([0, 256])
-        buf = BytesIO()
-        plt.axis('off')
-        plt.savefig(buf, format='png', dpi=dpi, bbox_inches='tight', pad_inches=0)
-        plt.close()
-        buf.seek(0)
-        return Image.open(buf)
+    def generate_channel_histogram(self, hist, channel, color, dpi, renderer="fast"):
+        return self.generate_single_histogram(hist["channels"][channel], color, dpi, renderer)
+
+    def generate_luminosity_histogram(self, hist, dpi, renderer="fast"):
+        return self.generate_single_histogram(hist["luminosity"], 'gray', dpi, renderer)
 
-## end
\ No newline at end of file
+## end
@@ -8,10 +8,13 @@ from math import ceil, sqrt
 import torch
 from PIL import Image, PngImagePlugin
 import numpy as np
-import cv2 as cv
-from matplotlib import pyplot as plt
-from io import BytesIO
 from typing import List, Union
+from .libs.histogram import compute_histograms, figure_image, render_histogram, use_fast_renderer
+
+try:
+    from matplotlib import pyplot as plt
+except ImportError:  # optional: only the "matplotlib" renderer needs it
+    plt = None
 import os
 import random
 import json
@@ -57,6 +60,9 @@ class ImageHistogramsNodeCompact:
                 "preview": ("BOOLEAN", {"default": True}),
                 "display": (["histogram", "original"], {"default": "histogram"}),
             },
+            "optional": {
+                "renderer": (["fast", "matplotlib"], {"default": "fast"}),
+            },
             "hidden": {
                 "prompt": "PROMPT",
                 "extra_pnginfo": "EXTRA_PNGINFO"
@@ -69,7 +75,7 @@ class ImageHistogramsNodeCompact:
     RETURN_NAMES = ("Original Image", "Histogram")
     CATEGORY = "🐯 YFG"
 
-    def generate(self, image: torch.Tensor, histogram_type="RGB Histogram Filled", histogram_size="medium", preview=True, display="histogram", prompt=None, extra_pnginfo=None):
+    def generate(self, image: torch.Tensor, histogram_type="RGB Histogram Filled", histogram_size="medium", preview=True, display="histogram", renderer="fast", prompt=None, extra_pnginfo=None):
         if image.size(0) == 0:
             return (torch.zeros(0),)
 
@@ -78,19 +84,19 @@ class ImageHistogramsNodeCompact:
         # Set histogram resolution based on the input size
         dpi = {'small': 50, 'medium': 100, 'large': 150}.get(histogram_size, 100)
 
-        # Prepare histograms
-        image_array = np.array(original_image[0])
+        # Count every channel and luminosity once, in one pass
+        hist = compute_histograms(np.array(original_image[0]))
 
         histogram_func = {
             "RGB Histogram Filled": self.generate_filled_histogram,
             "RGB Histogram Lines": self.generate_line_histogram,
-            "Red Channel": lambda img, dpi: self.generate_channel_histogram(img, 2, 'red', dpi),
-            "Green Channel": lambda img, dpi: self.generate_channel_histogram(img, 1, 'green', dpi),
-            "Blue Channel": lambda img, dpi: self.generate_channel_histogram(img, 0, 'blue', dpi),
+            "Red Channel": lambda hist, dpi, renderer: self.generate_channel_histogram(hist, 2, 'red', dpi, renderer),
+            "Green Channel": lambda hist, dpi, renderer: self.generate_channel_histogram(hist, 1, 'green', dpi, renderer),
+            "Blue Channel": lambda hist, dpi, renderer: self.generate_channel_histogram(hist, 0, 'blue', dpi, renderer),
             "Luminosity": self.generate_luminosity_histogram,
         }.get(histogram_type, self.generate_filled_histogram)
 
-        histogram = histogram_func(image_array, dpi)
+        histogram = histogram_func(hist, dpi, renderer)
 
         # Save histogram image
         save_result = self.save_images([histogram], filename_prefix="ComfyUI", prompt=prompt, extra_pnginfo=extra_pnginfo)
@@ -135,62 +141,53 @@ class ImageHistogramsNodeCompact:
             counter += 1
         return {"ui": {"images": results}}
 
-    def generate_histogram_template(self, image, colors, dpi):
+    @staticmethod
+    def _fast(renderer):
+        """True unless the matplotlib renderer was asked for and is installed."""
+        return use_fast_renderer(renderer, plt is not None)
+
+    # Every plot below takes the counts from compute_histograms(), computed
+    # once per image. Channel i of the RGB plots is drawn in ('b', 'g', 'r')[i].
+
+    def generate_histogram_template(self, hist, colors, dpi, renderer="fast"):
+        if self._fast(renderer):
+            return render_histogram(list(zip(hist["channels"], colors)), dpi, fill=False)
         plt.figure()
-        for i, col in enumerate(colors):
-            histr = cv.calcHist([image], [i], None, [256], [0, 256])
+        for histr, col in zip(hist["channels"], colors):
             plt.plot(histr, color=col)
         plt.xlim([0, 256])
         plt.axis('off')
-        buf = BytesIO()
-        plt.savefig(buf, format='png', dpi=dpi, bbox_inches='tight', pad_inches=0)
-        plt.close()
-        buf.seek(0)
-        return Image.open(buf)
+        return figure_image(plt, dpi)
 
-    def generate_filled_histogram(self, image, dpi):
+    def generate_filled_histogram(self, hist, dpi, renderer="fast"):
         color = ('b', 'g', 'r')
+        if self._fast(renderer):
+            return render_histogram(list(zip(hist["channels"], color)), dpi)
         plt.figure()
-        for i, col in enumerate(color):
-            histr = cv.calcHist([image], [i], None, [256], [0, 256])
+        for histr, col in zip(hist["channels"], color):
             plt.plot(histr, color=col)
-            plt.fill_between(range(256), histr[:, 0], color=col, alpha=0.5)
+            plt.fill_between(range(256), histr, color=col, alpha=0.5)
         plt.xlim([0, 256])
-        buf = BytesIO()
         plt.axis('off')
-        plt.savefig(buf, format='png', dpi=dpi, bbox_inches='tight', pad_inches=0)
-        plt.close()
-        buf.seek(0)
-        return Image.open(buf)
+        return figure_image(plt, dpi)
 
-    def generate_line_histogram(self, image, dpi):
-        return self.generate_histogram_template(image, ('b', 'g', 'r'), dpi)
+    def generate_line_histogram(self, hist, dpi, renderer="fast"):
+        return self.generate_histogram_template(hist, ('b', 'g', 'r'), dpi, renderer)
 
-    def generate_channel_histogram(self, image, channel, color, dpi):
-        histr = cv.calcHist([image[:, :, channel]], [0], None, [256], [0, 256])
+    def generate_single_histogram(self, histr, color, dpi, renderer="fast"):
+        if self._fast(renderer):
+            return render_histogram([(histr, color)], dpi)
         plt.figure()
         plt.plot(histr, color=color)
-        plt.fill_between(range(256), histr[:, 0], color=color, alpha=0.5)
+        plt.fill_between(range(256), histr, color=color, alpha=0.5)
         plt.xlim([0, 256])
-        buf = BytesIO()
         plt.axis('off')
-        plt.savefig(buf, format='png', dpi=dpi, bbox_inches='tight', pad_inches=0)
-        plt.close()
-        buf.seek(0)
-        return Image.open(buf)
+        return figure_image(plt, dpi)
 
-    def generate_luminosity_histogram(self, image, dpi):
-        luminosity = cv.cvtColor(image, cv.COLOR_RGB2GRAY)
-        plt.figure()
-        histr = cv.calcHist([luminosity], [0], None, [256], [0, 256])
-        plt.plot(histr, color='gray')
-        plt.fill_between(range(256), histr[:, 0], color='gray', alpha=0.5)
-        plt.xlim([0, 256])
-        buf = BytesIO()
-        plt.axis('off')
-        plt.savefig(buf, format='png', dpi=dpi, bbox_inches='tight', pad_inches=0)
-        plt.close()
-        buf.seek(0)
-        return Image.open(buf)
+    def generate_channel_histogram(self, hist, channel, color, dpi, renderer="fast"):
+        return self.generate_single_histogram(hist["channels"][channel], color, dpi, renderer)
+
+    def generate_luminosity_histogram(self, hist, dpi, renderer="fast"):
+        return self.generate_single_histogram(hist["luminosity"], 'gray', dpi, renderer)
 
 ## end
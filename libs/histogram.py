@@ -0,0 +1,205 @@
+"""
+@author: Manny Gonzalez
+@title: 🐯 YFG Comical Nodes
+@nickname: 🐯 YFG Comical Nodes
+@description: Utility custom nodes for special effects, image manipulation and quality of life tools.
+"""
+# Histogram counting and the fast renderer shared by ImageHistogramsNode and
+# ImageHistogramsNodeCompact. Counts are computed once per image and feed
+# every plot. The renderer draws the same picture as the matplotlib backend
+# (same size, colours, 5% y margin, translucent fills under opaque lines)
+# straight into a NumPy canvas, with no figure, PNG encode or decode.
+
+import logging
+from io import BytesIO
+
+import numpy as np
+from PIL import Image
+
+try:
+    import cv2 as cv
+except ImportError:  # counts fall back to np.bincount
+    cv = None
+
+# matplotlib colour names used by the nodes, as 0-255 RGB
+COLORS = {
+    "b": (0, 0, 255), "g": (0, 128, 0), "r": (255, 0, 0),
+    "blue": (0, 0, 255), "green": (0, 128, 0), "red": (255, 0, 0),
+    "gray": (128, 128, 128),
+}
+
+FILL_ALPHA = 0.5
+LINE_POINTS = 1.5      # matplotlib's default line width, in points
+
+logger = logging.getLogger(__name__)
+_warned_no_matplotlib = False
+
+
+def use_fast_renderer(renderer, have_matplotlib):
+    """
+    True unless the matplotlib renderer was asked for and is installed.
+    Falling back is logged once per process, not once per plot.
+    """
+    global _warned_no_matplotlib
+    if renderer != "matplotlib":
+        return True
+    if have_matplotlib:
+        return False
+    if not _warned_no_matplotlib:
+        _warned_no_matplotlib = True
+        logger.warning("Histograms: matplotlib is not installed; using the fast renderer.")
+    return True
+
+
+def figure_image(plt, dpi):
+    """
+    Save pyplot's current figure as the matplotlib renderer's output and
+    close it. The PNG is RGBA; it is returned as RGB, like render_histogram().
+    """
+    buf = BytesIO()
+    plt.savefig(buf, format='png', dpi=dpi, bbox_inches='tight', pad_inches=0)
+    plt.close()
+    buf.seek(0)
+    return Image.open(buf).convert("RGB")
+
+
+def compute_histograms(image):
+    """
+    All the counts the histogram nodes plot, computed once per image.
+
+    image is an HxWx3 (or HxWx4, or HxW grey) uint8 array. Returns
+    {"channels": [c0, c1, c2], "luminosity": lum}, each 256 int64 counts,
+    channels in array order. Four counting passes in all, where the plots
+    used to make ten.
+
+    cv.calcHist is used when OpenCV is installed (about 3x faster than
+    np.bincount, which has to widen every pixel to intp first). Otherwise
+    one np.bincount per channel, with luminosity from OpenCV's fixed-point
+    RGB2GRAY weights (0.299, 0.587, 0.114 in 1/32768ths, rounded), so both
+    paths give identical counts.
+    """
+    image = np.asarray(image)
+    if image.dtype != np.uint8:
+        image = np.clip(image, 0, 255).astype(np.uint8)
+    if image.ndim == 2:
+        image = image[..., None]
+    if image.shape[-1] < 3:
+        image = np.repeat(image[..., :1], 3, axis=-1)
+    rgb = np.ascontiguousarray(image[..., :3])
+
+    if cv is not None:
+        channels = [cv.calcHist([rgb], [c], None, [256], [0, 256]).reshape(-1).astype(np.int64)
+                    for c in range(3)]
+        gray = cv.cvtColor(rgb, cv.COLOR_RGB2GRAY)
+        lum  = cv.calcHist([gray], [0], None, [256], [0, 256]).reshape(-1).astype(np.int64)
+        return {"channels": channels, "luminosity": lum}
+
+    r, g, b = (rgb[..., c] for c in range(3))
+    channels = [np.bincount(c.ravel(), minlength=256) for c in (r, g, b)]
+    gray = r.astype(np.uint32) * 9798
+    gray += g.astype(np.uint32) * 19235
+    gray += b.astype(np.uint32) * 3735
+    gray += 1 << 14
+    gray >>= 15
+    return {"channels": channels, "luminosity": np.bincount(gray.ravel(), minlength=256)}
+
+
+def canvas_size(dpi):
+    """
+    (width, height) of the matplotlib output at *dpi*: the default 6.4 x 4.8 in
+    figure cropped to its axes (77.5% x 77%) by bbox_inches='tight'.
+    """
+    return int(6.4 * 0.775 * dpi), int(4.8 * 0.77 * dpi)
+
+
+def render_histogram(series, dpi, fill=True):
+    """
+    Draw 256-bin histograms as an RGB PIL image.
+
+    series  up to 8 (counts, colour) pairs: counts has 256 values, colour is
+            a key of COLORS or an (r, g, b) tuple. Drawn in order.
+    fill    shade under each curve at FILL_ALPHA. All fills go under all
+            lines, which is matplotlib's z-order.
+
+    x spans [0, 256) like plt.xlim([0, 256]); y spans the largest count plus a
+    5% margin each side, like matplotlib's autoscale.
+
+    Fills: a pixel's colour depends only on which curves it lies under, so
+    each pixel gets a bitmask of those and one palette lookup gives the
+    alpha-composited result. Lines: each pixel column covers the polyline's
+    min..max over its width, widened by the line width. Only those pixels are
+    blended, weighted by how much of each pixel the span covers.
+    """
+    width, height = canvas_size(dpi)
+    series = [(np.asarray(c, dtype=np.float64).reshape(-1)[:256],
+               np.array(COLORS.get(col, col) if isinstance(col, str) else col, dtype=np.float32))
+              for c, col in series]
+
+    top   = max((float(c.max()) for c, _ in series), default=0.0) or 1.0
+    ymax  = 1.05 * top
+    scale = height / (1.10 * top)                   # rows per count, 5% margin each side
+    base  = ymax * scale                            # row of y = 0
+    bins  = np.arange(256, dtype=np.float64)
+
+    if fill and series:
+        # Palette: white with every subset of the fills composited in order
+        palette = np.empty((1 << len(series), 3), dtype=np.uint8)
+        for subset in range(len(palette)):
+            c = np.full(3, 255.0, dtype=np.float32)
+            for k, (_, rgb) in enumerate(series):
+                if subset >> k & 1:
+                    c += (rgb - c) * FILL_ALPHA
+            palette[subset] = np.round(c)
+        rows = np.arange(height, dtype=np.float32)[:, None] + 0.5     # pixel centres
+        xs   = (np.arange(width) + 0.5) * 256.0 / width                # data x per column
+        under = np.zeros((height, width), dtype=np.uint8)
+        for k, (counts, _) in enumerate(series):
+            y_top = ((ymax - np.interp(xs, bins, counts)) * scale).astype(np.float32)
+            y_top[xs > 255.0] = np.inf                                 # curves end at bin 255
+            np.bitwise_or(under, np.uint8(1 << k), out=under, where=rows >= y_top[None, :])
+        under[rows[:, 0] > base] = 0
+        canvas = palette[under]
+    else:
+        canvas = np.full((height, width, 3), 255, dtype=np.uint8)
+
+    half  = LINE_POINTS * dpi / 72.0 / 2.0
+    reach = int(half)
+    px    = bins * width / 256.0                    # vertex x, in columns
+    left  = np.arange(width, dtype=np.float64)
+    for counts, rgb in series:
+        py = (ymax - counts) * scale
+        y0 = np.interp(left, px, py)
+        y1 = np.interp(left + 1.0, px, py)
+        lo = np.minimum(y0, y1)
+        hi = np.maximum(y0, y1)
+        # Vertices inside a column stretch it (several bins per column when narrow)
+        col = np.minimum(px.astype(np.int64), width - 1)
+        np.minimum.at(lo, col, py)
+        np.maximum.at(hi, col, py)
+        valid = left <= px[-1]
+        lo[~valid] = np.inf
+        hi[~valid] = -np.inf
+        # Thicken sideways so steep segments are as wide as flat ones
+        lo0, hi0 = lo.copy(), hi.copy()
+        for s in range(1, reach + 1):
+            lo[s:]  = np.minimum(lo[s:], lo0[:-s])
+            lo[:-s] = np.minimum(lo[:-s], lo0[s:])
+            hi[s:]  = np.maximum(hi[s:], hi0[:-s])
+            hi[:-s] = np.maximum(hi[:-s], hi0[s:])
+        a = lo - half
+        b = hi + half
+        drawn = np.isfinite(a) & np.isfinite(b)
+        r0 = np.where(drawn, np.clip(np.floor(a), 0, height), 0).astype(np.int64)
+        r1 = np.where(drawn, np.clip(np.ceil(b), 0, height), 0).astype(np.int64)
+        n  = np.maximum(r1 - r0, 0)
+        if not n.any():
+            continue
+        # Every (row, column) the span touches, column by column
+        cols = np.repeat(np.arange(width), n)
+        rr   = np.repeat(r0, n) + (np.arange(int(n.sum())) - np.repeat(np.cumsum(n) - n, n))
+        ca, cb = a[cols], b[cols]
+        cover = (np.clip(rr + 1.0, ca, cb) - np.clip(rr, ca, cb)).astype(np.float32)[:, None]
+        pix = canvas[rr, cols].astype(np.float32)
+        canvas[rr, cols] = (pix - (pix - rgb) * cover + 0.5).astype(np.uint8)
+
+    return Image.fromarray(canvas, "RGB")
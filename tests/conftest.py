@@ -0,0 +1,76 @@
+# Lets the tests import yfg_random directly, and the node modules through
+# load_node(), without ComfyUI or the node package's __init__.py.
+import importlib
+import os
+import sys
+import types
+from collections import OrderedDict
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.pop("YFG_STATE_DB", None)
+
+
+def load_node(module: str):
+    """Import a node module (e.g. "RandomOrgV2") from the repo as yfg_nodes.<module>."""
+    if "yfg_nodes" not in sys.modules:
+        pkg = types.ModuleType("yfg_nodes")
+        pkg.__path__ = [ROOT]
+        sys.modules["yfg_nodes"] = pkg
+    return importlib.import_module(f"yfg_nodes.{module}")
+
+
+@pytest.fixture
+def prompt_node(tmp_path, monkeypatch):
+    """YFGRandomPromptFromFile module with its state and file history in tmp_path."""
+    from yfg_random.history import HistoryStore
+    from yfg_random.state import StateStore
+
+    m = load_node("YFGRandomPromptFromFile")
+    monkeypatch.setattr(m, "_STATE", StateStore(str(tmp_path / "state.json"), flush_delay=3600))
+    monkeypatch.setattr(m, "_FILE_HISTORY_PATH", tmp_path / "history.json")
+    # Nothing carries over from an earlier test
+    monkeypatch.setattr(m, "_UNIQUE_HISTORY", HistoryStore())
+    monkeypatch.setattr(m._ShuffleBag, "_bags", {})
+    monkeypatch.setattr(m.YFGRandomPromptFromFile, "_previous", {})
+    monkeypatch.setattr(m.YFGRandomPromptFromFile, "_reserved", OrderedDict())
+    return m
+
+
+def prompt_inputs(path, **overrides):
+    """load_prompt inputs for a plain random pick from *path*, with overrides."""
+    inputs = dict(prompt_file=path, selection_mode="random", index=0, range_start=0, range_end=0,
+                  last_n_only=False, last_n_count=1, random_source="local", ensure_unique=True,
+                  history_size=100, time_window_sec=0, retry_limit=20, use_shuffle_bag=True)
+    inputs.update(overrides)
+    return inputs
+
+
+def run_prompt(m, **inputs):
+    """The node's result tuple for one load_prompt run."""
+    return m.YFGRandomPromptFromFile().load_prompt(**inputs)["result"]
+
+
+def write_prompts(path, n: int) -> str:
+    path.write_text("\n---\n".join(f"positive: p{i}" for i in range(n)) + "\n", encoding="utf-8")
+    return str(path)
+
+
+@pytest.fixture
+def prompts(tmp_path):
+    """prompts(n) -> path of a prompt file with entries p0 .. p<n-1>."""
+    return lambda n, name="prompts.txt": write_prompts(tmp_path / name, n)
+
+
+@pytest.fixture
+def standin():
+    """(state, url) of a local random.org stand-in (yfg_random.standin); needs requests."""
+    pytest.importorskip("requests")
+    from yfg_random.standin import serve
+
+    server, state, url = serve()
+    yield state, url
+    server.shutdown()
+    server.server_close()
@@ -0,0 +1,37 @@
+from fractions import Fraction
+
+import pytest
+
+from yfg_random.alias import AliasTable
+
+
+def _mass(table):
+    """Exact probability of each entry over every (column, coin) outcome."""
+    n, mass = len(table), [Fraction(0)] * len(table)
+    for c in range(n):
+        keep = Fraction(table.prob[c])
+        mass[c] += keep / n
+        mass[table.alias[c]] += (1 - keep) / n
+    return mass
+
+
+@pytest.mark.parametrize("weights", [[1], [1, 1, 1], [1, 2, 3, 0, 4], [0.5, 0, 0, 7.25], [1] * 99 + [1000]])
+def test_reproduces_the_weights(weights):
+    table = AliasTable(weights)
+    total = sum(weights)
+    for got, w in zip(_mass(table), weights):
+        assert float(got) == pytest.approx(w / total, abs=1e-12)
+
+
+def test_zero_weights_are_never_sampled():
+    table = AliasTable([0, 3, 0, 1])
+    assert table.support == 2
+    for column in range(len(table)):
+        for coin in (0.0, 0.25, 0.5, 0.999999):
+            assert table.sample(column, coin) in (1, 3)
+
+
+@pytest.mark.parametrize("weights", [[], [0, 0], [-1, 1]])
+def test_needs_a_positive_total(weights):
+    with pytest.raises(ValueError):
+        AliasTable(weights)
@@ -0,0 +1,113 @@
+import os
+import threading
+from collections import Counter
+
+from yfg_random.entropy import SOURCE_FALLBACK, SOURCE_RANDOM_ORG, EntropyPool
+from yfg_random.randomorg import RandomOrgClient
+from yfg_random.reserve import EntropyReserve
+
+_UNREACHABLE = "http://127.0.0.1:9/json-rpc/2/invoke"
+
+
+def _pool(url, **options):
+    client = RandomOrgClient(key_path=os.devnull, url=url, retries=0, backoff=0.001, deadline=5.0)
+    return EntropyPool(client, api_key="k", **options)
+
+
+def test_pool_falls_back_to_urandom_and_recovers(standin):
+    state, url = standin
+    state.down = True
+    pool = _pool(url)
+    nums, source = pool.draw(20, 1, 6)
+    assert source == SOURCE_FALLBACK
+    assert len(nums) == 20 and set(nums) <= set(range(1, 7))
+    assert pool.stats()["falling_back"]
+
+    state.down = False
+    nums, source = pool.draw(20, 1, 6)
+    assert source == SOURCE_RANDOM_ORG
+    assert len(nums) == 20 and set(nums) <= set(range(1, 7))
+    assert not pool.stats()["falling_back"]
+
+
+def test_pool_stops_fetching_once_the_quota_is_spent(standin):
+    state, url = standin
+    state.bits_left = 0
+    nums, source = _pool(url).draw(5, 0, 255)
+    assert source == SOURCE_FALLBACK and len(nums) == 5
+    assert state.served == 1        # the getUsage poll, no generateBlobs
+
+
+def test_reserve_hands_out_each_byte_once(tmp_path):
+    reserve = EntropyReserve(str(tmp_path / "r" / "reserve.bin"))
+    assert reserve.claim(4) == b""
+    assert reserve.spill(b"abcdef") == 6
+    assert reserve.claim(4) == b"abcd"
+    # A second handle on the same file sees the consumed offset
+    other = EntropyReserve(reserve.path)
+    assert other.available() == 2
+    assert other.spill(b"gh") == 4
+    assert reserve.claim(10) == b"efgh"
+    assert reserve.claim(1) == b""
+
+
+def test_reserve_keeps_at_most_max_bytes(tmp_path):
+    reserve = EntropyReserve(str(tmp_path / "reserve.bin"), max_bytes=4)
+    assert reserve.spill(b"abcdef") == 4
+    assert reserve.claim(10) == b"abcd"
+
+
+def test_pool_serves_the_reserve_first_and_spills_back(tmp_path):
+    data = os.urandom(4096)
+    reserve = EntropyReserve(str(tmp_path / "reserve.bin"))
+    reserve.spill(data)
+    # Nothing listens here: every byte has to come from the reserve
+    pool = _pool(_UNREACHABLE, reserve=reserve)
+    assert pool.take(16) == data[:16]
+    stats = pool.stats()
+    assert stats["bytes_fetched"] == 0 and stats["bytes_from_reserve"] == pool.block_bytes
+
+    pool.spill()
+    assert pool.stats()["bytes_buffered"] == 0
+    # Unserved bytes go back after what was still on disk; none is lost or repeated
+    assert reserve.claim(len(data)) == data[pool.block_bytes:] + data[16:pool.block_bytes]
+
+
+def test_randint_rejects_instead_of_folding(tmp_path):
+    # Every byte value once: span 6 keeps 3 bits and rejects 6 and 7, so
+    # the 254 bytes up to the last accepted one give exactly 32 of each value
+    reserve = EntropyReserve(str(tmp_path / "reserve.bin"))
+    reserve.spill(bytes(range(256)))
+    pool = _pool(_UNREACHABLE, reserve=reserve, block_bytes=256, low_water=0)
+    nums = pool.randints(192, 10, 15)
+    assert Counter(nums) == {v: 32 for v in range(10, 16)}
+    assert pool.stats()["bytes_served"] == 254
+    assert pool.randint(7, 7) == 7
+
+
+def test_randint_covers_wide_ranges(tmp_path):
+    reserve = EntropyReserve(str(tmp_path / "reserve.bin"))
+    reserve.spill(os.urandom(8192))
+    pool = _pool(_UNREACHABLE, reserve=reserve)
+    lo, hi = -10 ** 20, 10 ** 20
+    nums = pool.randints(100, lo, hi)
+    assert all(lo <= v <= hi for v in nums) and len(set(nums)) == 100
+    assert min(nums) < 0 < max(nums)
+
+
+def test_concurrent_takes_serve_each_byte_once(tmp_path):
+    data = b"".join(i.to_bytes(2, "big") for i in range(4096))
+    reserve = EntropyReserve(str(tmp_path / "reserve.bin"))
+    reserve.spill(data)
+    pool = _pool(_UNREACHABLE, reserve=reserve, max_bytes=len(data))
+    out = []
+
+    def worker():
+        out.extend(pool.take(2) for _ in range(512))
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert sorted(out) == sorted(data[i:i + 2] for i in range(0, len(data), 2))
@@ -0,0 +1,83 @@
+import logging
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("PIL")
+
+from libs import histogram  # noqa: E402
+
+
+def test_missing_matplotlib_is_logged_once(monkeypatch, caplog):
+    monkeypatch.setattr(histogram, "_warned_no_matplotlib", False)
+    with caplog.at_level(logging.WARNING, logger=histogram.__name__):
+        assert all(histogram.use_fast_renderer("matplotlib", False) for _ in range(6))
+    assert len(caplog.records) == 1
+    assert histogram.use_fast_renderer("fast", True)
+    assert not histogram.use_fast_renderer("matplotlib", True)
+
+
+def test_fast_and_matplotlib_renderers_give_the_same_layout():
+    matplotlib = pytest.importorskip("matplotlib")
+    matplotlib.use("Agg")
+    from matplotlib import pyplot as plt
+
+    counts = histogram.compute_histograms(np.random.default_rng(0).integers(0, 256, (32, 32, 3), dtype=np.uint8))
+    lum = counts["luminosity"]
+    fast = histogram.render_histogram([(lum, "gray")], 50)
+    plt.figure()
+    plt.plot(lum, color="gray")
+    plt.fill_between(range(256), lum, color="gray", alpha=0.5)
+    plt.xlim([0, 256])
+    plt.axis('off')
+    slow = histogram.figure_image(plt, 50)
+    assert fast.mode == slow.mode == "RGB"
+    assert np.asarray(fast).shape[2] == np.asarray(slow).shape[2] == 3
+
+
+def _reference(rgb):
+    """Counts from a plain per-pixel loop, with OpenCV's fixed-point RGB2GRAY."""
+    channels = [[0] * 256 for _ in range(3)]
+    lum = [0] * 256
+    for r, g, b in rgb.reshape(-1, 3).tolist():
+        for c, v in enumerate((r, g, b)):
+            channels[c][v] += 1
+        lum[(r * 9798 + g * 19235 + b * 3735 + (1 << 14)) >> 15] += 1
+    return channels, lum
+
+
+def test_bincount_counts_match_a_per_pixel_loop(monkeypatch):
+    monkeypatch.setattr(histogram, "cv", None)
+    rgb = np.random.default_rng(1).integers(0, 256, (40, 30, 3), dtype=np.uint8)
+    rgb[0, :4] = [[0, 0, 0], [255, 255, 255], [255, 0, 0], [0, 0, 255]]
+    counts = histogram.compute_histograms(rgb)
+    channels, lum = _reference(rgb)
+    assert [c.tolist() for c in counts["channels"]] == channels
+    assert counts["luminosity"].tolist() == lum
+    assert all(len(c) == 256 for c in counts["channels"] + [counts["luminosity"]])
+
+
+def test_grey_alpha_and_float_images_are_normalised(monkeypatch):
+    monkeypatch.setattr(histogram, "cv", None)
+    grey = np.random.default_rng(2).integers(0, 256, (16, 16), dtype=np.uint8)
+    counts = histogram.compute_histograms(grey)
+    expected = np.bincount(grey.ravel(), minlength=256).tolist()
+    assert all(c.tolist() == expected for c in counts["channels"])
+    assert counts["luminosity"].tolist() == expected
+
+    rgba = np.dstack([np.repeat(grey[..., None], 3, axis=-1), np.zeros_like(grey)])
+    assert counts["luminosity"].tolist() == histogram.compute_histograms(rgba)["luminosity"].tolist()
+
+    floats = np.array([[[-5.0, 300.0, 128.0]]])
+    out = histogram.compute_histograms(floats)
+    assert [int(np.argmax(c)) for c in out["channels"]] == [0, 255, 128]
+
+
+def test_opencv_and_bincount_paths_agree(monkeypatch):
+    pytest.importorskip("cv2")
+    rgb = np.random.default_rng(3).integers(0, 256, (64, 48, 3), dtype=np.uint8)
+    fast = histogram.compute_histograms(rgb)
+    monkeypatch.setattr(histogram, "cv", None)
+    slow = histogram.compute_histograms(rgb)
+    assert [c.tolist() for c in fast["channels"]] == [c.tolist() for c in slow["channels"]]
+    assert fast["luminosity"].tolist() == slow["luminosity"].tolist()
@@ -0,0 +1,41 @@
+import random
+
+from yfg_random.history import BitmapHistory, HistoryStore, UniqueHistory
+
+
+def test_bitmap_only_where_it_is_smaller_than_the_dict():
+    store = HistoryStore()
+    # 10M values: 1.25 MB of bitmap against ~10 MB for 100k dict entries
+    assert isinstance(store.scope("a", (0, 9_999_999), 100_000), BitmapHistory)
+    # ... but only ~10 KB for 100 entries
+    assert isinstance(store.scope("b", (0, 9_999_999), 100), UniqueHistory)
+    assert isinstance(store.scope("c", (1, 80_000), 100), BitmapHistory)
+    assert isinstance(store.scope("d", (1, 80_008), 100), UniqueHistory)
+    # Unlimited history can fill the range; past 100M values it never suits
+    assert isinstance(store.scope("e", (0, 99_999_999), 0), BitmapHistory)
+    assert isinstance(store.scope("f", (0, 100_000_000), 0), UniqueHistory)
+    assert isinstance(store.scope("g", None, 100), UniqueHistory)
+
+
+def test_bitmap_and_dict_backends_agree():
+    rng = random.Random(7)
+    for history_size in (1, 5, 50):
+        bitmap, plain = BitmapHistory(10, 40), UniqueHistory()
+        for step in range(5000):
+            value = rng.randint(10, 40)
+            assert bitmap.is_duplicate(value, history_size) == plain.is_duplicate(value, history_size), step
+            # Re-remembering a value makes it the newest in both backends
+            bitmap.remember(value, history_size, now=step)
+            plain.remember(value, history_size, now=step)
+            assert len(bitmap) == len(plain)
+            assert all((v in bitmap) == (v in plain) for v in range(10, 41))
+
+
+def test_bitmap_drops_stale_slots_without_changing_answers():
+    bitmap, plain = BitmapHistory(0, 9), UniqueHistory()
+    for step in range(20000):
+        value = step % 3 if step % 7 else step % 10
+        bitmap.remember(value, 8, now=step)
+        plain.remember(value, 8, now=step)
+    assert len(bitmap._order) - bitmap._head < 4096
+    assert [v in bitmap for v in range(10)] == [v in plain for v in range(10)]
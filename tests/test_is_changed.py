@@ -0,0 +1,46 @@
+import math
+
+from conftest import prompt_inputs, run_prompt
+
+
+def _check(m, inputs):
+    return m.YFGRandomPromptFromFile.IS_CHANGED(**inputs)
+
+
+def test_is_changed_plans_without_moving_anything(prompt_node, prompts):
+    inputs = prompt_inputs(prompts(5), selection_mode="incremental")
+    first = _check(prompt_node, inputs)
+    # Checking again, or never running, moves no cursor
+    assert all(_check(prompt_node, inputs) == first for _ in range(5))
+    assert run_prompt(prompt_node, **inputs)[3] == [0]
+    second = _check(prompt_node, inputs)
+    assert second != first
+    assert run_prompt(prompt_node, **inputs)[3] == [1]
+
+
+def test_held_prompt_hashes_the_same_so_comfyui_caches_it(prompt_node, prompts):
+    inputs = prompt_inputs(prompts(3), selection_mode="incremental_no_wrap")
+    seen = []
+    for _ in range(6):
+        h = _check(prompt_node, inputs)
+        if seen and h == seen[-1][0]:
+            seen.append((h, "cached"))     # ComfyUI skips load_prompt
+            continue
+        result = run_prompt(prompt_node, **inputs)
+        seen.append((h, (result[3][0], result[4][0])))
+    assert [s for _, s in seen] == [(0, -1), (1, 0), (2, 1), "cached", "cached", "cached"]
+
+
+def test_unique_random_picks_always_run(prompt_node, prompts):
+    inputs = prompt_inputs(prompts(5))
+    assert math.isnan(_check(prompt_node, inputs))
+    picks = {run_prompt(prompt_node, **inputs)[3][0] for _ in range(5)}
+    assert picks == set(range(5))
+
+
+def test_plan_is_dropped_when_the_file_changes(prompt_node, prompts, tmp_path):
+    path = prompts(4)
+    inputs = prompt_inputs(path, selection_mode="by_index", index=1)
+    _check(prompt_node, inputs)
+    (tmp_path / "prompts.txt").write_text("positive: new0\n---\npositive: new1\n", encoding="utf-8")
+    assert run_prompt(prompt_node, **inputs)[0] == ["new1"]
@@ -0,0 +1,35 @@
+import pytest
+
+from yfg_random.permutation import FeistelPermutation
+
+
+@pytest.mark.parametrize("n", [1, 2, 3, 4, 5, 16, 17, 255, 256, 1000, 4099])
+def test_is_a_bijection_on_range_n(n):
+    perm = FeistelPermutation(n, b"key")
+    assert len(perm) == n
+    assert sorted(perm[i] for i in range(n)) == list(range(n))
+
+
+def test_order_depends_only_on_the_key():
+    a, b = FeistelPermutation(1000, b"one"), FeistelPermutation(1000, b"two")
+    assert [a[i] for i in range(1000)] == [FeistelPermutation(1000, b"one")[i] for i in range(1000)]
+    assert [a[i] for i in range(1000)] != [b[i] for i in range(1000)]
+    # Not the identity, and not a fixed shift of it
+    assert len({(a[i] - i) % 1000 for i in range(1000)}) > 100
+
+
+def test_huge_domains_cost_nothing_up_front():
+    n = 2 ** 64
+    perm = FeistelPermutation(n, b"key")
+    sample = [perm[i] for i in range(2000)] + [perm[n - 1 - i] for i in range(2000)]
+    assert all(0 <= v < n for v in sample)
+    assert len(set(sample)) == len(sample)
+
+
+def test_rejects_bad_domains_and_indices():
+    with pytest.raises(ValueError):
+        FeistelPermutation(0, b"key")
+    perm = FeistelPermutation(10, b"key")
+    for i in (-1, 10):
+        with pytest.raises(IndexError):
+            perm[i]
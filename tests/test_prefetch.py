@@ -0,0 +1,90 @@
+import os
+import time
+
+import pytest
+
+from yfg_random import prefetch
+from yfg_random.entropy import EntropyPool
+from yfg_random.randomorg import RandomOrgClient
+from yfg_random.reserve import EntropyReserve
+
+
+@pytest.fixture
+def requested(monkeypatch):
+    """{api_key: bytes} passed to each pool's prefetch(), with a configured key."""
+    asked = {}
+
+    class _Pool:
+        def __init__(self, key):
+            self.key = key
+
+        def prefetch(self, nbytes=0):
+            asked[self.key] = asked.get(self.key, 0) + nbytes
+
+    monkeypatch.setattr(prefetch, "entropy_pool", _Pool)
+    monkeypatch.setattr(prefetch, "random_org", lambda: RandomOrgClient(key_path=os.devnull))
+    monkeypatch.setenv("RANDOM_ORG_API_KEY", "configured")
+    return asked
+
+
+def test_demand_is_summed_per_pool(requested):
+    prompt = {
+        "1": {"class_type": "RandomOrgV2TrueRandomNumber_node",
+              "inputs": {"minimum": 0, "maximum": 1000, "count": 3, "ensure_unique": False}},
+        "2": {"class_type": "YFGRandomPromptFromFile_node", "inputs": {"count": 2}},
+        "3": {"class_type": "RandomOrgTrueRandomNumber_node",
+              "inputs": {"api_key": "own", "minimum": 1, "maximum": 6}},
+        "4": {"class_type": "KSampler", "inputs": {"seed": 1}},
+    }
+    assert prefetch.prefetch_for_prompt(prompt) == {None: 3 * 4 + 16, "own": 2}
+    assert requested == {None: 28, "own": 2}
+
+
+@pytest.mark.parametrize("node", [
+    # Fixed picks, local randomness and bags over small ranges need no bytes
+    {"class_type": "RandomOrgV2TrueRandomNumber_node", "inputs": {"mode": "fixed"}},
+    {"class_type": "RandomOrgV2TrueRandomNumber_node", "inputs": {"minimum": 0, "maximum": 99}},
+    {"class_type": "YFGRandomPromptFromFile_node", "inputs": {"random_source": "local"}},
+    {"class_type": "YFGRandomPromptFromFile_node", "inputs": {"selection_mode": "incremental"}},
+    {"class_type": "RandomOrgTrueRandomNumber_node",
+     "inputs": {"api_key": prefetch._V1_PLACEHOLDER_KEY}},
+    {"class_type": "RandomImageFromDirectory_node", "inputs": {"random_source": "local"}},
+    # Bad widget values are skipped
+    {"class_type": "YFGRandomPromptFromFile_node", "inputs": {"count": "many"}},
+])
+def test_nodes_that_draw_nothing_start_no_refill(requested, node):
+    assert prefetch.prefetch_for_prompt({"1": node}) == {}
+    assert requested == {}
+
+
+def test_linked_widgets_count_as_their_defaults(requested):
+    # A link can't be read at queue time; the node's default draws from the pool
+    node = {"class_type": "RandomImageFromDirectory_node", "inputs": {"random_source": ["5", 0]}}
+    assert prefetch.prefetch_for_prompt({"1": node}) == {None: 8}
+
+
+def test_huge_bag_ranges_want_one_permutation_key(requested):
+    node = {"class_type": "RandomOrgV2TrueRandomNumber_node",
+            "inputs": {"minimum": 0, "maximum": 10 ** 9, "count": 50}}
+    assert prefetch.prefetch_for_prompt({"1": node}) == {None: 32}
+
+
+def test_shared_pool_is_skipped_without_a_key(requested, monkeypatch):
+    monkeypatch.delenv("RANDOM_ORG_API_KEY")
+    node = {"class_type": "YFGRandomPromptFromFile_node", "inputs": {}}
+    assert prefetch.prefetch_for_prompt({"1": node, "2": "not a node"}) == {}
+
+
+def test_pool_prefetch_fills_in_the_background(tmp_path):
+    reserve = EntropyReserve(str(tmp_path / "reserve.bin"))
+    reserve.spill(os.urandom(4096))
+    client = RandomOrgClient(key_path=os.devnull, url="http://127.0.0.1:9/json-rpc/2/invoke",
+                             retries=0, deadline=5.0)
+    pool = EntropyPool(client, api_key="k", reserve=reserve)
+    pool.prefetch(3000)
+    deadline = time.monotonic() + 5
+    while pool.stats()["refilling"] and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert pool.stats()["bytes_buffered"] >= 3000
+    pool.take(3000)
+    assert pool.stats()["waits"] == 0
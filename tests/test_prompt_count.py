@@ -0,0 +1,51 @@
+import asyncio
+import gzip
+import io
+import time
+
+from conftest import write_prompts
+
+
+def _finish(loop, job, timeout=10.0):
+    async def wait():
+        deadline = time.monotonic() + timeout
+        while job["state"] == "running" and time.monotonic() < deadline:
+            await asyncio.sleep(0.01)
+    loop.run_until_complete(wait())
+    return job
+
+
+def test_count_job_runs_off_the_loop_and_reports_progress(prompt_node, tmp_path, monkeypatch):
+    jobs = prompt_node._CountJobs
+    monkeypatch.setattr(jobs, "_jobs", type(jobs._jobs)())
+    monkeypatch.setattr(jobs, "_by_source", {})
+    path = write_prompts(tmp_path / "big.txt", 20000)
+    size = (tmp_path / "big.txt").stat().st_size
+    loop = asyncio.new_event_loop()
+    try:
+        job = jobs.start(loop, path, size)
+        assert job["state"] == "running" and job["bytes_total"] == size
+        # A second request for the same source shares the running job
+        assert jobs.start(loop, path, size) is job or job["state"] == "done"
+        _finish(loop, job)
+    finally:
+        loop.close()
+    assert jobs.public(job) == {"job": job["job"], "state": "done", "bytes_done": size,
+                                "bytes_total": size, "count": 20000, "files": 1}
+    assert jobs.get(job["job"]) is job
+    # The parse cache is filled, so the pool is current without parsing again
+    assert prompt_node._PromptPool.peek(path).total == 20000
+
+
+def test_tracked_lines_publish_bytes_read(prompt_node):
+    m = prompt_node
+    data = gzip.compress("".join(f"line {i}\n" for i in range(50000)).encode("utf-8"))
+    raw = io.BytesIO(data)
+    progress = {"file_base": 100}
+    with m._open_text(raw, "x.txt.gz") as f:
+        seen = []
+        for n, _ in enumerate(m._tracked_lines(f, raw, progress, every=1000)):
+            if n % 1000 == 0:
+                seen.append(progress["bytes_done"])
+    assert seen == sorted(seen) and 100 <= seen[0] and seen[-1] <= 100 + len(data)
+    assert seen[-1] > seen[0]
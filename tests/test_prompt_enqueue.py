@@ -0,0 +1,75 @@
+import pytest
+
+from conftest import prompt_inputs
+
+NODE = "YFGRandomPromptFromFile_node"
+
+
+def _workflow(inputs):
+    return {
+        "1": {"class_type": NODE, "inputs": inputs},
+        "2": {"class_type": "CLIPTextEncode", "inputs": {"text": ["1", 0], "clip": ["3", 0]}},
+        "3": {"class_type": "CheckpointLoaderSimple", "inputs": {"ckpt_name": "x.safetensors"}},
+        "4": {"class_type": "SaveImage", "inputs": {"filename_prefix": ["1", 2], "images": ["5", 0]}},
+    }
+
+
+def test_find_prompt_node_needs_one_node_or_a_valid_id(prompt_node, prompts):
+    m = prompt_node
+    prompt = _workflow(prompt_inputs(prompts(3)))
+    assert m._find_prompt_node(prompt) == "1"
+    assert m._find_prompt_node(prompt, "1") == "1"
+    with pytest.raises(ValueError):
+        m._find_prompt_node(prompt, "3")
+    with pytest.raises(ValueError):
+        m._find_prompt_node(dict(prompt, **{"9": {"class_type": NODE, "inputs": {}}}))
+
+
+def test_pin_jobs_run_the_node_by_index(prompt_node, prompts):
+    m = prompt_node
+    prompt = _workflow(prompt_inputs(prompts(10)))
+    jobs, idxs = m._enqueue_jobs(prompt, "1", 1, -1, 3, "pin")
+    assert idxs == [1, 4, 7]
+    assert [j["1"]["inputs"]["index"] for j in jobs] == idxs
+    assert all(j["1"]["inputs"]["selection_mode"] == "by_index" for j in jobs)
+    # Each job is its own copy, and the caller's workflow is untouched
+    jobs[0]["2"]["inputs"]["text"] = "changed"
+    assert jobs[1]["2"]["inputs"]["text"] == ["1", 0]
+    assert prompt["1"]["inputs"]["selection_mode"] == "random"
+
+
+def test_bake_jobs_replace_links_with_resolved_outputs(prompt_node, prompts):
+    m = prompt_node
+    path = prompts(5)
+    prompt = _workflow(prompt_inputs(path))
+    jobs, idxs = m._enqueue_jobs(prompt, "1", 0, 2, 1, "bake")
+    assert idxs == [0, 1, 2]
+    assert all("1" not in j for j in jobs)
+    assert [j["2"]["inputs"]["text"] for j in jobs] == ["p0", "p1", "p2"]
+    assert jobs[0]["2"]["inputs"]["clip"] == ["3", 0]
+    assert jobs[0]["4"]["inputs"]["filename_prefix"] == "prompts"
+    # Baking is a dry run: nothing is committed to the node's state
+    assert m.YFGRandomPromptFromFile._previous == {}
+
+
+@pytest.mark.parametrize("lo,hi,stride,mode,edit", [
+    (5, -1, 1, "pin", None),                                    # range past the end
+    (0, -1, 1, "pin", lambda p: p["1"]["inputs"].update(prompt_file="")),
+    (0, -1, 1, "pin", lambda p: p["1"]["inputs"].update(prompt_file="/nonexistent/x.txt")),
+    (0, -1, 1, "bake", lambda p: p["1"]["inputs"].update(history_size=["3", 0])),
+    (0, -1, 1, "bake", lambda p: p["4"]["inputs"].update(images=["1", 99])),
+])
+def test_bad_requests_are_refused(prompt_node, prompts, lo, hi, stride, mode, edit):
+    prompt = _workflow(prompt_inputs(prompts(5)))
+    if edit:
+        edit(prompt)
+    with pytest.raises(ValueError):
+        prompt_node._enqueue_jobs(prompt, "1", lo, hi, stride, mode)
+
+
+def test_job_count_is_capped(prompt_node, prompts, monkeypatch):
+    monkeypatch.setattr(prompt_node, "ENQUEUE_MAX", 3)
+    prompt = _workflow(prompt_inputs(prompts(5)))
+    with pytest.raises(ValueError):
+        prompt_node._enqueue_jobs(prompt, "1", 0, -1, 1, "pin")
+    assert len(prompt_node._enqueue_jobs(prompt, "1", 0, -1, 2, "pin")[0]) == 3
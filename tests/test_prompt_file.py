@@ -0,0 +1,20 @@
+import pytest
+
+from conftest import prompt_inputs as _inputs, run_prompt as _run
+
+
+@pytest.mark.parametrize("use_shuffle_bag", [True, False])
+def test_batch_stays_distinct_once_history_is_saturated(prompt_node, prompts, use_shuffle_bag):
+    path = prompts(3)
+    for _ in range(12):
+        idxs = _run(prompt_node, **_inputs(path, count=3, use_shuffle_bag=use_shuffle_bag))[3]
+        assert sorted(idxs) == [0, 1, 2]
+
+
+def test_zero_weight_entries_are_never_picked(prompt_node, tmp_path):
+    path = tmp_path / "weighted.txt"
+    path.write_text("positive: a\nweight: 0\n---\npositive: b\nweight: 3\n---\npositive: c\n", encoding="utf-8")
+    picks = [i for _ in range(40)
+             for i in _run(prompt_node, **_inputs(str(path), ensure_unique=False, count=5))[3]]
+    assert set(picks) == {1, 2}
+    assert picks.count(1) > picks.count(2)
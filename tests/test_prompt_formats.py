@@ -0,0 +1,71 @@
+import bz2
+import csv
+import gzip
+import io
+import json
+import lzma
+
+import pytest
+
+from conftest import load_node, prompt_inputs, run_prompt
+
+ENTRIES = [("a cat, \"quoted\"", "blurry", "first", 1.0),
+           ("a dog\nsecond line", "", "second", 2.5),
+           ("a bird", "low quality", "", 1.0)]
+
+
+def _txt():
+    blocks = []
+    for pos, neg, name, weight in ENTRIES:
+        lines = [f"positive: {pos}", f"negative: {neg}"]
+        if name:
+            lines.append(f"name: {name}")
+        if weight != 1.0:
+            lines.append(f"weight: {weight}")
+        blocks.append("\n".join(lines))
+    return "---\n" + "\n-----\n".join(blocks) + "\n---\n"
+
+
+def _jsonl():
+    return "\n".join(json.dumps({"positive": p, "negative": n, "name": m, "weight": w})
+                     for p, n, m, w in ENTRIES) + "\n\n"
+
+
+def _csv(delimiter):
+    out = io.StringIO()
+    writer = csv.writer(out, delimiter=delimiter)
+    writer.writerow(["Positive", "negative", "name", "weight"])
+    for row in ENTRIES:
+        writer.writerow(row)
+    return out.getvalue()
+
+
+SOURCES = {".txt": _txt, ".jsonl": _jsonl, ".csv": lambda: _csv(","), ".tsv": lambda: _csv("\t")}
+COMPRESSORS = {"": lambda b: b, ".gz": gzip.compress, ".bz2": bz2.compress, ".xz": lzma.compress}
+
+
+@pytest.mark.parametrize("compression", list(COMPRESSORS))
+@pytest.mark.parametrize("fmt", list(SOURCES))
+def test_every_format_reads_the_same_entries(tmp_path, fmt, compression):
+    m = load_node("YFGRandomPromptFromFile")
+    path = tmp_path / f"prompts{fmt}{compression}"
+    path.write_bytes(COMPRESSORS[compression](SOURCES[fmt]().encode("utf-8")))
+    prompts, weights = m._PromptFileCache._parse(str(path))
+    assert prompts == [(p, n, name or "prompts") for p, n, name, _ in ENTRIES]
+    assert list(weights) == [w for *_, w in ENTRIES]
+
+
+def test_unreadable_records_are_skipped(tmp_path):
+    m = load_node("YFGRandomPromptFromFile")
+    path = tmp_path / "mixed.jsonl"
+    path.write_text('"just a string"\n{broken\n[1, 2]\n{"positive": "ok", "weight": "x"}\n', encoding="utf-8")
+    prompts, weights = m._PromptFileCache._parse(str(path))
+    assert prompts == [("just a string", "", "mixed"), ("ok", "", "mixed")]
+    assert weights is None
+
+
+def test_node_picks_from_a_compressed_file(prompt_node, tmp_path):
+    path = tmp_path / "prompts.jsonl.xz"
+    path.write_bytes(lzma.compress(_jsonl().encode("utf-8")))
+    result = run_prompt(prompt_node, **prompt_inputs(str(path), selection_mode="by_index", index=1))
+    assert result[0] == ["a dog\nsecond line"] and result[2] == ["second"] and result[5] == 3
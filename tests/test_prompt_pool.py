@@ -0,0 +1,50 @@
+import os
+
+from conftest import prompt_inputs, run_prompt, write_prompts
+
+
+def _folder(tmp_path):
+    folder = tmp_path / "pool"
+    (folder / "sub").mkdir(parents=True)
+    write_prompts(folder / "file10.txt", 1)
+    write_prompts(folder / "file2.txt", 2)
+    (folder / "file3.jsonl").write_text('"j0"\n"j1"\n"j2"\n', encoding="utf-8")
+    (folder / "notes.md").write_text("positive: not a prompt file\n", encoding="utf-8")
+    write_prompts(folder / "sub" / "deep.txt", 4)
+    return folder
+
+
+def test_folder_is_one_pool_in_natural_order(prompt_node, tmp_path):
+    folder = _folder(tmp_path)
+    pool = prompt_node._PromptPool.load(str(folder))
+    assert [os.path.basename(p) for p in pool.paths] == ["file2.txt", "file3.jsonl", "file10.txt"]
+    assert pool.total == 6 and pool.starts == [0, 2, 5]
+    assert [pool.entry(i)[0] for i in range(6)] == ["p0", "p1", "j0", "j1", "j2", "p0"]
+    assert pool.locate(4) == (1, 2)
+
+
+def test_recursive_glob_reaches_subfolders(prompt_node, tmp_path):
+    folder = _folder(tmp_path)
+    pool = prompt_node._PromptPool.load(str(folder / "**" / "*.txt"))
+    assert pool.total == 1 + 2 + 4
+
+
+def test_global_index_picks_across_files(prompt_node, tmp_path):
+    folder = str(_folder(tmp_path))
+    result = run_prompt(prompt_node, **prompt_inputs(folder, selection_mode="by_index", index=3))
+    assert result[0] == ["j1"] and result[5] == 6
+    assert result[7] == ["file3.jsonl"]
+    walk = [run_prompt(prompt_node, **prompt_inputs(folder, selection_mode="incremental"))[0][0]
+            for _ in range(6)]
+    assert walk == ["p0", "p1", "j0", "j1", "j2", "p0"]
+
+
+def test_editing_one_file_rebuilds_the_pool(prompt_node, tmp_path):
+    folder = _folder(tmp_path)
+    pool = prompt_node._PromptPool.load(str(folder))
+    assert prompt_node._PromptPool.load(str(folder)) is pool
+    write_prompts(folder / "file2.txt", 5)
+    os.utime(folder / "file2.txt", (1, 1))
+    rebuilt = prompt_node._PromptPool.load(str(folder))
+    assert rebuilt is not pool and rebuilt.total == 9
+    assert rebuilt.fingerprint != pool.fingerprint
@@ -0,0 +1,52 @@
+import random
+from array import array
+
+import pytest
+
+from conftest import load_node, prompt_inputs, run_prompt
+
+TEXTS = ["red cat on a sofa", "blue dog", "Red Dog running", "a cat, a dog", "green CAT", "dogs and cats"]
+
+
+@pytest.fixture
+def query_file(tmp_path):
+    path = tmp_path / "q.txt"
+    path.write_text("\n---\n".join(f"positive: {t}\nname: n{i}" for i, t in enumerate(TEXTS)) + "\n",
+                    encoding="utf-8")
+    return str(path)
+
+
+def test_intersect_matches_a_set_intersection():
+    m = load_node("YFGRandomPromptFromFile")
+    rng = random.Random(3)
+    for _ in range(200):
+        lists = [sorted(rng.sample(range(60), rng.randint(0, 40))) for _ in range(rng.randint(1, 4))]
+        expected = sorted(set(lists[0]).intersection(*lists[1:]))
+        assert m._intersect([array("I", lst) for lst in lists]) == expected
+    assert m._intersect([]) == []
+
+
+def test_search_needs_every_word_as_a_whole_token(prompt_node, query_file):
+    pool = prompt_node._PromptPool.load(query_file)
+    assert pool.search("cat") == [0, 3, 4]
+    assert pool.search("DOG cat") == [3]
+    assert pool.search("dog, dog!") == [1, 2, 3]
+    assert pool.search("n5") == [5]             # names are indexed too
+    assert pool.search("cat horse") == []
+    assert pool.search("  ,, ") == []
+
+
+def test_by_query_picks_only_matches(prompt_node, query_file):
+    inputs = prompt_inputs(query_file, selection_mode="by_query", query="dog", count=3)
+    for _ in range(4):
+        assert sorted(run_prompt(prompt_node, **inputs)[3]) == [1, 2, 3]
+    walk = [run_prompt(prompt_node, **dict(inputs, query_order="incremental", count=1))[3][0]
+            for _ in range(4)]
+    assert walk == [1, 2, 3, 1]
+    ranged = dict(inputs, count=1, range_start=2, range_end=5)
+    assert {run_prompt(prompt_node, **ranged)[3][0] for _ in range(6)} == {2, 3}
+
+
+def test_by_query_without_matches_fails(prompt_node, query_file):
+    with pytest.raises(Exception, match="match query"):
+        run_prompt(prompt_node, **prompt_inputs(query_file, selection_mode="by_query", query="horse"))
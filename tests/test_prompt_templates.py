@@ -0,0 +1,74 @@
+import random
+from collections import Counter
+
+import pytest
+
+from conftest import prompt_inputs, run_prompt
+
+
+@pytest.mark.parametrize("text", ["plain", "a {literal} brace", "unclosed {a|b", "snake_case and __ alone", ""])
+def test_text_without_templates_stays_literal(prompt_node, text):
+    m = prompt_node
+    template = m._compile_template(text)
+    assert not m._is_dynamic(template)
+    assert m._expand_template(template, random.Random(0), []) == text
+
+
+def test_alternations_nest_and_pick_every_branch(prompt_node):
+    m = prompt_node
+    template = m._compile_template("a {red|{dark|light} blue} {cat|dog}")
+    assert m._is_dynamic(template)
+    rng = random.Random(0)
+    seen = Counter(m._expand_template(template, rng, []) for _ in range(400))
+    assert set(seen) == {f"a {c} {p}" for c in ("red", "dark blue", "light blue") for p in ("cat", "dog")}
+    # Empty branches are allowed
+    assert {m._expand_template(m._compile_template("x{|!}"), rng, []) for _ in range(50)} == {"x", "x!"}
+
+
+def test_wildcards_expand_recursively_from_the_first_dir_that_has_them(prompt_node, tmp_path):
+    m = prompt_node
+    first, second = tmp_path / "first", tmp_path / "second"
+    (first / "sub").mkdir(parents=True)
+    second.mkdir()
+    (first / "sub" / "color.txt").write_text("{red|blue}\n", encoding="utf-8")
+    (second / "color.txt").write_text("green\n", encoding="utf-8")
+    (second / "animal.txt").write_text("__sub/color__ cat\n", encoding="utf-8")
+    dirs = [str(first), str(second)]
+    rng = random.Random(0)
+    assert {m._expand_template(m._compile_template("__animal__"), rng, dirs) for _ in range(50)} == {
+        "red cat", "blue cat"}
+    assert m._expand_template(m._compile_template("__color__"), rng, dirs) == "green"
+    # Missing wildcards and paths leaving the dirs stay as written
+    assert m._expand_template(m._compile_template("__nope__ __../second/color__"), rng, dirs) == (
+        "__nope__ __../second/color__")
+
+
+def test_self_referencing_wildcards_stop_at_the_depth_limit(prompt_node, tmp_path):
+    m = prompt_node
+    (tmp_path / "loop.txt").write_text("x__loop__\n", encoding="utf-8")
+    out = m._expand_template(m._compile_template("__loop__"), random.Random(0), [str(tmp_path)])
+    assert out == "x" * m._MAX_WILDCARD_DEPTH + "__loop__"
+
+
+def test_node_expands_templates_only_when_asked(prompt_node, tmp_path):
+    m = prompt_node
+    wild = tmp_path / "wild"
+    wild.mkdir()
+    (wild / "pet.txt").write_text("cat\n", encoding="utf-8")
+    path = tmp_path / "prompts.txt"
+    path.write_text("positive: a {big|small} __pet__\n", encoding="utf-8")
+    inputs = prompt_inputs(str(path), wildcards_dir=str(wild), ensure_unique=False)
+    positives = {run_prompt(m, **inputs)[0][0] for _ in range(30)}
+    assert positives == {"a big cat", "a small cat"}
+    assert run_prompt(m, **dict(inputs, expand_templates=False))[0] == ["a {big|small} __pet__"]
+
+
+def test_seeded_expansion_repeats(prompt_node, tmp_path):
+    m = prompt_node
+    path = tmp_path / "prompts.txt"
+    path.write_text("positive: {a|b|c|d|e|f|g|h} {a|b|c|d|e|f|g|h}\n", encoding="utf-8")
+    inputs = prompt_inputs(str(path), random_source="seeded", seed=7, run_counter=3, count=4,
+                           ensure_unique=False)
+    first = run_prompt(m, **inputs)[0]
+    assert run_prompt(m, **inputs)[0] == first
+    assert run_prompt(m, **dict(inputs, run_counter=4))[0] != first
@@ -0,0 +1,147 @@
+import os
+import time
+
+import pytest
+
+from yfg_random.randomorg import CircuitOpenError, RandomOrgClient, RandomOrgError
+
+
+class _FastClient(RandomOrgClient):
+    COOLDOWN = 0.2
+
+
+def _client(url, **options):
+    return _FastClient(key_path=os.devnull, url=url, **dict(dict(retries=0, backoff=0.001, deadline=5.0), **options))
+
+
+def _count_requests(state, fail_first=0):
+    """Wrap the stand-in's handler: count requests, answer the first fail_first with HTTP 503."""
+    seen, handle = [], state.handle
+
+    def counted(body):
+        seen.append(body)
+        return (503, None) if len(seen) <= fail_first else handle(body)
+
+    state.handle = counted
+    return seen
+
+
+def _half_open_due(client: RandomOrgClient):
+    """Open the circuit with its cool-down already over, so the next call is the probe."""
+    client._breaker.update(state="open", failures=client.FAILURE_THRESHOLD,
+                           opened_at=time.monotonic() - client.MAX_COOLDOWN - 1)
+
+
+def test_unexpected_exception_during_probe_settles_breaker():
+    client = RandomOrgClient(key_path=os.devnull)
+    _half_open_due(client)
+
+    def broken(*args):
+        raise ValueError("not a RandomOrgError")
+
+    client._send = broken
+    with pytest.raises(RandomOrgError, match="not a RandomOrgError"):
+        client.call("generateIntegers", {}, api_key="k")
+    assert client._breaker["probing"] is False
+    assert client.breaker()["state"] == "open"
+    with pytest.raises(CircuitOpenError):
+        client.call("generateIntegers", {}, api_key="k")
+
+    # The next probe is let through and closes the circuit
+    _half_open_due(client)
+    client._send = lambda *args: {"random": {"data": [4]}}
+    assert client.call("generateIntegers", {}, api_key="k") == {"random": {"data": [4]}}
+    assert client.breaker()["state"] == "closed"
+
+
+@pytest.mark.parametrize("total_bits", [0, 250_000, 10_000_000_000])
+def test_low_quota_threshold_ignores_lifetime_usage(total_bits):
+    client = RandomOrgClient(key_path=os.devnull)
+    usage = {"requests_left": 1000, "total_bits": total_bits}
+    assert client._quota_level(dict(usage, bits_left=client.LOW_BITS)) is None
+    assert client._quota_level(dict(usage, bits_left=client.LOW_BITS - 1)) == "low"
+    assert client._quota_level(dict(usage, bits_left=0)) == "exhausted"
+
+
+def test_low_quota_threshold_is_configurable(monkeypatch):
+    monkeypatch.setenv("YFG_RANDOM_ORG_LOW_BITS", "500000")
+    assert RandomOrgClient(key_path=os.devnull)._quota_level({"bits_left": 400_000}) == "low"
+    assert RandomOrgClient(key_path=os.devnull, low_bits=100)._quota_level({"bits_left": 400_000}) is None
+
+
+def test_api_key_file_is_read_only_when_it_changes(tmp_path, monkeypatch):
+    monkeypatch.delenv("RANDOM_ORG_API_KEY", raising=False)
+    path = tmp_path / "random_org_api_key.json"
+    client = RandomOrgClient(key_path=str(path))
+    assert client.api_key() is None
+    path.write_text('{"api_key": " one "}', encoding="utf-8")
+    assert client.api_key() == "one"
+
+    reads, real_open = [], open
+    monkeypatch.setattr("builtins.open", lambda *a, **k: reads.append(a[0]) or real_open(*a, **k))
+    assert [client.api_key() for _ in range(5)] == ["one"] * 5
+    assert reads == []
+
+    path.write_text('{"api_key": "second"}', encoding="utf-8")
+    assert client.api_key() == "second" and reads == [str(path)]
+    path.write_text("not json", encoding="utf-8")
+    assert client.api_key() is None
+    monkeypatch.setenv("RANDOM_ORG_API_KEY", "from-env")
+    assert client.api_key() == "from-env"
+
+
+def test_client_retries_server_errors(standin):
+    state, url = standin
+    seen = _count_requests(state, fail_first=2)
+    client = _client(url, retries=2)
+    assert len(client.integers(3, 1, 6, api_key="k")) == 3
+    assert len(seen) == 3
+    assert client.stats()["retries"] == 2 and client.stats()["ok"] == 1
+
+
+def test_client_gives_up_after_its_retries(standin):
+    state, url = standin
+    state.down = True
+    client = _client(url, retries=2)
+    with pytest.raises(RandomOrgError, match="HTTP 503"):
+        client.integers(1, 1, 6, api_key="k")
+    assert client.stats()["retries"] == 2 and client.stats()["failures"] == 1
+
+
+def test_breaker_opens_after_threshold_and_closes_after_cooldown(standin):
+    state, url = standin
+    state.down = True
+    seen = _count_requests(state)
+    client = _client(url)
+    for _ in range(client.FAILURE_THRESHOLD):
+        assert client.breaker()["state"] == "closed"
+        with pytest.raises(RandomOrgError) as e:
+            client.integers(1, 1, 6, api_key="k")
+        assert not isinstance(e.value, CircuitOpenError)
+    assert client.breaker()["state"] == "open"
+
+    # Open: calls fail at once without reaching the server
+    with pytest.raises(CircuitOpenError):
+        client.integers(1, 1, 6, api_key="k")
+    assert len(seen) == client.FAILURE_THRESHOLD
+
+    # After the cool-down one probe goes out; success closes the circuit
+    state.down = False
+    time.sleep(client.COOLDOWN + 0.05)
+    assert len(client.integers(1, 1, 6, api_key="k")) == 1
+    assert client.breaker() == {"state": "closed", "failures": 0, "cooldown": client.COOLDOWN}
+
+
+def test_failed_probe_reopens_with_double_cooldown(standin):
+    state, url = standin
+    state.down = True
+    client = _client(url)
+    for _ in range(client.FAILURE_THRESHOLD):
+        with pytest.raises(RandomOrgError):
+            client.integers(1, 1, 6, api_key="k")
+    time.sleep(client.COOLDOWN + 0.05)
+    with pytest.raises(RandomOrgError) as e:
+        client.integers(1, 1, 6, api_key="k")
+    assert not isinstance(e.value, CircuitOpenError)
+    assert client.breaker()["state"] == "open"
+    assert client.breaker()["cooldown"] == 2 * client.COOLDOWN
@@ -0,0 +1,82 @@
+import random
+from collections import Counter
+
+import pytest
+
+from conftest import load_node
+from yfg_random.history import HistoryStore
+from yfg_random.entropy import SOURCE_RANDOM_ORG
+
+
+@pytest.fixture
+def number_node(monkeypatch):
+    """RandomOrgV2 module with fresh history and bags, drawing from a local RNG."""
+    m = load_node("RandomOrgV2")
+    node_cls = m.RandomOrgV2TrueRandomNumber
+    rng = random.Random(1)
+    monkeypatch.setenv("RANDOM_ORG_API_KEY", "test")
+    monkeypatch.setattr(node_cls, "_history", HistoryStore())
+    monkeypatch.setattr(m._ShuffleBag, "_bags", {})
+    monkeypatch.setattr(m._ShuffleBag, "_shared", None)
+    monkeypatch.setattr(node_cls, "_get_random_integers",
+                        lambda self, api_key, amount, minimum, maximum:
+                        ([rng.randint(minimum, maximum) for _ in range(amount)], SOURCE_RANDOM_ORG))
+    return m
+
+
+def _run(m, **inputs):
+    inputs = dict(dict(minimum=0, maximum=4, ensure_unique=True, unique_scope="range", history_size=100,
+                       retry_limit=3, use_shuffle_bag=True, count=1), **inputs)
+    return m.RandomOrgV2TrueRandomNumber().return_true_random_number(**inputs)["result"][2]
+
+
+@pytest.mark.parametrize("use_shuffle_bag,unique_scope", [
+    (False, "range"), (False, "global"), (True, "global"), (True, "range"),
+])
+def test_batch_stays_distinct_once_history_is_saturated(number_node, use_shuffle_bag, unique_scope):
+    for _ in range(20):
+        ints = _run(number_node, count=5, use_shuffle_bag=use_shuffle_bag, unique_scope=unique_scope)
+        assert sorted(ints) == [0, 1, 2, 3, 4]
+
+
+def test_batches_larger_than_the_range_still_fill(number_node):
+    ints = _run(number_node, maximum=2, count=7, use_shuffle_bag=False)
+    assert len(ints) == 7 and set(ints) <= {0, 1, 2}
+
+
+def test_bag_skips_for_batch_distinctness_are_dealt_later(number_node):
+    # A cycle that wraps mid-batch skips values already in the batch; they
+    # come back first, so over many runs every value is dealt equally often.
+    seen = Counter()
+    for _ in range(60):
+        ints = _run(number_node, count=3)
+        assert len(set(ints)) == 3
+        seen.update(ints)
+    assert max(seen.values()) - min(seen.values()) <= 2
+
+
+def test_bag_skips_for_global_history_are_dealt_later(number_node, monkeypatch):
+    node_cls = number_node.RandomOrgV2TrueRandomNumber
+    refused, claim = [], node_cls._claim
+
+    def claim_once(self, value, *args):
+        # Refuse the first value dealt, as if another range had just used it
+        if not refused:
+            refused.append(value)
+            return False
+        return claim(self, value, *args)
+
+    monkeypatch.setattr(node_cls, "_claim", claim_once)
+    ints = [_run(number_node, maximum=9, unique_scope="global")[0] for _ in range(10)]
+    assert sorted(ints) == list(range(10))
+
+
+def test_huge_ranges_deal_from_a_lazy_permutation(number_node, monkeypatch):
+    perm_cls = number_node.FeistelPermutation
+    monkeypatch.setattr(perm_cls, "random", classmethod(lambda cls, n, api_key=None: cls(n, b"test")))
+    lo, hi = -10 ** 12, 10 ** 12
+    ints = [v for _ in range(20) for v in _run(number_node, minimum=lo, maximum=hi, count=50)]
+    assert len(set(ints)) == len(ints) == 1000
+    assert all(lo <= v <= hi for v in ints)
+    bag = number_node._ShuffleBag._bags[f"range::{lo}::{hi}"]
+    assert bag["pos"] == 1000 and "remaining" not in bag
@@ -0,0 +1,49 @@
+import pytest
+
+from conftest import prompt_inputs, run_prompt
+from yfg_random.shard import resolve_worker, shard_size
+
+
+def test_resolve_worker_prefers_inputs_then_environment(monkeypatch):
+    monkeypatch.delenv("YFG_WORKER_INDEX", raising=False)
+    monkeypatch.delenv("YFG_WORKER_COUNT", raising=False)
+    assert resolve_worker() == (0, 1)
+    monkeypatch.setenv("YFG_WORKER_INDEX", "2")
+    monkeypatch.setenv("YFG_WORKER_COUNT", "4")
+    assert resolve_worker() == (2, 4)
+    assert resolve_worker(1, 3) == (1, 3)
+    assert resolve_worker(worker_count=3) == (2, 3)
+
+
+@pytest.mark.parametrize("index,count,env", [(3, 3, {}), (-1, 2, {"YFG_WORKER_INDEX": "5"}),
+                                             (-1, 0, {"YFG_WORKER_COUNT": "many"}),
+                                             (-1, 0, {"YFG_WORKER_COUNT": "0"})])
+def test_resolve_worker_rejects_bad_settings(monkeypatch, index, count, env):
+    monkeypatch.delenv("YFG_WORKER_INDEX", raising=False)
+    monkeypatch.delenv("YFG_WORKER_COUNT", raising=False)
+    for k, v in env.items():
+        monkeypatch.setenv(k, v)
+    with pytest.raises(ValueError):
+        resolve_worker(index, count)
+
+
+def test_shard_sizes_partition_the_pool():
+    for n in range(0, 30):
+        for count in range(1, 7):
+            sizes = [shard_size(n, w, count) for w in range(count)]
+            assert sizes == [len(range(w, n, count)) for w in range(count)]
+
+
+@pytest.mark.parametrize("mode", ["random", "incremental"])
+def test_workers_split_one_pool_without_overlap(prompt_node, prompts, mode):
+    path, count = prompts(11), 3
+    picks = []
+    for w in range(count):
+        size = shard_size(11, w, count)
+        mine = [i for _ in range(size)
+                for i in run_prompt(prompt_node, **prompt_inputs(path, selection_mode=mode,
+                                                                 worker_index=w, worker_count=count))[3]]
+        assert all(i % count == w for i in mine)
+        assert len(set(mine)) == size
+        picks += mine
+    assert sorted(picks) == list(range(11))
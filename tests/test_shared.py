@@ -0,0 +1,117 @@
+import multiprocessing
+
+import pytest
+
+from yfg_random.history import BitmapHistory, UniqueHistory
+from yfg_random.shared import SharedHistoryStore, SharedShuffleBag, SharedState
+
+
+@pytest.fixture
+def shared(tmp_path):
+    return SharedHistoryStore(SharedState(str(tmp_path / "state.db")), "test")
+
+
+def test_claim_takes_a_value_once(shared):
+    assert shared.claim("s", 1, 10)
+    assert not shared.claim("s", 1, 10)
+    assert shared.claim("other", 1, 10)
+    assert shared.is_duplicate("s", 1, 10)
+
+
+@pytest.mark.parametrize("make", [
+    lambda tmp: SharedHistoryStore(SharedState(str(tmp / "state.db")), "test"),
+    lambda tmp: _Scoped(UniqueHistory()),
+    lambda tmp: _Scoped(BitmapHistory(0, 99)),
+])
+def test_remember_and_check_honours_history_size(tmp_path, make):
+    history = make(tmp_path)
+    for v in range(5):
+        assert not history.remember_and_check("s", v, 3)
+    # 0 and 1 have aged out of a 3-entry history, even if not yet pruned
+    assert not history.remember_and_check("s", 1, 3)
+    assert history.remember_and_check("s", 4, 3)
+    assert not history.claim("s", 4, 3)
+    assert history.claim("s", 2, 3)
+
+
+class _Scoped:
+    """HistoryStore-shaped wrapper around one in-process history."""
+
+    def __init__(self, history):
+        self._h = history
+
+    def remember_and_check(self, key, value, history_size, time_window_sec=0):
+        return self._h.remember_and_check(value, history_size, time_window_sec)
+
+    def claim(self, key, value, history_size, time_window_sec=0):
+        return self._h.claim(value, history_size, time_window_sec)
+
+
+def _claim_all(path, values, out):
+    history = SharedHistoryStore(SharedState(path, timeout=30), "test")
+    out.put([v for v in values if history.claim("s", v, 0)])
+
+
+def test_concurrent_claims_never_hand_out_a_value_twice(tmp_path):
+    path, values = str(tmp_path / "state.db"), list(range(200))
+    SharedState(path)
+    ctx = multiprocessing.get_context("spawn")
+    out = ctx.Queue()
+    workers = [ctx.Process(target=_claim_all, args=(path, values, out)) for _ in range(4)]
+    for w in workers:
+        w.start()
+    claimed = [v for _ in workers for v in out.get(timeout=60)]
+    for w in workers:
+        w.join()
+    assert sorted(claimed) == values
+
+
+def test_bags_on_one_database_share_each_cycle(tmp_path):
+    db = SharedState(str(tmp_path / "state.db"))
+    a, b = SharedShuffleBag(db, "test"), SharedShuffleBag(db, "test")
+    n = 4 * SharedShuffleBag.RESERVE
+    dealt = []
+    for _ in range(2):
+        dealt += [a.next_value("k", 0, n - 1) for _ in range(SharedShuffleBag.RESERVE)]
+        dealt += [b.next_value("k", 0, n - 1) for _ in range(SharedShuffleBag.RESERVE)]
+    assert sorted(dealt) == list(range(n))
+    # Other namespaces and keys have bags of their own
+    assert SharedShuffleBag(db, "other").next_value("k", 0, n - 1) in range(n)
+    assert a.next_value("k2", 5, 5) == 5
+
+
+def test_put_back_values_come_first_once_each(tmp_path):
+    bag = SharedShuffleBag(SharedState(str(tmp_path / "state.db")), "test")
+    first = [bag.next_value("k", 0, 9) for _ in range(4)]
+    bag.put_back("k", 0, 9, [first[1], first[3], first[1]])
+    bag.put_back("k", 0, 9, [first[0], first[3]])
+    rest = [bag.next_value("k", 0, 9) for _ in range(9)]
+    assert rest[:3] == [first[0], first[3], first[1]]
+    assert sorted([first[2]] + rest) == list(range(10))
+
+
+def test_huge_shared_bags_use_a_lazy_permutation(tmp_path):
+    bag = SharedShuffleBag(SharedState(str(tmp_path / "state.db")), "test")
+    lo, hi = 0, 10 ** 15
+    dealt = [bag.next_value("k", lo, hi) for _ in range(3 * SharedShuffleBag.RESERVE)]
+    assert len(set(dealt)) == len(dealt) and all(lo <= v <= hi for v in dealt)
+
+
+def _deal(path, n, out):
+    bag = SharedShuffleBag(SharedState(path, timeout=30), "test")
+    out.put([bag.next_value("k", 0, n - 1) for _ in range(SharedShuffleBag.RESERVE)])
+
+
+def test_processes_never_deal_the_same_position(tmp_path):
+    path, workers = str(tmp_path / "state.db"), 4
+    n = workers * SharedShuffleBag.RESERVE
+    SharedState(path)
+    ctx = multiprocessing.get_context("spawn")
+    out = ctx.Queue()
+    procs = [ctx.Process(target=_deal, args=(path, n, out)) for _ in range(workers)]
+    for p in procs:
+        p.start()
+    dealt = [v for _ in procs for v in out.get(timeout=60)]
+    for p in procs:
+        p.join()
+    assert sorted(dealt) == list(range(n))
@@ -0,0 +1,42 @@
+import json
+
+from yfg_random.state import StateStore
+
+
+def test_flush_writes_batched_state_and_creates_folder(tmp_path):
+    path = tmp_path / ".cache" / "state.json"
+    store = StateStore(str(path), flush_delay=3600)
+    store.set("a", 1)
+    store.set("b", {"pos": 2})
+    assert not path.exists()            # held in memory until the flush
+    store.flush()
+    assert json.loads(path.read_text()) == {"a": 1, "b": {"pos": 2}}
+    assert not (tmp_path / ".cache" / "state.json.tmp").exists()
+    assert StateStore(str(path)).get("b") == {"pos": 2}
+
+
+def test_keys_are_capped_in_last_used_order(tmp_path):
+    store = StateStore(str(tmp_path / "s.json"), flush_delay=3600, max_entries=2)
+    store.set("a", 1)
+    store.set("b", 2)
+    store.get("a")
+    store.set("c", 3)
+    assert store.get("b") is None and store.get("a") == 1 and store.get("c") == 3
+
+
+def test_unreadable_file_starts_empty(tmp_path):
+    path = tmp_path / "s.json"
+    path.write_text("{not json")
+    assert StateStore(str(path)).get("a", "default") == "default"
+
+
+def test_legacy_file_is_read_then_moved(tmp_path):
+    legacy = tmp_path / "old.json"
+    legacy.write_text(json.dumps({"cursor": 7}))
+    path = tmp_path / ".cache" / "new.json"
+    store = StateStore(str(path), flush_delay=3600, legacy=str(legacy))
+    assert store.get("cursor") == 7
+    store.set("cursor", 8)
+    store.flush()
+    assert json.loads(path.read_text()) == {"cursor": 8}
+    assert not legacy.exists()
@@ -1,13 +1,15 @@
 /**
- * YFG Random.org True Random Number (V2) — UI Extension v1.0.0
+ * YFG Random.org True Random Number (V2) — UI Extension v1.2.0
  *
  * Displays the generated number next to each output slot connector
  * (number, float, int) after every run — same pattern as the
- * RandomImageFromDirectory node.
+ * RandomImageFromDirectory node. The source slot shows where the value
+ * came from, so an os.urandom fallback is visible on the canvas. With
+ * count > 1 a slot shows the first value and the batch size.
  *
  * @author  Manny Gonzalez
  * @title   🐯 YFG Comical Nodes
- * @version 1.0.0
+ * @version 1.2.0
  */
 
 import { app } from "../../../scripts/app.js";
@@ -18,11 +20,12 @@ const NODE_TYPE = "RandomOrgV2TrueRandomNumber_node";
 console.log("[YFG] RandomOrgV2 JS extension loading…");
 
 // Each output slot gets its own key so display matches the actual type.
-// Slot 0 = number, 1 = float, 2 = int
+// Slot 0 = number, 1 = float, 2 = int, 3 = source
 const DISPLAY_SLOTS = {
     yfg_number: 0,
     yfg_float:  1,
     yfg_int:    2,
+    yfg_source: 3,
 };
 
 // ─────────────────────────── Output slot value display ───────────────────────
@@ -33,8 +36,9 @@ function applyOutputValues(node, output) {
             const raw = output?.[key];
             if (raw === undefined || raw === null) continue;
 
-            const value = Array.isArray(raw) ? raw[0] : raw;
-            if (value === undefined) continue;
+            const first = Array.isArray(raw) ? raw[0] : raw;
+            if (first === undefined) continue;
+            const value = Array.isArray(raw) && raw.length > 1 ? `${first} …×${raw.length}` : first;
 
             const slot = node.outputs?.[slotIdx];
             if (!slot) continue;
@@ -1,13 +1,17 @@
 /**
- * YFG Random Prompt From File — UI Extension v1.2.0
+ * YFG Random Prompt From File — UI Extension v1.3.1
  *
  * Adds to YFGRandomPromptFromFile_node:
- *   📄 Browse for File    — navigable file picker showing dirs + .txt files
+ *   📄 Browse for File    — navigable file picker showing dirs + prompt files,
+ *                           or pick the whole folder as a merged pool
  *   🕐 Recent Files       — MRU list from /yfg/file_history
  *   range auto-populate   — range_start/range_end fill from file on selection
  *   Output slot display   — index_current, index_previous, total_count live values
  *   INDEX auto-sync       — INDEX widget mirrors index_current after every run
  *
+ * v1.3.1: Prompt counts for large files are polled from a background job,
+ *         with a progress badge, instead of blocking the server.
+ * v1.3.0: 📁 Use This Folder in the browser selects a directory pool.
  * v1.2.0: Widget shows filename only (full path on hover tooltip).
  *         Recent Files picker shows two-line layout: filename (green) +
  *         directory path (dimmed) for instant disambiguation of long paths.
@@ -16,7 +20,7 @@
  *
  * @author  Manny Gonzalez
  * @title   🐯 YFG Comical Nodes
- * @version 1.2.0
+ * @version 1.3.1
  */
 
 import { app } from "../../../scripts/app.js";
@@ -53,6 +57,27 @@ async function apiPost(path, body) {
     return r.json();
 }
 
+// /yfg/prompt_count answers 202 + a job id while a large file is being
+// indexed server-side. Poll the job until it finishes; onProgress gets
+// { bytes_done, bytes_total } on every tick.
+const COUNT_POLL_MS = 500;
+
+async function fetchPromptCount(path, signal, onProgress) {
+    let data = await apiGet(`/yfg/prompt_count?path=${encodeURIComponent(path)}`, signal);
+    while (data.job && data.state === "running") {
+        onProgress?.(data);
+        await new Promise(r => setTimeout(r, COUNT_POLL_MS));
+        if (signal?.aborted) throw new DOMException("Aborted", "AbortError");
+        data = await apiGet(`/yfg/prompt_count?job=${encodeURIComponent(data.job)}`, signal);
+    }
+    if (data.state === "error") throw new Error(data.error || "Prompt count failed");
+    return data;
+}
+
+function percentOf(d) {
+    return d.bytes_total ? Math.floor(100 * d.bytes_done / d.bytes_total) : 0;
+}
+
 // ─────────────────────────── tiny DOM helpers ─────────────────────────────────
 
 function el(tag, cls, text) {
@@ -178,7 +203,8 @@ function ensureStyles() {
 async function autoPopulateRange(node, filepath) {
     if (!filepath || !filepath.trim()) return;
     try {
-        const data = await apiGet(`/yfg/prompt_count?path=${encodeURIComponent(filepath)}`);
+        const data = await fetchPromptCount(filepath, null, d =>
+            console.log(`[YFG] indexing prompt file… ${percentOf(d)}%`));
         if (!data.count || data.count < 1) return;
 
         const startW = node.widgets?.find(w => w.name === "range_start");
@@ -199,12 +225,13 @@ function openFileBrowseModal(startPath, onSelect) {
 
     // If startPath is a file, open in its parent directory
     let currentDir = (startPath || "").trim();
-    if (currentDir && /\.(txt)$/i.test(currentDir)) {
+    if (currentDir && /\.(txt|jsonl|csv|tsv)(\.(gz|bz2|xz))?$/i.test(currentDir)) {
         const sep = currentDir.includes("/") ? "/" : "\\";
         currentDir = currentDir.substring(0, currentDir.lastIndexOf(sep));
     }
 
     let selectedFile = "";
+    let shownDir     = "";
 
     // AbortController pool — cancels all in-flight badge fetches when modal closes
     const abortCtrl = new AbortController();
@@ -228,9 +255,18 @@ function openFileBrowseModal(startPath, onSelect) {
         }
     });
     selectBtn.disabled = true;
+    // Whole-folder pool: every prompt file directly inside the folder shown
+    const folderBtn  = btn("📁 Use This Folder", "yfg-btn yfg-btn-secondary", () => {
+        if (shownDir) {
+            abortCtrl.abort();
+            onSelect(shownDir);
+            overlay.remove();
+        }
+    });
+    folderBtn.disabled = true;
 
     header.append(title);
-    footer.append(cancelBtn, selectBtn);
+    footer.append(cancelBtn, folderBtn, selectBtn);
     modal.append(header, breadcrumb, listWrap, footer);
     overlay.append(modal);
     document.body.append(overlay);
@@ -252,14 +288,21 @@ function openFileBrowseModal(startPath, onSelect) {
                 if (abortCtrl.signal.aborted) return;
                 const { path: p, row } = badgeQueue.shift();
                 badgeActive++;
-                apiGet(`/yfg/prompt_count?path=${encodeURIComponent(p)}`, abortCtrl.signal)
+                let badge = null;
+                const showBadge = text => {
+                    if (!listWrap.contains(row)) return;
+                    if (!badge) {
+                        badge = el("span", "yfg-file-count");
+                        row.append(badge);
+                    }
+                    badge.textContent = text;
+                };
+                fetchPromptCount(p, abortCtrl.signal, d => showBadge(`⏳ ${percentOf(d)}%`))
                     .then(d => {
-                        if (d.count > 0 && listWrap.contains(row)) {
-                            const badge = el("span", "yfg-file-count", `${d.count} prompts`);
-                            row.append(badge);
-                        }
+                        if (d.count > 0) showBadge(`${d.count} prompts`);
+                        else if (badge) badge.remove();
                     })
-                    .catch(() => {})
+                    .catch(() => { if (badge) badge.remove(); })
                     .finally(() => {
                         badgeActive--;
                         drainBadgeQueue();
@@ -274,6 +317,8 @@ function openFileBrowseModal(startPath, onSelect) {
 
             breadcrumb.textContent = data.path || path || "Filesystem Roots";
             listWrap.innerHTML     = "";
+            shownDir               = data.path || "";
+            folderBtn.disabled     = !shownDir;
 
             // Up row
             if (data.parent !== null && data.parent !== undefined) {
@@ -285,7 +330,7 @@ function openFileBrowseModal(startPath, onSelect) {
             }
 
             if (!data.entries || data.entries.length === 0) {
-                listWrap.append(el("div", "yfg-empty", "No subdirectories or .txt files here."));
+                listWrap.append(el("div", "yfg-empty", "No subdirectories or prompt files here."));
                 return;
             }
 
@@ -0,0 +1,48 @@
+# =============================================================================
+# Author      : Manny Gonzalez (YFG)
+# Title       : 🐯 YFG Random — Package Init
+# Nickname    : YFG_Random
+# Description : Shared selection infrastructure for the YFG random nodes
+#               (RandomOrgV2, RandomImageFromDirectory, RandomPromptFromFile).
+#               Holds the pieces that used to be copy-pasted into each node
+#               file so every node gets the same behaviour and the same fixes.
+# =============================================================================
+
+from .alias import AliasTable
+from .entropy import SOURCE_FALLBACK, SOURCE_RANDOM_ORG, EntropyPool, entropy_pool
+from .history import BitmapHistory, HistoryStore, UniqueHistory
+from .permutation import FeistelPermutation
+from .randomorg import CircuitOpenError, RandomOrgClient, RandomOrgError, random_org
+from .reserve import EntropyReserve
+from .seeded import CounterRNG
+from .shared import (SharedHistoryStore, SharedShuffleBag, SharedState,
+                     history_store, shared_bag, shared_state)
+from .shard import resolve_worker, shard_size
+from .state import StateStore
+
+__all__ = [
+    "SOURCE_FALLBACK",
+    "SOURCE_RANDOM_ORG",
+    "AliasTable",
+    "BitmapHistory",
+    "CircuitOpenError",
+    "CounterRNG",
+    "EntropyPool",
+    "EntropyReserve",
+    "FeistelPermutation",
+    "HistoryStore",
+    "RandomOrgClient",
+    "RandomOrgError",
+    "SharedHistoryStore",
+    "SharedShuffleBag",
+    "SharedState",
+    "StateStore",
+    "UniqueHistory",
+    "entropy_pool",
+    "history_store",
+    "random_org",
+    "resolve_worker",
+    "shard_size",
+    "shared_bag",
+    "shared_state",
+]
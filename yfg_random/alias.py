@@ -0,0 +1,60 @@
+# =============================================================================
+# Author      : Manny Gonzalez (YFG)
+# Title       : YFG Random - Weighted Sampling
+# Nickname    : YFG_Random
+# Description : Walker / Vose alias table. O(n) to build, then every weighted
+#               draw is one uniform column pick plus one coin flip, O(1) no
+#               matter how many entries the table covers.
+# =============================================================================
+
+from array import array
+from typing import Iterable
+
+
+class AliasTable:
+    """
+    Alias table over weights w[0..n-1].
+
+    Column i keeps itself with probability prob[i] and otherwise yields
+    alias[i]. Picking a column uniformly and flipping that column's coin
+    reproduces the weighted distribution exactly.
+
+    The table only needs the column and the coin from the caller, so each
+    node keeps its own random source (local PRNG, random.org, ...) for the
+    column draw. Columns are compact arrays: about 12 bytes per entry.
+    """
+
+    __slots__ = ("prob", "alias", "total", "support")
+
+    def __init__(self, weights: Iterable[float]):
+        w = array("d", weights)
+        n = len(w)
+        total = sum(w)
+        if n == 0 or total <= 0:
+            raise ValueError("alias table needs at least one positive weight")
+
+        prob  = array("d", (x * n / total for x in w))
+        alias = array("I", range(n))
+        small = [i for i in range(n) if prob[i] < 1.0]
+        large = [i for i in range(n) if prob[i] >= 1.0]
+        while small and large:
+            s = small.pop()
+            l = large.pop()
+            alias[s] = l
+            prob[l]  = (prob[l] + prob[s]) - 1.0
+            (small if prob[l] < 1.0 else large).append(l)
+        # Whatever is left is 1.0 up to rounding error
+        for i in small + large:
+            prob[i] = 1.0
+
+        self.prob  = prob
+        self.alias = alias
+        self.total = total
+        self.support = sum(1 for x in w if x > 0)     # entries sample() can return
+
+    def __len__(self) -> int:
+        return len(self.prob)
+
+    def sample(self, column: int, coin: float) -> int:
+        """Entry for a uniform *column* in [0, n) and a uniform *coin* in [0, 1)."""
+        return column if coin < self.prob[column] else self.alias[column]
@@ -0,0 +1,284 @@
+# =============================================================================
+# Author      : Manny Gonzalez (YFG)
+# Title       : YFG Random - Entropy Pool
+# Nickname    : YFG_Random
+# Description : Range-agnostic buffer of random.org bytes. Blocks are fetched
+#               in bulk with generateBlobs and topped up from a background
+#               thread below a low-water mark. Any [lo, hi] is then served
+#               locally by unbiased rejection sampling, so a node's hot path
+#               does no network round trip. Refill sizes follow the key's
+#               remaining random.org quota. draw() falls back to the OS
+#               CSPRNG when random.org can't be reached and says so. Unused
+#               bytes are kept on disk across restarts (reserve.py).
+# =============================================================================
+
+import time
+import atexit
+import base64
+import secrets
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from .randomorg import RandomOrgClient, RandomOrgError, random_org
+from .reserve import EntropyReserve, default_reserve
+
+SOURCE_RANDOM_ORG = "random.org"
+SOURCE_FALLBACK   = "os.urandom"
+
+
+class EntropyPool:
+    """
+    FIFO of random bytes from random.org.
+
+    • take(n) hands out the next n bytes. Each byte is served exactly once.
+    • Whenever fewer than low_water bytes remain after a take, one background
+      thread fetches block_bytes more (up to max_bytes buffered).
+    • Only a cold start (or a take larger than the buffer) waits, for at most
+      the client's deadline. If the pool is still short, RandomOrgError is
+      raised and the caller falls back as it did before.
+    • Each refill asks the client how much the remaining quota allows
+      (refill_size), so the pool stops fetching once the quota is spent
+      instead of getting errors back.
+    • randint(lo, hi) draws ceil(log2(span)) bits and rejects values >= span,
+      so every value in the range is exactly equally likely. It needs under
+      two draws on average, whatever the range.
+    • With a reserve, refills claim bytes left over from earlier runs before
+      going to random.org, and spill() hands unserved bytes back at exit.
+    • draw() never fails: when the pool can't deliver (breaker open, quota
+      spent, network down) it uses secrets (os.urandom) and reports the
+      source, logging once per fallback episode.
+    """
+
+    def __init__(self, client: RandomOrgClient, api_key: Optional[str] = None,
+                 block_bytes: int = 1024, low_water: int = 256, max_bytes: int = 8192,
+                 reserve: Optional[EntropyReserve] = None):
+        self.client      = client
+        self.reserve     = reserve
+        self.api_key     = api_key
+        self.block_bytes = block_bytes
+        self.low_water   = low_water
+        self.max_bytes   = max_bytes
+        self._buf        = bytearray()
+        self._pos        = 0
+        self._cond       = threading.Condition()
+        self._filling    = False
+        self._target     = 0           # prefetch(nbytes): keep filling up to this
+        self._error: Optional[str] = None
+        self._falling_back = False
+        self._stats      = {"refills": 0, "refill_failures": 0, "bytes_fetched": 0,
+                            "bytes_from_reserve": 0, "bytes_served": 0, "waits": 0}
+
+    # ── buffer ───────────────────────────────────────────────────────────
+    def _available(self) -> int:
+        return len(self._buf) - self._pos
+
+    def _start_refill(self):
+        """Start the refill thread unless one is running. Caller holds _cond."""
+        if self._filling or self._available() >= self.max_bytes:
+            return
+        self._filling = True
+        threading.Thread(target=self._refill, name="yfg-entropy-refill", daemon=True).start()
+
+    def _fetch(self, nbytes: int) -> bytes:
+        result = self.client.call("generateBlobs", {"n": 1, "size": nbytes * 8, "format": "base64"},
+                                  api_key=self.api_key)
+        try:
+            return base64.b64decode(result["random"]["data"][0])
+        except (KeyError, IndexError, TypeError, ValueError) as e:
+            raise RandomOrgError(f"unexpected response format: {e}")
+
+    def _refill(self):
+        """Refill thread. However it ends, it leaves the pool ready for the next one."""
+        try:
+            self._refill_blocks()
+        except Exception as e:
+            # Not a random.org failure (e.g. requests missing, a bug): still
+            # release the waiters so they fall back now, not at the deadline
+            with self._cond:
+                self._stats["refill_failures"] += 1
+                self._error   = f"refill failed: {type(e).__name__}: {e}"
+                self._filling = False
+                self._target  = 0
+                self._cond.notify_all()
+
+    def _refill_blocks(self):
+        while True:
+            with self._cond:
+                cap  = self.max_bytes - self._available()
+                want = min(max(self.block_bytes, self._target - self._available()), cap)
+            # Bytes kept from an earlier run go first: no network, no quota
+            if want > 0 and self.reserve is not None:
+                try:
+                    block = self.reserve.claim(want)
+                except OSError as e:
+                    print(f"[YFG] EntropyReserve: claim failed, using random.org: {e}")
+                    block = b""
+                if block:
+                    if self._append(block, "bytes_from_reserve"):
+                        return
+                    continue
+            # Block size follows the key's remaining quota (may poll getUsage)
+            want = self.client.refill_size(want, cap, self.api_key) if want > 0 else 0
+            try:
+                if want <= 0:
+                    if cap > 0:
+                        raise RandomOrgError("random.org quota exhausted")
+                    with self._cond:
+                        self._filling = False
+                        self._target  = 0
+                        self._cond.notify_all()
+                    return
+                block = self._fetch(want)
+            except RandomOrgError as e:
+                with self._cond:
+                    self._stats["refill_failures"] += 1
+                    self._error   = str(e)
+                    self._filling = False
+                    self._target  = 0
+                    self._cond.notify_all()
+                return
+            if self._append(block, "bytes_fetched"):
+                return
+
+    def _append(self, block: bytes, counter: str) -> bool:
+        """Add a refill block. True when the refill thread is done (low water / target reached)."""
+        with self._cond:
+            if self._pos > len(self._buf) // 2:
+                del self._buf[:self._pos]
+                self._pos = 0
+            self._buf += block
+            self._error = None
+            self._stats["refills"] += 1
+            self._stats[counter]   += len(block)
+            self._cond.notify_all()
+            if self._available() >= max(self.low_water, self._target):
+                self._filling = False
+                self._target  = 0
+                return True
+            return False
+
+    def spill(self):
+        """Move every unserved byte to the reserve (they are never served from memory again)."""
+        if self.reserve is None:
+            return
+        with self._cond:
+            data = bytes(self._buf[self._pos:])
+            self._buf.clear()
+            self._pos = 0
+        try:
+            kept = self.reserve.spill(data)
+        except OSError as e:
+            print(f"[YFG] EntropyReserve: could not save {len(data)} unused bytes: {e}")
+            return
+        if data:
+            print(f"[YFG] EntropyReserve: kept {len(data)} unused random.org bytes ({kept} in reserve)")
+
+    def prefetch(self, nbytes: int = 0):
+        """
+        Top the pool up in the background to its low-water mark, or to nbytes
+        (capped at max_bytes) when that is more. Returns at once: a take()
+        that arrives while the refill is in flight waits for it.
+        """
+        with self._cond:
+            self._target = max(self._target, min(int(nbytes), self.max_bytes))
+            if self._available() < max(self.low_water, self._target):
+                self._start_refill()
+            else:
+                self._target = 0
+
+    def take(self, nbytes: int) -> bytes:
+        with self._cond:
+            if self._available() < nbytes:
+                self._stats["waits"] += 1
+                self._error = None
+                deadline = time.monotonic() + self.client.deadline
+                while self._available() < nbytes:
+                    if self._error is not None and not self._filling:
+                        raise RandomOrgError(self._error)
+                    self._start_refill()
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise RandomOrgError("entropy pool is empty and the refill timed out")
+                    self._cond.wait(remaining)
+            out = bytes(self._buf[self._pos:self._pos + nbytes])
+            self._pos += nbytes
+            self._stats["bytes_served"] += nbytes
+            if self._available() < self.low_water:
+                self._start_refill()
+            return out
+
+    # ── integers ─────────────────────────────────────────────────────────
+    def randint(self, lo: int, hi: int) -> int:
+        """Uniform integer in [lo, hi] (inclusive)."""
+        lo, hi = int(lo), int(hi)
+        span = hi - lo + 1
+        if span <= 1:
+            return lo
+        bits   = (span - 1).bit_length()
+        nbytes = (bits + 7) // 8
+        mask   = (1 << bits) - 1
+        while True:
+            v = int.from_bytes(self.take(nbytes), "little") & mask
+            if v < span:
+                return lo + v
+
+    def randints(self, n: int, lo: int, hi: int) -> List[int]:
+        return [self.randint(lo, hi) for _ in range(int(n))]
+
+    def draw(self, n: int, lo: int, hi: int) -> Tuple[List[int], str]:
+        """
+        n integers in [lo, hi] and where they came from: SOURCE_RANDOM_ORG,
+        or SOURCE_FALLBACK if any of them had to come from os.urandom.
+        """
+        lo, hi = int(lo), int(hi)
+        out: List[int] = []
+        try:
+            for _ in range(int(n)):
+                out.append(self.randint(lo, hi))
+        except RandomOrgError as e:
+            if not self._falling_back:
+                self._falling_back = True
+                print(f"[YFG] random.org: unavailable ({e}); values come from os.urandom "
+                      f"and are flagged as {SOURCE_FALLBACK}")
+            span = hi - lo + 1
+            out += [lo + secrets.randbelow(span) if span > 1 else lo for _ in range(int(n) - len(out))]
+            return out, SOURCE_FALLBACK
+        self._falling_back = False
+        return out, SOURCE_RANDOM_ORG
+
+    def stats(self) -> Dict[str, object]:
+        with self._cond:
+            s = dict(self._stats)
+            s["bytes_buffered"] = self._available()
+            s["refilling"]      = self._filling
+            s["last_error"]     = self._error
+            s["falling_back"]   = self._falling_back
+        s["bytes_in_reserve"] = self.reserve.available() if self.reserve is not None else None
+        return s
+
+
+_POOLS: Dict[Optional[str], EntropyPool] = {}
+_POOLS_LOCK = threading.Lock()
+
+
+def entropy_pool(api_key: Optional[str] = None) -> EntropyPool:
+    """
+    The shared pool for *api_key*. None, or the configured key, gives the one
+    pool every node shares. A different key (the V1 node's UI field) gets its
+    own pool, so its bytes are paid for by that key.
+
+    The shared pool is backed by the on-disk reserve. It starts loading from
+    the reserve as soon as it is created and spills back at exit.
+    """
+    client = random_org()
+    if api_key is not None and api_key == client.api_key():
+        api_key = None
+    with _POOLS_LOCK:
+        pool = _POOLS.get(api_key)
+        if pool is None:
+            reserve = default_reserve() if api_key is None else None
+            pool = _POOLS[api_key] = EntropyPool(client, api_key, reserve=reserve)
+            if reserve is not None:
+                atexit.register(pool.spill)
+                pool.prefetch()
+        return pool
@@ -0,0 +1,297 @@
+# =============================================================================
+# Author      : Manny Gonzalez (YFG)
+# Title       : YFG Random - Uniqueness History
+# Nickname    : YFG_Random
+# Description : Recently-used value tracking for ensure_unique. One history
+#               per scope key, each an OrderedDict kept in last-seen order so
+#               check, remember and both kinds of pruning are amortized O(1).
+#               Dense integer ranges use a bitmap instead (1 bit per value).
+# =============================================================================
+
+import time
+from array import array
+from collections import OrderedDict, deque
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+
+class UniqueHistory:
+    """
+    Recently-seen values for one uniqueness scope.
+
+    Values live in an OrderedDict mapping value -> last-seen timestamp.
+    Re-remembering a value moves it to the end, so the dict is always ordered
+    oldest-first. That gives:
+
+      • size pruning  — popitem(last=False) until len <= history_size
+      • time pruning  — pop from the front while the head is older than the
+                        window; stops at the first fresh entry, so expired
+                        values are only ever visited once
+      • membership    — a plain dict lookup
+
+    The older list-based versions did list.pop(0), list.remove() and a full
+    scan for every time-window check, which is O(n) per call and went
+    quadratic at history_size=100000.
+    """
+
+    __slots__ = ("_seen",)
+
+    def __init__(self):
+        self._seen: "OrderedDict[Hashable, float]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._seen)
+
+    def __contains__(self, value: Hashable) -> bool:
+        return value in self._seen
+
+    def prune(self, history_size: int, time_window_sec: float = 0, now: Optional[float] = None):
+        seen = self._seen
+        if history_size and history_size > 0:
+            while len(seen) > history_size:
+                seen.popitem(last=False)
+        if time_window_sec and time_window_sec > 0:
+            cutoff = (time.time() if now is None else now) - time_window_sec
+            while seen:
+                oldest = next(iter(seen.values()))
+                if oldest >= cutoff:
+                    break
+                seen.popitem(last=False)
+
+    def is_duplicate(self, value: Hashable, history_size: int, time_window_sec: float = 0) -> bool:
+        """True if *value* was remembered within the size/time limits."""
+        self.prune(history_size, time_window_sec)
+        return value in self._seen
+
+    def remember(self, value: Hashable, history_size: int, now: Optional[float] = None):
+        seen = self._seen
+        seen[value] = time.time() if now is None else now
+        seen.move_to_end(value)
+        self.prune(history_size, 0)
+
+    def remember_and_check(self, value: Hashable, history_size: int, time_window_sec: float = 0) -> bool:
+        """
+        Returns True if *value* was seen recently (within constraints).
+        Records the current sighting regardless.
+        """
+        already = self.is_duplicate(value, history_size, time_window_sec)
+        self.remember(value, history_size)
+        return already
+
+    def claim(self, value: Hashable, history_size: int, time_window_sec: float = 0) -> bool:
+        """Remember *value* unless it was seen recently. True if it was free."""
+        if self.is_duplicate(value, history_size, time_window_sec):
+            return False
+        self.remember(value, history_size)
+        return True
+
+    def clear(self):
+        self._seen.clear()
+
+
+class BitmapHistory:
+    """
+    UniqueHistory for integers in a fixed [lo, hi], with one bit per value.
+
+      • membership    — test the value's bit
+      • remember      — set the bit and append the offset to an array('I')
+                        in remember order (4 bytes per remembered value)
+      • re-remember   — a value that is already set is appended again, so it
+                        becomes the newest, as in UniqueHistory. Its older
+                        slot turns stale: _dups counts stale slots per
+                        offset, and eviction skips them without clearing
+                        the bit.
+      • size pruning  — clear the bit of the oldest offset; the array is
+                        compacted once half of it has been consumed, or
+                        rebuilt without stale slots once they outnumber the
+                        live ones
+      • time pruning  — offsets are grouped in GENERATION_SEC buckets
+                        [start, last, count], oldest first. A bucket expires
+                        as a whole once its newest entry is outside the
+                        window, so values can outlive the window by up to
+                        one bucket, but nothing expires early.
+
+    A UniqueHistory entry costs ~100 bytes. This one costs span/8 bytes up
+    front whatever history_size is, so suits() only picks it when the
+    bitmap is no bigger than the dict it replaces would grow to.
+    """
+
+    GENERATION_SEC = 1.0
+    DICT_BYTES     = 100            # rough cost of one UniqueHistory entry
+    MAX_SPAN       = 100_000_000    # 12.5 MB bitmap
+
+    __slots__ = ("lo", "span", "_bits", "_order", "_head", "_gens", "_dups", "_stale")
+
+    def __init__(self, lo: int, hi: int):
+        self.lo     = int(lo)
+        self.span   = int(hi) - self.lo + 1
+        self._bits  = bytearray((self.span + 7) // 8)
+        self._order = array("I")
+        self._head  = 0
+        self._gens: "deque[list]" = deque()
+        self._dups: Dict[int, int] = {}     # offset -> stale slots still in _order
+        self._stale = 0
+
+    @classmethod
+    def suits(cls, lo: int, hi: int, history_size: int) -> bool:
+        """True when a bitmap over [lo, hi] is no bigger than a dict of history_size entries."""
+        span = int(hi) - int(lo) + 1
+        if not 0 < span <= cls.MAX_SPAN:
+            return False
+        # An unlimited history can end up holding the whole range
+        entries = min(int(history_size), span) if history_size and history_size > 0 else span
+        return span // 8 <= entries * cls.DICT_BYTES
+
+    def _offset(self, value: Hashable) -> Optional[int]:
+        try:
+            off = int(value) - self.lo
+        except (TypeError, ValueError):
+            return None
+        return off if 0 <= off < self.span else None
+
+    def __len__(self) -> int:
+        return len(self._order) - self._head - self._stale
+
+    def __contains__(self, value: Hashable) -> bool:
+        off = self._offset(value)
+        return off is not None and bool(self._bits[off >> 3] & (1 << (off & 7)))
+
+    def _evict(self):
+        off = self._order[self._head]
+        self._head += 1
+        stale = self._dups.get(off)
+        if stale:
+            # Re-remembered later: this slot is stale, the value stays
+            self._stale -= 1
+            if stale == 1:
+                del self._dups[off]
+            else:
+                self._dups[off] = stale - 1
+        else:
+            self._bits[off >> 3] &= ~(1 << (off & 7)) & 0xFF
+        gen = self._gens[0]
+        gen[2] -= 1
+        if gen[2] == 0:
+            self._gens.popleft()
+        if self._head > 1024 and self._head > len(self._order) // 2:
+            del self._order[:self._head]
+            self._head = 0
+
+    def prune(self, history_size: int, time_window_sec: float = 0, now: Optional[float] = None):
+        if history_size and history_size > 0:
+            while len(self) > history_size:
+                self._evict()
+        if time_window_sec and time_window_sec > 0:
+            cutoff = (time.time() if now is None else now) - time_window_sec
+            while self._gens and self._gens[0][1] < cutoff:
+                for _ in range(self._gens[0][2]):
+                    self._evict()
+
+    def is_duplicate(self, value: Hashable, history_size: int, time_window_sec: float = 0) -> bool:
+        """True if *value* was remembered within the size/time limits."""
+        self.prune(history_size, time_window_sec)
+        return value in self
+
+    def _drop_stale(self):
+        """Rebuild _order and _gens with only each value's newest slot."""
+        slots = self._order[self._head:]
+        newest, seen = bytearray(len(slots)), set()
+        for i in range(len(slots) - 1, -1, -1):
+            if slots[i] not in seen:
+                seen.add(slots[i])
+                newest[i] = 1
+        order, gens, i = array("I"), deque(), 0
+        for start, last, count in self._gens:
+            kept = 0
+            for j in range(i, i + count):
+                if newest[j]:
+                    order.append(slots[j])
+                    kept += 1
+            i += count
+            if kept:
+                gens.append([start, last, kept])
+        self._order, self._head, self._gens = order, 0, gens
+        self._dups.clear()
+        self._stale = 0
+
+    def remember(self, value: Hashable, history_size: int, now: Optional[float] = None):
+        off = self._offset(value)
+        if off is None:
+            return
+        now = time.time() if now is None else now
+        if value in self:
+            self._dups[off] = self._dups.get(off, 0) + 1
+            self._stale += 1
+        else:
+            self._bits[off >> 3] |= 1 << (off & 7)
+        self._order.append(off)
+        gen = self._gens[-1] if self._gens else None
+        if gen is None or now - gen[0] >= self.GENERATION_SEC:
+            self._gens.append([now, now, 1])
+        else:
+            gen[1] = now
+            gen[2] += 1
+        self.prune(history_size, 0)
+        if self._stale > 1024 and self._stale > len(self):
+            self._drop_stale()
+
+    def remember_and_check(self, value: Hashable, history_size: int, time_window_sec: float = 0) -> bool:
+        already = self.is_duplicate(value, history_size, time_window_sec)
+        self.remember(value, history_size)
+        return already
+
+    def claim(self, value: Hashable, history_size: int, time_window_sec: float = 0) -> bool:
+        if self.is_duplicate(value, history_size, time_window_sec):
+            return False
+        self.remember(value, history_size)
+        return True
+
+    def clear(self):
+        self._bits   = bytearray(len(self._bits))
+        self._order  = array("I")
+        self._head   = 0
+        self._gens.clear()
+        self._dups.clear()
+        self._stale  = 0
+
+
+class HistoryStore:
+    """
+    Scope key -> UniqueHistory. Each node module owns one store so scope keys
+    ("global", "file::...", (lo, hi), ...) never collide between nodes.
+
+    Callers tracking integers in a known range pass bounds=(lo, hi). A new
+    scope then gets a BitmapHistory when that is the smaller one (see suits()). The
+    choice is made once, when the scope is created.
+    """
+
+    def __init__(self):
+        self._scopes: Dict[Any, Any] = {}
+
+    def scope(self, key: Hashable, bounds: Optional[Tuple[int, int]] = None, history_size: int = 0):
+        h = self._scopes.get(key)
+        if h is None:
+            if bounds is not None and BitmapHistory.suits(bounds[0], bounds[1], history_size):
+                h = BitmapHistory(bounds[0], bounds[1])
+            else:
+                h = UniqueHistory()
+            self._scopes[key] = h
+        return h
+
+    def is_duplicate(self, key: Hashable, value: Hashable, history_size: int, time_window_sec: float = 0,
+                     bounds: Optional[Tuple[int, int]] = None) -> bool:
+        return self.scope(key, bounds, history_size).is_duplicate(value, history_size, time_window_sec)
+
+    def remember(self, key: Hashable, value: Hashable, history_size: int,
+                 bounds: Optional[Tuple[int, int]] = None):
+        self.scope(key, bounds, history_size).remember(value, history_size)
+
+    def remember_and_check(self, key: Hashable, value: Hashable, history_size: int, time_window_sec: float = 0,
+                           bounds: Optional[Tuple[int, int]] = None) -> bool:
+        return self.scope(key, bounds, history_size).remember_and_check(value, history_size, time_window_sec)
+
+    def claim(self, key: Hashable, value: Hashable, history_size: int, time_window_sec: float = 0,
+              bounds: Optional[Tuple[int, int]] = None) -> bool:
+        return self.scope(key, bounds, history_size).claim(value, history_size, time_window_sec)
+
+    def clear(self):
+        self._scopes.clear()
@@ -0,0 +1,83 @@
+# =============================================================================
+# Author      : Manny Gonzalez (YFG)
+# Title       : YFG Random - Keyed Permutation
+# Nickname    : YFG_Random
+# Description : Lazy shuffle of 0..n-1 for ranges too big to hold as a list.
+#               A keyed Feistel network with cycle walking is a bijection on
+#               [0, n), so "the i-th value of the shuffle" is computed on
+#               demand from (key, i). A shuffle bag over 2^64 values is then
+#               a key and a counter: O(1) memory, O(1) per draw, and no value
+#               repeats until the counter wraps.
+# =============================================================================
+
+import hashlib
+import secrets
+from typing import Optional
+
+from .entropy import entropy_pool
+from .randomorg import RandomOrgError
+
+
+class FeistelPermutation:
+    """
+    Pseudo-random permutation of range(n), indexable like the list
+    random.shuffle would have produced: perm[i] for 0 <= i < n.
+
+    • The domain is rounded up to an even number of bits, 2b, and split into
+      two b-bit halves. Each of ROUNDS rounds does L, R = R, L ^ F(k, r, R)
+      with F = keyed BLAKE2b, which is invertible whatever F is, so the
+      network is a bijection on [0, 4^b).
+    • Cycle walking keeps it inside [0, n): outputs >= n are encrypted
+      again until one lands in range. Following a cycle of a bijection
+      can't revisit a value, so the result is still a bijection on [0, n).
+      4^b < 4n, so that takes under four passes on average.
+    • The key is random (see random()), so the order can't be predicted
+      without it. It is not meant as encryption, just as a fair shuffle.
+    """
+
+    ROUNDS = 8
+
+    __slots__ = ("n", "key", "_half", "_mask")
+
+    def __init__(self, n: int, key: bytes):
+        n = int(n)
+        if n < 1:
+            raise ValueError("permutation needs at least one value")
+        bits = max(2, (n - 1).bit_length())
+        self.n     = n
+        self.key   = bytes(key)[:64]
+        self._half = (bits + 1) // 2
+        self._mask = (1 << self._half) - 1
+
+    @classmethod
+    def random(cls, n: int, api_key: Optional[str] = None) -> "FeistelPermutation":
+        """Fresh permutation keyed from random.org entropy (os.urandom if it can't deliver)."""
+        try:
+            key = entropy_pool(api_key).take(32)
+        except RandomOrgError:
+            key = secrets.token_bytes(32)
+        return cls(n, key)
+
+    def __len__(self) -> int:
+        return self.n
+
+    def _round(self, r: int, half: int) -> int:
+        size = (self._half + 7) // 8
+        msg  = bytes((r,)) + half.to_bytes(size, "little")
+        out  = hashlib.blake2b(msg, digest_size=max(1, size), key=self.key).digest()
+        return int.from_bytes(out, "little") & self._mask
+
+    def _encrypt(self, x: int) -> int:
+        left, right = x >> self._half, x & self._mask
+        for r in range(self.ROUNDS):
+            left, right = right, left ^ self._round(r, right)
+        return (left << self._half) | right
+
+    def __getitem__(self, i: int) -> int:
+        i = int(i)
+        if not 0 <= i < self.n:
+            raise IndexError("permutation index out of range")
+        x = self._encrypt(i)
+        while x >= self.n:
+            x = self._encrypt(x)
+        return x
@@ -0,0 +1,108 @@
+# =============================================================================
+# Author      : Manny Gonzalez (YFG)
+# Title       : YFG Random - Queue-Time Prefetch
+# Nickname    : YFG_Random
+# Description : Looks through a prompt as it starts executing for the YFG
+#               random nodes, estimates how many random.org bytes each will
+#               draw, and starts the entropy pool refills right away. The
+#               fetches are then in flight while the upstream nodes (model
+#               loads, sampling) run, and the random nodes find the bytes
+#               already buffered instead of blocking on a request.
+# =============================================================================
+
+from typing import Any, Callable, Dict, Optional
+
+from .entropy import entropy_pool
+from .randomorg import random_org
+
+_V1_PLACEHOLDER_KEY = "00000000-0000-0000-0000-000000000000"
+_HUGE_RANGE         = 200_000      # RandomOrgV2 keys a permutation above this
+
+
+def _const(inputs: Dict[str, Any], name: str, default: Any) -> Any:
+    """A widget value, or *default* when the input is a link ([node_id, slot]) or missing."""
+    value = inputs.get(name, default)
+    return default if isinstance(value, list) else value
+
+
+def _bytes_per_int(lo: Any, hi: Any) -> int:
+    """Expected pool bytes for one randint over [lo, hi]: under two draws on average."""
+    try:
+        span = abs(int(float(hi)) - int(float(lo))) + 1
+    except (TypeError, ValueError):
+        span = 1 << 32
+    return 2 * (((span - 1).bit_length() + 7) // 8) if span > 1 else 0
+
+
+def _random_org_v2(inputs: Dict[str, Any]):
+    if _const(inputs, "mode", "random") == "fixed":
+        return None, 0
+    lo, hi = _const(inputs, "minimum", 0), _const(inputs, "maximum", 10)
+    count  = max(1, int(_const(inputs, "count", 1)))
+    if _const(inputs, "ensure_unique", True) and _const(inputs, "use_shuffle_bag", True):
+        # Bags shuffle locally; only a huge range keys a permutation (32 bytes)
+        try:
+            huge = abs(int(float(hi)) - int(float(lo))) + 1 > _HUGE_RANGE
+        except (TypeError, ValueError):
+            huge = False
+        return None, 32 if huge else 0
+    return None, count * _bytes_per_int(lo, hi)
+
+
+def _random_org_v1(inputs: Dict[str, Any]):
+    key = _const(inputs, "api_key", "")
+    if not key or key == _V1_PLACEHOLDER_KEY:
+        return None, 0
+    return key, _bytes_per_int(_const(inputs, "minimum", 0), _const(inputs, "maximum", 10))
+
+
+def _picks_from_pool(inputs: Dict[str, Any], modes) -> bool:
+    return (_const(inputs, "selection_mode", "random") in modes
+            and _const(inputs, "random_source", "auto") in ("auto", "random_org"))
+
+
+def _random_image(inputs: Dict[str, Any]):
+    # File count isn't known until the directory is listed; assume a 32-bit index
+    return None, 8 if _picks_from_pool(inputs, ("random", "by_query")) else 0
+
+
+def _random_prompt(inputs: Dict[str, Any]):
+    if not _picks_from_pool(inputs, ("random", "by_query")):
+        return None, 0
+    return None, 8 * max(1, int(_const(inputs, "count", 1)))
+
+
+# class_type -> inputs -> (api_key or None for the shared pool, bytes wanted)
+DEMAND: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+    "RandomOrgV2TrueRandomNumber_node": _random_org_v2,
+    "RandomOrgV2TrueRandomNumber":      _random_org_v2,
+    "RandomOrgTrueRandomNumber_node":   _random_org_v1,
+    "RandomImageFromDirectory_node":    _random_image,
+    "YFGRandomPromptFromFile_node":     _random_prompt,
+}
+
+
+def prefetch_for_prompt(prompt: Dict[str, Any]) -> Dict[Optional[str], int]:
+    """
+    Start the refills a prompt's random nodes will need. Never blocks and
+    never makes a request itself: each pool's background thread does.
+    Returns {api_key or None: bytes requested}.
+    """
+    wanted: Dict[Optional[str], int] = {}
+    for node in (prompt or {}).values():
+        if not isinstance(node, dict):
+            continue
+        estimate = DEMAND.get(node.get("class_type"))
+        if estimate is None:
+            continue
+        try:
+            key, nbytes = estimate(node.get("inputs") or {})
+        except (TypeError, ValueError):
+            continue
+        if nbytes > 0:
+            wanted[key] = wanted.get(key, 0) + nbytes
+    if None in wanted and not random_org().api_key():
+        del wanted[None]
+    for key, nbytes in wanted.items():
+        entropy_pool(key).prefetch(nbytes)
+    return wanted
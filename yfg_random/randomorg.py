@@ -0,0 +1,393 @@
+# =============================================================================
+# Author      : Manny Gonzalez (YFG)
+# Title       : YFG Random - random.org Client
+# Nickname    : YFG_Random
+# Description : One JSON-RPC client for every node that talks to random.org.
+#               Keeps a keep-alive session (no TCP+TLS handshake per call),
+#               caches the API key until its file changes, applies the same
+#               timeouts and retry/backoff everywhere and counts calls,
+#               latency and failures in one place. It also tracks the key's
+#               remaining quota (bitsLeft / requestsLeft), honours
+#               advisoryDelay, and stops calling for a cool-down window
+#               after repeated failures (circuit breaker).
+# =============================================================================
+
+import os
+import json
+import time
+import random
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+API_URL          = "https://api.random.org/json-rpc/2/invoke"
+API_URL_ENV      = "YFG_RANDOM_ORG_URL"     # e.g. the local stand-in (yfg_random.standin)
+API_KEY_ENV      = "RANDOM_ORG_API_KEY"
+LOW_BITS_ENV     = "YFG_RANDOM_ORG_LOW_BITS"  # "quota running low" threshold, in bits
+API_KEY_FILENAME = "random_org_api_key.json"
+
+# The nodes read the key file from the package root, next to their own files
+DEFAULT_KEY_PATH = str(Path(__file__).resolve().parent.parent / API_KEY_FILENAME)
+
+# Response field -> usage field. Every generate* result carries the first
+# three (plus advisoryDelay); getUsage carries all of them.
+_USAGE_FIELDS = {"bitsLeft": "bits_left", "requestsLeft": "requests_left", "bitsUsed": "bits_used",
+                 "totalBits": "total_bits", "totalRequests": "total_requests", "status": "status"}
+
+# JSON-RPC error codes for a spent daily quota: bits (402), requests (403)
+_QUOTA_ERRORS = {402: "bitsLeft", 403: "requestsLeft"}
+
+
+class RandomOrgError(Exception):
+    """A random.org call that failed after every retry, or was refused outright."""
+
+
+class CircuitOpenError(RandomOrgError):
+    """Not attempted: the circuit breaker is open after repeated failures."""
+
+
+class RandomOrgClient:
+    """
+    Thread-safe random.org JSON-RPC client.
+
+    • One requests.Session with a small connection pool, created on first use
+      so importing this module never requires `requests`.
+    • api_key(): RANDOM_ORG_API_KEY wins; otherwise the key file is re-read
+      only when its mtime or size changes.
+    • Timeouts are (connect, read). Connection errors, timeouts, HTTP 429 and
+      5xx are retried with jittered exponential backoff while the total time
+      stays inside `deadline`. JSON-RPC errors (bad key, quota) are not.
+    • stats() reports calls, failures, retries and latency for all callers.
+    • Every response updates the key's quota (bitsLeft, requestsLeft), and
+      usage() polls getUsage when that is stale. advisoryDelay is honoured
+      before the key's next request. refill_size() turns the quota into a
+      block size for the entropy pool.
+    • Circuit breaker: after FAILURE_THRESHOLD failed calls in a row the
+      circuit opens and calls raise CircuitOpenError at once, without
+      touching the network, for `cooldown` seconds. Then a single probe call
+      is let through: success closes the circuit, failure reopens it with
+      the cool-down doubled (up to MAX_COOLDOWN).
+    """
+
+    USAGE_MAX_AGE     = 300.0   # seconds before usage() polls getUsage again
+    EXHAUSTED_MAX_AGE = 60.0    # ... while the quota is spent, to notice the reset
+    LOW_BITS          = 25000   # warn below this many bits: 10% of a free key's 250,000 a day
+    FEW_REQUESTS      = 20      # below this, refills fetch bigger blocks
+    FAILURE_THRESHOLD = 3       # failed calls in a row that open the circuit
+    COOLDOWN          = 60.0    # first open period, seconds
+    MAX_COOLDOWN      = 900.0
+
+    def __init__(self, key_path: str = DEFAULT_KEY_PATH, url: Optional[str] = None,
+                 connect_timeout: float = 3.05, read_timeout: float = 10.0,
+                 retries: int = 2, backoff: float = 0.25, deadline: float = 15.0,
+                 low_bits: Optional[int] = None):
+        self.key_path = key_path
+        self.url      = url or os.environ.get(API_URL_ENV, "").strip() or API_URL
+        self.low_bits = self.LOW_BITS if low_bits is None else int(low_bits)
+        if low_bits is None and os.environ.get(LOW_BITS_ENV, "").strip():
+            try:
+                self.low_bits = int(os.environ[LOW_BITS_ENV])
+            except ValueError:
+                print(f"[YFG] random.org: ignoring {LOW_BITS_ENV}={os.environ[LOW_BITS_ENV]!r} (not an integer)")
+        self.timeout  = (connect_timeout, read_timeout)
+        self.retries  = retries
+        self.backoff  = backoff
+        self.deadline = deadline
+        self._lock    = threading.Lock()
+        self._session = None
+        self._key: Tuple[Optional[Tuple[int, int]], Optional[str]] = (None, None)
+        self._id      = 0
+        self._usage: Dict[str, Dict[str, Any]] = {}     # api key -> quota
+        self._not_before: Dict[str, float] = {}         # api key -> monotonic time
+        self._breaker: Dict[str, Any] = {"state": "closed", "failures": 0, "opened_at": None,
+                                          "cooldown": self.COOLDOWN, "probing": False}
+        self._stats: Dict[str, Any] = {
+            "calls": 0, "ok": 0, "failures": 0, "retries": 0,
+            "latency_ms_last": 0.0, "latency_ms_max": 0.0, "latency_ms_total": 0.0,
+            "last_error": None, "last_error_at": None,
+        }
+
+    # ── API key ──────────────────────────────────────────────────────────
+    def api_key(self) -> Optional[str]:
+        env = os.environ.get(API_KEY_ENV, "").strip()
+        if env:
+            return env
+        try:
+            st  = os.stat(self.key_path)
+            sig = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            return None
+        cached_sig, cached_key = self._key
+        if sig == cached_sig:
+            return cached_key
+        key = None
+        try:
+            with open(self.key_path, "r", encoding="utf-8") as f:
+                key = ((json.load(f) or {}).get("api_key") or "").strip() or None
+        except (OSError, ValueError, AttributeError) as e:
+            print(f"[YFG] random.org: cannot read {API_KEY_FILENAME}: {e}")
+        self._key = (sig, key)
+        return key
+
+    # ── transport ────────────────────────────────────────────────────────
+    def _get_session(self):
+        with self._lock:
+            if self._session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+                session = requests.Session()
+                session.headers["Content-Type"] = "application/json"
+                session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=4, max_retries=0))
+                self._session = session
+            return self._session
+
+    def _record(self, ok: bool, started: float, error: Optional[str] = None):
+        ms = (time.perf_counter() - started) * 1000.0
+        with self._lock:
+            s = self._stats
+            s["calls"] += 1
+            s["ok" if ok else "failures"] += 1
+            s["latency_ms_last"]   = ms
+            s["latency_ms_max"]    = max(s["latency_ms_max"], ms)
+            s["latency_ms_total"] += ms
+            if error is not None:
+                s["last_error"]    = error
+                s["last_error_at"] = time.time()
+
+    # ── circuit breaker ──────────────────────────────────────────────────
+    def _admit(self):
+        """Raise CircuitOpenError unless a call may go out now. Caller holds _lock."""
+        b = self._breaker
+        if b["state"] == "closed":
+            return
+        if b["state"] == "open":
+            left = b["opened_at"] + b["cooldown"] - time.monotonic()
+            if left > 0:
+                raise CircuitOpenError(f"random.org circuit open for another {left:.0f}s")
+            b["state"] = "half_open"
+        if b["probing"]:
+            raise CircuitOpenError("random.org circuit half-open; probe in flight")
+        b["probing"] = True
+
+    def _breaker_result(self, ok: bool, error: Optional[str] = None):
+        with self._lock:
+            b    = self._breaker
+            was  = b["state"]
+            b["probing"] = False
+            if ok:
+                b.update(state="closed", failures=0, opened_at=None, cooldown=self.COOLDOWN)
+            else:
+                b["failures"] += 1
+                if was == "half_open":
+                    b["cooldown"] = min(b["cooldown"] * 2, self.MAX_COOLDOWN)
+                if was == "half_open" or b["failures"] >= self.FAILURE_THRESHOLD:
+                    b.update(state="open", opened_at=time.monotonic())
+            now, cooldown, failures = b["state"], b["cooldown"], b["failures"]
+        if ok and was != "closed":
+            print("[YFG] random.org: reachable again; circuit closed, back to true random")
+        elif now == "open" and was != "open":
+            print(f"[YFG] random.org: {failures} failed calls in a row ({error}); circuit open, "
+                  f"falling back to os.urandom for {cooldown:.0f}s")
+
+    def breaker(self) -> Dict[str, Any]:
+        with self._lock:
+            b = dict(self._breaker)
+        b.pop("probing")
+        if b["opened_at"] is not None:
+            b["retry_in_s"] = round(max(0.0, b["opened_at"] + b["cooldown"] - time.monotonic()), 1)
+        b.pop("opened_at")
+        return b
+
+    def call(self, method: str, params: Dict[str, Any], api_key: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Invoke *method* and return its JSON-RPC `result`. apiKey is filled in
+        from api_key() unless given. Raises RandomOrgError on failure, or
+        CircuitOpenError without a request while the breaker is open.
+
+        Once admitted, every call reports to the breaker however it ends, so
+        a half-open probe can't be left in flight by an unexpected exception.
+        """
+        key = api_key or self.api_key()
+        if not key:
+            raise RandomOrgError(f"no API key (set {API_KEY_ENV} or create {API_KEY_FILENAME})")
+        with self._lock:
+            wait = self._not_before.get(key, 0.0) - time.monotonic()
+            if wait > self.deadline:
+                raise RandomOrgError(f"random.org asked to wait {wait:.0f}s before the next request")
+            self._admit()
+            self._id += 1
+            rpc_id = self._id
+        started = time.perf_counter()
+        ok, error = False, "no attempt made"
+        try:
+            if wait > 0:
+                time.sleep(wait)
+            body = json.dumps({"jsonrpc": "2.0", "method": method,
+                               "params": dict(params, apiKey=key), "id": rpc_id})
+            result = self._send(key, body, started)
+            ok = True
+        except RandomOrgError as e:
+            error = str(e)
+            raise
+        except Exception as e:
+            error = f"unexpected {type(e).__name__}: {e}"
+            raise RandomOrgError(error) from e
+        finally:
+            self._record(ok, started, None if ok else error)
+            self._breaker_result(ok, None if ok else error)
+        self._note_usage(key, result)
+        return result
+
+    def _send(self, key: str, body: str, started: float) -> Dict[str, Any]:
+        """POST *body* with retries and backoff; the JSON-RPC result, or RandomOrgError."""
+        import requests
+
+        session = self._get_session()
+        error   = "no attempt made"
+        for attempt in range(self.retries + 1):
+            if attempt:
+                delay = self.backoff * (2 ** (attempt - 1)) * (1 + random.random())
+                if time.perf_counter() - started + delay > self.deadline:
+                    break
+                with self._lock:
+                    self._stats["retries"] += 1
+                time.sleep(delay)
+            try:
+                resp = session.post(self.url, data=body, timeout=self.timeout)
+            except requests.RequestException as e:
+                error = f"network error: {e}"
+                continue
+            if resp.status_code == 429 or resp.status_code >= 500:
+                error = f"HTTP {resp.status_code}"
+                continue
+            if resp.status_code != 200:
+                error = f"HTTP {resp.status_code}"
+                break
+            try:
+                data = resp.json()
+            except ValueError:
+                error = "response is not JSON"
+                break
+            if "error" in data:
+                err   = data["error"] or {}
+                error = f"API error {err.get('code')}: {err.get('message')}"
+                if err.get("code") in _QUOTA_ERRORS:
+                    self._note_usage(key, {_QUOTA_ERRORS[err["code"]]: 0})
+                break
+            if "result" not in data:
+                error = "response has no result"
+                break
+            return data["result"]
+        raise RandomOrgError(error)
+
+    # ── quota ────────────────────────────────────────────────────────────
+    def _note_usage(self, key: str, result: Dict[str, Any]):
+        if not isinstance(result, dict):
+            return
+        with self._lock:
+            u = self._usage.setdefault(key, {"warned": None})
+            for src, dst in _USAGE_FIELDS.items():
+                if src in result:
+                    u[dst] = result[src]
+            if "advisoryDelay" in result:
+                delay = max(0, int(result["advisoryDelay"] or 0))
+                u["advisory_delay_ms"] = delay
+                self._not_before[key]  = time.monotonic() + delay / 1000.0
+            u["updated_at"] = time.time()
+            level = self._quota_level(u)
+            if level == u["warned"]:
+                return
+            u["warned"] = level
+        if level == "exhausted":
+            print(f"[YFG] random.org: quota exhausted (bitsLeft={u.get('bits_left')}, "
+                  f"requestsLeft={u.get('requests_left')}); nodes fall back until it resets")
+        elif level == "low":
+            print(f"[YFG] random.org: quota running low (bitsLeft={u.get('bits_left')}, "
+                  f"requestsLeft={u.get('requests_left')})")
+
+    def _quota_level(self, u: Dict[str, Any]) -> Optional[str]:
+        bits, reqs = u.get("bits_left"), u.get("requests_left")
+        if (bits is not None and bits <= 0) or (reqs is not None and reqs <= 0):
+            return "exhausted"
+        # totalBits is lifetime usage, not the daily allowance, so it can't scale this
+        if (bits is not None and bits < self.low_bits) or (reqs is not None and reqs < self.FEW_REQUESTS):
+            return "low"
+        return None
+
+    def usage(self, api_key: Optional[str] = None, max_age: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        Remaining quota for the key, refreshed through getUsage when older
+        than max_age (default USAGE_MAX_AGE, or EXHAUSTED_MAX_AGE while spent).
+        None without a key; the last known state if getUsage fails.
+        """
+        key = api_key or self.api_key()
+        if not key:
+            return None
+        with self._lock:
+            u = dict(self._usage.get(key) or {})
+        if max_age is None:
+            max_age = self.EXHAUSTED_MAX_AGE if self._quota_level(u) == "exhausted" else self.USAGE_MAX_AGE
+        if time.time() - u.get("updated_at", 0) > max_age:
+            try:
+                self.call("getUsage", {}, api_key=key)
+            except RandomOrgError:
+                pass
+            with self._lock:
+                u = dict(self._usage.get(key) or {})
+        u.pop("warned", None)
+        u["level"] = self._quota_level(u) or "ok"
+        return u
+
+    def refill_size(self, want: int, cap: int, api_key: Optional[str] = None) -> int:
+        """
+        Bytes an entropy refill of *want* (at most *cap*) should fetch under
+        the key's quota: 0 once bits or requests are spent, never more than a
+        quarter of the bits left, and up to *cap* when few requests remain so
+        the remaining requests carry more entropy each.
+        """
+        u = self.usage(api_key)
+        if not u:
+            return want
+        if u["level"] == "exhausted":
+            return 0
+        reqs = u.get("requests_left")
+        if reqs is not None and reqs < self.FEW_REQUESTS:
+            want = cap
+        bits = u.get("bits_left")
+        if bits is not None:
+            want = min(want, max(1, bits // 32))
+        return max(0, min(want, cap))
+
+    def integers(self, n: int, lo: int, hi: int, replacement: bool = True,
+                 api_key: Optional[str] = None) -> List[int]:
+        """n integers in [lo, hi] from generateIntegers."""
+        result = self.call("generateIntegers", {
+            "n": int(n), "min": int(lo), "max": int(hi),
+            "replacement": bool(replacement), "base": 10,
+        }, api_key=api_key)
+        try:
+            return [int(v) for v in result["random"]["data"]]
+        except (KeyError, TypeError, ValueError) as e:
+            raise RandomOrgError(f"unexpected response format: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            s = dict(self._stats)
+        total = s.pop("latency_ms_total")
+        s["latency_ms_avg"] = round(total / s["calls"], 1) if s["calls"] else 0.0
+        s["latency_ms_last"] = round(s["latency_ms_last"], 1)
+        s["latency_ms_max"]  = round(s["latency_ms_max"], 1)
+        return s
+
+
+_CLIENT: Optional[RandomOrgClient] = None
+_CLIENT_LOCK = threading.Lock()
+
+
+def random_org() -> RandomOrgClient:
+    """The process-wide client every node shares (one session, one set of stats)."""
+    global _CLIENT
+    with _CLIENT_LOCK:
+        if _CLIENT is None:
+            _CLIENT = RandomOrgClient()
+        return _CLIENT
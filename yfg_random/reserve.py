@@ -0,0 +1,153 @@
+# =============================================================================
+# Author      : Manny Gonzalez (YFG)
+# Title       : YFG Random - On-Disk Entropy Reserve
+# Nickname    : YFG_Random
+# Description : Keeps random.org bytes the entropy pool had not served when
+#               ComfyUI stopped, so the next start draws from a warm reserve
+#               instead of paying network latency and quota. Each byte is
+#               handed out at most once, across restarts, crashes and
+#               processes sharing the file.
+# =============================================================================
+
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional
+
+try:
+    import fcntl
+except ImportError:            # Windows
+    fcntl = None
+    import msvcrt
+
+RESERVE_ENV  = "YFG_ENTROPY_RESERVE"    # file path, or "off" to disable
+DEFAULT_PATH = str(Path(__file__).resolve().parent.parent / ".cache" / "yfg_entropy.bin")
+
+_MAGIC  = b"YFGENT01"
+_HEADER = len(_MAGIC) + 8      # magic + consumed offset (uint64, little-endian)
+
+
+@contextmanager
+def _file_lock(path: str):
+    """Exclusive lock on a side file, shared by every process using the reserve."""
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        else:
+            msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+        yield
+    finally:
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            else:
+                os.lseek(fd, 0, os.SEEK_SET)
+                msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+        finally:
+            os.close(fd)
+
+
+class EntropyReserve:
+    """
+    Append-at-exit, claim-at-start store of unused random bytes.
+
+    File layout: MAGIC, then the consumed offset, then the bytes. Bytes
+    before the offset have been handed out and are never read again.
+
+    • claim(n) reads the next n unconsumed bytes, advances the offset and
+      fsyncs it, and only then returns them. A crash after the fsync loses
+      those bytes but can never hand them out twice.
+    • spill(data) writes the unconsumed tail plus *data* to a new file
+      (offset 0) and swaps it in with os.replace, so readers see either the
+      old file or the new one. Callers must drop *data* from memory first.
+    • Both run under an exclusive lock on <file>.lock, so several ComfyUI
+      processes on one host never claim the same bytes.
+    • The directory is created 0700 and the files 0600 (POSIX). The bytes are
+      raw secret material, so nothing else should be able to read them.
+    """
+
+    def __init__(self, path: str = DEFAULT_PATH, max_bytes: int = 65536):
+        self.path      = path
+        self.lock_path = path + ".lock"
+        self.max_bytes = max_bytes
+        self._lock     = threading.Lock()
+        folder = os.path.dirname(path)
+        os.makedirs(folder, mode=0o700, exist_ok=True)
+        if os.name == "posix":
+            os.chmod(folder, 0o700)
+
+    @staticmethod
+    def _read_offset(f) -> Optional[int]:
+        head = f.read(_HEADER)
+        if len(head) != _HEADER or not head.startswith(_MAGIC):
+            return None
+        return int.from_bytes(head[len(_MAGIC):], "little")
+
+    def available(self) -> int:
+        """Unconsumed bytes on disk (no lock: for stats only)."""
+        try:
+            with open(self.path, "rb") as f:
+                off = self._read_offset(f)
+                size = os.fstat(f.fileno()).st_size
+        except OSError:
+            return 0
+        return 0 if off is None else max(0, size - _HEADER - off)
+
+    def claim(self, n: int) -> bytes:
+        """Up to n bytes never handed out before; b"" when the reserve is empty."""
+        with self._lock, _file_lock(self.lock_path):
+            try:
+                f = open(self.path, "r+b")
+            except FileNotFoundError:
+                return b""
+            with f:
+                off = self._read_offset(f)
+                if off is None:
+                    print(f"[YFG] EntropyReserve: ignoring unrecognised file '{self.path}'")
+                    return b""
+                f.seek(_HEADER + off)
+                data = f.read(n)
+                if data:
+                    f.seek(len(_MAGIC))
+                    f.write((off + len(data)).to_bytes(8, "little"))
+                    f.flush()
+                    os.fsync(f.fileno())
+                return data
+
+    def spill(self, data: bytes) -> int:
+        """Keep *data* for a later claim. Returns the bytes now in reserve."""
+        if not data:
+            return self.available()
+        with self._lock, _file_lock(self.lock_path):
+            tail = b""
+            try:
+                with open(self.path, "rb") as f:
+                    off = self._read_offset(f)
+                    if off is not None:
+                        f.seek(_HEADER + off)
+                        tail = f.read()
+            except FileNotFoundError:
+                pass
+            keep = (tail + bytes(data))[:self.max_bytes]
+            tmp  = self.path + ".tmp"
+            fd   = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "wb") as f:
+                f.write(_MAGIC + (0).to_bytes(8, "little") + keep)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.path)
+            return len(keep)
+
+
+def default_reserve() -> Optional[EntropyReserve]:
+    """The reserve at YFG_ENTROPY_RESERVE (or .cache/yfg_entropy.bin); None if off or unusable."""
+    path = os.environ.get(RESERVE_ENV, "").strip()
+    if path.lower() in ("off", "0", "false", "none"):
+        return None
+    try:
+        return EntropyReserve(path or DEFAULT_PATH)
+    except OSError as e:
+        print(f"[YFG] EntropyReserve: disabled, cannot use '{path or DEFAULT_PATH}': {e}")
+        return None
@@ -0,0 +1,46 @@
+# =============================================================================
+# Author      : Manny Gonzalez (YFG)
+# Title       : YFG Random - Worker Shards
+# Nickname    : YFG_Random
+# Description : Splits an index range between several ComfyUI workers with no
+#               coordination: worker w of W owns every W-th entry starting at
+#               offset w, so shards are disjoint and together cover the range.
+# =============================================================================
+
+import os
+from typing import Tuple
+
+WORKER_INDEX_ENV = "YFG_WORKER_INDEX"
+WORKER_COUNT_ENV = "YFG_WORKER_COUNT"
+
+
+def _env_int(name: str, default: int) -> int:
+    raw = os.environ.get(name, "").strip()
+    if not raw:
+        return default
+    try:
+        return int(raw)
+    except ValueError:
+        raise ValueError(f"{name}={raw!r} is not an integer")
+
+
+def resolve_worker(worker_index: int = -1, worker_count: int = 0) -> Tuple[int, int]:
+    """
+    (index, count) for this worker. worker_count <= 0 reads YFG_WORKER_COUNT
+    and worker_index < 0 reads YFG_WORKER_INDEX, so one saved workflow can run
+    unchanged on every worker. With neither set this is (0, 1): no sharding.
+    """
+    count = int(worker_count) if int(worker_count) > 0 else _env_int(WORKER_COUNT_ENV, 1)
+    index = int(worker_index) if int(worker_index) >= 0 else _env_int(WORKER_INDEX_ENV, 0)
+    if count < 1:
+        raise ValueError(f"worker_count must be at least 1, got {count}")
+    if not 0 <= index < count:
+        raise ValueError(f"worker_index {index} is outside 0..{count - 1} for worker_count {count}")
+    return index, count
+
+
+def shard_size(n: int, worker_index: int, worker_count: int) -> int:
+    """How many of the positions 0..n-1 belong to the shard."""
+    if n <= worker_index:
+        return 0
+    return (n - worker_index + worker_count - 1) // worker_count
@@ -0,0 +1,298 @@
+# =============================================================================
+# Author      : Manny Gonzalez (YFG)
+# Title       : YFG Random - Shared Multi-Process State
+# Nickname    : YFG_Random
+# Description : Optional SQLite (WAL) backend for uniqueness history and
+#               shuffle bags, for several ComfyUI processes on one host that
+#               must not repeat each other. Enabled by pointing YFG_STATE_DB
+#               at a database file; without it every node keeps its
+#               in-process stores.
+# =============================================================================
+
+import os
+import json
+import time
+import random
+import sqlite3
+import threading
+from typing import Dict, Hashable, Optional, Tuple
+
+from .history import HistoryStore
+from .permutation import FeistelPermutation
+
+STATE_DB_ENV = "YFG_STATE_DB"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS history (
+    ns    TEXT    NOT NULL,
+    scope TEXT    NOT NULL,
+    value TEXT    NOT NULL,
+    seq   INTEGER NOT NULL,
+    ts    REAL    NOT NULL,
+    PRIMARY KEY (ns, scope, value)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS history_seq ON history (ns, scope, seq);
+CREATE TABLE IF NOT EXISTS scopes (
+    ns    TEXT    NOT NULL,
+    scope TEXT    NOT NULL,
+    seq   INTEGER NOT NULL,
+    PRIMARY KEY (ns, scope)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS bags (
+    key   TEXT    PRIMARY KEY,
+    lo    INTEGER NOT NULL,
+    hi    INTEGER NOT NULL,
+    seed  INTEGER NOT NULL,
+    pos   INTEGER NOT NULL
+) WITHOUT ROWID;
+"""
+
+
+def _key(value: Hashable) -> str:
+    return json.dumps(value, sort_keys=True, default=str)
+
+
+class SharedState:
+    """
+    One SQLite database per host, opened in WAL mode so readers never block
+    the single writer. Every write is one short BEGIN IMMEDIATE transaction.
+    A process keeps one connection, guarded by a lock because ComfyUI may
+    call in from its executor and server threads.
+    """
+
+    def __init__(self, path: str, timeout: float = 5.0):
+        self.path  = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=timeout, isolation_level=None,
+                                     check_same_thread=False)
+        # Switching to WAL and creating the schema need an exclusive lock and
+        # don't always wait on the busy handler, so several workers starting
+        # at once retry here instead of failing.
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                self._conn.execute("PRAGMA journal_mode=WAL")
+                self._conn.execute("PRAGMA synchronous=NORMAL")
+                self._conn.executescript(_SCHEMA)
+                break
+            except sqlite3.OperationalError as e:
+                if "locked" not in str(e) or time.monotonic() > deadline:
+                    raise
+                time.sleep(0.02 + random.random() * 0.05)
+
+    def read(self, sql: str, args: tuple = ()):
+        with self._lock:
+            return self._conn.execute(sql, args).fetchone()
+
+    def write(self, fn):
+        """Run fn(conn) inside one BEGIN IMMEDIATE ... COMMIT and return its result."""
+        with self._lock:
+            conn = self._conn
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = fn(conn)
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+            return result
+
+
+class SharedHistoryStore:
+    """
+    HistoryStore with the same interface, kept in the shared database so a
+    value remembered by one process is a duplicate for all of them. `bounds`
+    is accepted for compatibility; rows are stored the same way regardless.
+
+    Each scope has a sequence counter. A value is recent if its sequence
+    number is within history_size of the counter and, when a time window is
+    set, its timestamp is inside the window. A check is two primary-key
+    reads and a remember is one short write, so per-run cost stays in the
+    tens of microseconds. claim() and remember_and_check() do the check and
+    the insert in the same write transaction, so two processes can never
+    both take one value. Rows that fall out of every window are deleted in
+    bulk every PRUNE_EVERY inserts rather than on each write.
+    """
+
+    PRUNE_EVERY = 64
+
+    def __init__(self, shared: SharedState, namespace: str):
+        self._db = shared
+        self._ns = namespace
+
+    @staticmethod
+    def _recent(fetch, ns: str, scope: str, val: str, history_size: int, time_window_sec: float) -> bool:
+        row = fetch("SELECT seq, ts FROM history WHERE ns=? AND scope=? AND value=?", (ns, scope, val))
+        if row is None:
+            return False
+        seq, ts = row
+        if time_window_sec and time_window_sec > 0 and ts < time.time() - time_window_sec:
+            return False
+        if history_size and history_size > 0:
+            top = fetch("SELECT seq FROM scopes WHERE ns=? AND scope=?", (ns, scope))
+            if top is not None and seq <= top[0] - history_size:
+                return False
+        return True
+
+    def _insert(self, conn, scope: str, val: str, history_size: int):
+        ns = self._ns
+        conn.execute("INSERT OR IGNORE INTO scopes (ns, scope, seq) VALUES (?, ?, 0)", (ns, scope))
+        conn.execute("UPDATE scopes SET seq = seq + 1 WHERE ns=? AND scope=?", (ns, scope))
+        seq = conn.execute("SELECT seq FROM scopes WHERE ns=? AND scope=?", (ns, scope)).fetchone()[0]
+        conn.execute("INSERT OR REPLACE INTO history (ns, scope, value, seq, ts) VALUES (?, ?, ?, ?, ?)",
+                     (ns, scope, val, seq, time.time()))
+        if history_size and history_size > 0 and seq % self.PRUNE_EVERY == 0:
+            conn.execute("DELETE FROM history WHERE ns=? AND scope=? AND seq <= ?",
+                         (ns, scope, seq - history_size))
+
+    def is_duplicate(self, key: Hashable, value: Hashable, history_size: int, time_window_sec: float = 0,
+                     bounds: Optional[Tuple[int, int]] = None) -> bool:
+        return self._recent(self._db.read, self._ns, _key(key), _key(value), history_size, time_window_sec)
+
+    def remember(self, key: Hashable, value: Hashable, history_size: int,
+                 bounds: Optional[Tuple[int, int]] = None):
+        scope, val = _key(key), _key(value)
+        self._db.write(lambda conn: self._insert(conn, scope, val, history_size))
+
+    def remember_and_check(self, key: Hashable, value: Hashable, history_size: int, time_window_sec: float = 0,
+                           bounds: Optional[Tuple[int, int]] = None) -> bool:
+        scope, val, ns = _key(key), _key(value), self._ns
+
+        def txn(conn):
+            fetch = lambda sql, args: conn.execute(sql, args).fetchone()
+            already = self._recent(fetch, ns, scope, val, history_size, time_window_sec)
+            self._insert(conn, scope, val, history_size)
+            return already
+
+        return self._db.write(txn)
+
+    def claim(self, key: Hashable, value: Hashable, history_size: int, time_window_sec: float = 0,
+              bounds: Optional[Tuple[int, int]] = None) -> bool:
+        scope, val, ns = _key(key), _key(value), self._ns
+
+        def txn(conn):
+            fetch = lambda sql, args: conn.execute(sql, args).fetchone()
+            if self._recent(fetch, ns, scope, val, history_size, time_window_sec):
+                return False
+            self._insert(conn, scope, val, history_size)
+            return True
+
+        return self._db.write(txn)
+
+    def clear(self):
+        self._db.write(lambda conn: (
+            conn.execute("DELETE FROM history WHERE ns=?", (self._ns,)),
+            conn.execute("DELETE FROM scopes WHERE ns=?", (self._ns,)),
+        ))
+
+
+class SharedShuffleBag:
+    """
+    Shuffle bag whose cycle is shared by every process.
+
+    All processes deal the same seeded permutation of lo..hi. The database
+    only holds the seed and the next unclaimed position. A process claims
+    RESERVE positions in one transaction and serves them locally, so the
+    database is touched once per RESERVE picks. Each position goes to exactly
+    one process, so nothing repeats within a cycle across processes.
+    Positions still held by a process that exits are simply skipped for that
+    cycle. Ranges over MAX_LIST values use a FeistelPermutation keyed by the
+    seed instead of a shuffled list, so any range fits. Values handed back
+    with put_back() are served by this process before its next position.
+    """
+
+    RESERVE  = 64
+    MAX_LIST = 200_000
+
+    def __init__(self, shared: SharedState, namespace: str):
+        self._db      = shared
+        self._ns      = namespace
+        self._lock    = threading.Lock()
+        self._orders: Dict[Tuple[str, int], list] = {}
+        self._claims: Dict[str, list] = {}    # bag_key -> [lo, hi, seed, next, stop]
+        self._front:  Dict[str, list] = {}    # bag_key -> [lo, hi, values put back]
+
+    def _order(self, bag_key: str, n: int, seed: int):
+        """Offsets 0..n-1 in this cycle's order (a list, or a lazy permutation)."""
+        order = self._orders.get((bag_key, seed))
+        if order is None:
+            # One cached permutation per bag; drop the previous cycle's
+            self._orders = {k: v for k, v in self._orders.items() if k[0] != bag_key}
+            if n > self.MAX_LIST:
+                order = FeistelPermutation(n, seed.to_bytes(8, "little"))
+            else:
+                order = list(range(n))
+                random.Random(seed).shuffle(order)
+            self._orders[(bag_key, seed)] = order
+        return order
+
+    def _claim(self, bag_key: str, lo: int, hi: int) -> list:
+        n = hi - lo + 1
+
+        def txn(conn):
+            row = conn.execute("SELECT lo, hi, seed, pos FROM bags WHERE key=?", (bag_key,)).fetchone()
+            if row is None or row[0] != lo or row[1] != hi or row[3] >= n:
+                seed, pos = random.SystemRandom().getrandbits(62), 0
+            else:
+                seed, pos = row[2], row[3]
+            stop = min(n, pos + self.RESERVE)
+            conn.execute("INSERT OR REPLACE INTO bags (key, lo, hi, seed, pos) VALUES (?, ?, ?, ?, ?)",
+                         (bag_key, lo, hi, seed, stop))
+            return [lo, hi, seed, pos, stop]
+
+        return self._db.write(txn)
+
+    def next_value(self, bag_key: str, lo: int, hi: int) -> int:
+        bag_key = f"{self._ns}::{bag_key}"
+        with self._lock:
+            front = self._front.get(bag_key)
+            if front is not None and front[0] == lo and front[1] == hi and front[2]:
+                return front[2].pop(0)
+            claim = self._claims.get(bag_key)
+            if claim is None or claim[0] != lo or claim[1] != hi or claim[3] >= claim[4]:
+                claim = self._claims[bag_key] = self._claim(bag_key, lo, hi)
+            order = self._order(bag_key, hi - lo + 1, claim[2])
+            value = lo + order[claim[3]]
+            claim[3] += 1
+            return int(value)
+
+    def put_back(self, bag_key: str, lo: int, hi: int, values):
+        """Return dealt but unused *values*; this process deals them next, in order, once each."""
+        bag_key = f"{self._ns}::{bag_key}"
+        with self._lock:
+            front = self._front.get(bag_key)
+            if front is None or front[0] != lo or front[1] != hi:
+                front = self._front[bag_key] = [lo, hi, []]
+            values   = list(dict.fromkeys(int(v) for v in values))
+            front[2] = values + [v for v in front[2] if v not in values]
+
+
+_SHARED: Dict[str, SharedState] = {}
+
+
+def shared_state() -> Optional[SharedState]:
+    """The database named by YFG_STATE_DB, or None when the backend is off."""
+    path = os.environ.get(STATE_DB_ENV, "").strip()
+    if not path:
+        return None
+    db = _SHARED.get(path)
+    if db is None:
+        try:
+            db = _SHARED[path] = SharedState(path)
+        except sqlite3.Error as e:
+            print(f"[YFG] SharedState: cannot open '{path}' ({e}); using per-process state")
+            return None
+        print(f"[YFG] SharedState: uniqueness history and shuffle bags shared via '{path}'")
+    return db
+
+
+def history_store(namespace: str):
+    """SharedHistoryStore when YFG_STATE_DB is set, else an in-process HistoryStore."""
+    db = shared_state()
+    return SharedHistoryStore(db, namespace) if db is not None else HistoryStore()
+
+
+def shared_bag(namespace: str) -> Optional[SharedShuffleBag]:
+    """SharedShuffleBag when YFG_STATE_DB is set, else None (keep the node's own bag)."""
+    db = shared_state()
+    return SharedShuffleBag(db, namespace) if db is not None else None
@@ -0,0 +1,180 @@
+# =============================================================================
+# Author      : Manny Gonzalez (YFG)
+# Title       : YFG Random - random.org Stand-In Server
+# Nickname    : YFG_Random
+# Description : Tiny local JSON-RPC server that answers the random.org calls
+#               the nodes make (generateIntegers, generateBlobs, getUsage),
+#               with a quota, advisoryDelay, latency and failure injection.
+#               Point the client at it to exercise the client, entropy pool
+#               and circuit breaker offline:
+#
+#                 python -m yfg_random.standin --port 8765 --fail-rate 0.2
+#                 YFG_RANDOM_ORG_URL=http://127.0.0.1:8765/json-rpc/2/invoke
+#                 RANDOM_ORG_API_KEY=anything
+#
+#               Values come from `secrets`. It is not a source of true
+#               randomness and only listens on localhost by default.
+# =============================================================================
+
+import json
+import time
+import base64
+import random
+import secrets
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Tuple
+
+
+class StandIn:
+    """
+    random.org look-alike state: a daily quota and failure knobs that a test
+    can flip while the server runs.
+
+      delay           seconds to sleep before answering
+      fail_rate       chance of answering HTTP 503
+      down            answer every request with HTTP 503
+      advisory_delay  advisoryDelay (ms) returned with each generate* result
+    """
+
+    def __init__(self, bits: int = 250000, requests: int = 1000, delay: float = 0.0,
+                 fail_rate: float = 0.0, advisory_delay: int = 0):
+        self.total_bits     = bits
+        self.total_requests = requests
+        self.bits_left      = bits
+        self.requests_left  = requests
+        self.delay          = delay
+        self.fail_rate      = fail_rate
+        self.down           = False
+        self.advisory_delay = advisory_delay
+        self.served         = 0
+        self._lock          = threading.Lock()
+
+    def _usage(self) -> Dict[str, Any]:
+        return {"status": "running", "creationTime": "2000-01-01 00:00:00Z",
+                "bitsLeft": self.bits_left, "requestsLeft": self.requests_left,
+                "totalBits": self.total_bits - self.bits_left,
+                "totalRequests": self.total_requests - self.requests_left}
+
+    def _spend(self, bits: int) -> Optional[Tuple[int, str]]:
+        if self.requests_left <= 0:
+            return 403, "Your API key has exceeded its daily request allowance"
+        if self.bits_left < bits:
+            return 402, "Your API key has exceeded its daily bit allowance"
+        self.bits_left     -= bits
+        self.requests_left -= 1
+        return None
+
+    def _generate(self, method: str, p: Dict[str, Any]):
+        n = int(p.get("n", 1))
+        if method == "generateIntegers":
+            lo, hi = int(p["min"]), int(p["max"])
+            span   = hi - lo + 1
+            if span < 1 or n < 1 or (not p.get("replacement", True) and n > span):
+                return None, (202, "Parameter out of range")
+            bits = n * max(1, (span - 1).bit_length())
+            if p.get("replacement", True):
+                data = [lo + secrets.randbelow(span) for _ in range(n)]
+            else:
+                data = [lo + v for v in random.SystemRandom().sample(range(span), n)]
+        elif method == "generateBlobs":
+            size = int(p["size"])
+            if size < 1 or size % 8 or n < 1:
+                return None, (202, "Parameter out of range")
+            bits = n * size
+            raw  = [secrets.token_bytes(size // 8) for _ in range(n)]
+            data = [r.hex() if p.get("format") == "hex" else base64.b64encode(r).decode("ascii")
+                    for r in raw]
+        else:
+            return None, (-32601, "Method not found")
+        err = self._spend(bits)
+        if err is not None:
+            return None, err
+        return {"random": {"data": data, "completionTime": time.strftime("%Y-%m-%d %H:%M:%SZ", time.gmtime())},
+                "bitsUsed": bits, "bitsLeft": self.bits_left,
+                "requestsLeft": self.requests_left, "advisoryDelay": self.advisory_delay}, None
+
+    def handle(self, body: bytes) -> Tuple[int, Optional[Dict[str, Any]]]:
+        """(HTTP status, JSON-RPC response) for one request body."""
+        if self.delay:
+            time.sleep(self.delay)
+        if self.down or (self.fail_rate and random.random() < self.fail_rate):
+            return 503, None
+        try:
+            req = json.loads(body)
+            method, params, rpc_id = req["method"], req.get("params") or {}, req.get("id")
+        except (ValueError, KeyError, TypeError):
+            return 200, {"jsonrpc": "2.0", "error": {"code": -32700, "message": "Parse error"}, "id": None}
+        if not params.get("apiKey"):
+            return 200, {"jsonrpc": "2.0", "error": {"code": 400, "message": "The API key you specified does not exist"},
+                         "id": rpc_id}
+        with self._lock:
+            self.served += 1
+            if method == "getUsage":
+                result, err = self._usage(), None
+            else:
+                try:
+                    result, err = self._generate(method, params)
+                except (KeyError, TypeError, ValueError):
+                    result, err = None, (-32602, "Invalid params")
+        if err is not None:
+            return 200, {"jsonrpc": "2.0", "error": {"code": err[0], "message": err[1]}, "id": rpc_id}
+        return 200, {"jsonrpc": "2.0", "result": result, "id": rpc_id}
+
+
+def _handler(standin: StandIn):
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            status, payload = standin.handle(body)
+            out = json.dumps(payload).encode("utf-8") if payload is not None else b""
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(out)))
+            self.end_headers()
+            self.wfile.write(out)
+
+        def log_message(self, fmt, *args):
+            pass
+
+    return Handler
+
+
+def serve(host: str = "127.0.0.1", port: int = 0, **options) -> Tuple[ThreadingHTTPServer, StandIn, str]:
+    """
+    Start a stand-in on a daemon thread. port=0 picks a free port. Returns
+    (server, state, url); tweak `state` to inject failures and call
+    server.shutdown() when done.
+    """
+    standin = StandIn(**options)
+    server  = ThreadingHTTPServer((host, port), _handler(standin))
+    threading.Thread(target=server.serve_forever, name="yfg-random-org-standin", daemon=True).start()
+    url = f"http://{host}:{server.server_address[1]}/json-rpc/2/invoke"
+    return server, standin, url
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Local random.org JSON-RPC stand-in for offline testing.")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--bits", type=int, default=250000, help="daily bit allowance")
+    ap.add_argument("--requests", type=int, default=1000, help="daily request allowance")
+    ap.add_argument("--delay", type=float, default=0.0, help="seconds to wait before each answer")
+    ap.add_argument("--fail-rate", type=float, default=0.0, help="chance of an HTTP 503 per request")
+    ap.add_argument("--advisory-delay", type=int, default=0, help="advisoryDelay in ms")
+    args = ap.parse_args()
+
+    server, _, url = serve(args.host, args.port, bits=args.bits, requests=args.requests,
+                           delay=args.delay, fail_rate=args.fail_rate,
+                           advisory_delay=args.advisory_delay)
+    print(f"[YFG] random.org stand-in listening; set YFG_RANDOM_ORG_URL={url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
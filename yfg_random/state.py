@@ -0,0 +1,121 @@
+# =============================================================================
+# Author      : Manny Gonzalez (YFG)
+# Title       : YFG Random - Durable Selection State
+# Nickname    : YFG_Random
+# Description : Small key -> JSON-value store for selection cursors and
+#               shuffle-bag positions that must survive a ComfyUI restart.
+#               Updates are held in memory and written in batches (one
+#               atomic file replace per flush window), so advancing a cursor
+#               on every run costs a dict assignment, not a disk write.
+# =============================================================================
+
+import os
+import json
+import atexit
+import threading
+from collections import OrderedDict
+from typing import Any, Optional
+
+
+class StateStore:
+    """
+    Batched, crash-tolerant JSON store.
+
+    • get/set are in-memory; set() schedules a flush flush_delay seconds out.
+      Further sets inside that window ride along on the same write.
+    • Writes go to <path>.tmp and are os.replace()d over the real file, so a
+      crash mid-write leaves the previous state intact.
+    • Keys are kept in last-used order and capped at max_entries so stale
+      cursors (old files, old ranges) don't grow the file forever.
+    • Anything pending is flushed at interpreter exit.
+    • The file's folder is created on the first flush. A file at *legacy*
+      (an older location) is read when *path* doesn't exist yet, and
+      removed once the state has been written to *path*.
+    """
+
+    def __init__(self, path: str, flush_delay: float = 2.0, max_entries: int = 1000,
+                 legacy: Optional[str] = None):
+        self.path        = path
+        self.legacy      = legacy
+        self.flush_delay = flush_delay
+        self.max_entries = max_entries
+        self._data: "Optional[OrderedDict[str, Any]]" = None
+        self._dirty = False
+        self._timer: Optional[threading.Timer] = None
+        self._lock  = threading.RLock()
+        atexit.register(self.flush)
+
+    def _load(self) -> "OrderedDict[str, Any]":
+        if self._data is None:
+            data = OrderedDict()
+            for path in (self.path, self.legacy):
+                if path is None:
+                    continue
+                try:
+                    with open(path, "r", encoding="utf-8") as f:
+                        raw = json.load(f)
+                    if isinstance(raw, dict):
+                        data.update(raw)
+                    break
+                except FileNotFoundError:
+                    continue
+                except Exception as e:
+                    print(f"[YFG] StateStore: ignoring unreadable state file '{path}': {e}")
+                    break
+            self._data = data
+        return self._data
+
+    def get(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            data = self._load()
+            if key in data:
+                data.move_to_end(key)
+                return data[key]
+            return default
+
+    def set(self, key: str, value: Any):
+        with self._lock:
+            data = self._load()
+            data[key] = value
+            data.move_to_end(key)
+            while len(data) > self.max_entries:
+                data.popitem(last=False)
+            self._mark_dirty()
+
+    def pop(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            data = self._load()
+            if key not in data:
+                return default
+            value = data.pop(key)
+            self._mark_dirty()
+            return value
+
+    def clear(self):
+        with self._lock:
+            self._data = OrderedDict()
+            self._mark_dirty()
+
+    def _mark_dirty(self):
+        self._dirty = True
+        if self._timer is None:
+            self._timer = threading.Timer(self.flush_delay, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self):
+        with self._lock:
+            self._timer = None
+            if not self._dirty or self._data is None:
+                return
+            tmp = self.path + ".tmp"
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                with open(tmp, "w", encoding="utf-8") as f:
+                    json.dump(self._data, f, separators=(",", ":"))
+                os.replace(tmp, self.path)
+                self._dirty = False
+                if self.legacy is not None and os.path.exists(self.legacy):
+                    os.remove(self.legacy)
+            except Exception as e:
+                print(f"[YFG] StateStore: could not write '{self.path}': {e}")